@@ -48,13 +48,16 @@ from .supplier.model import (
     DataSpec, ValueSupplierInterface, Distribution, CasterInterface, RecordProcessor, OutputHandlerInterface,
     ResettableIterator, KeyProviderInterface)
 # expose this at root too
-from .builder import parse_spec, entries, generator, values_for, record_entries, record_generator
+from .builder import (
+    parse_spec, entries, generator, stream, values_for, record_entries, record_generator, tuple_generator)
 # exceptions and errors thrown
 from .exceptions import SpecException, ResourceError
 from .supplier.exceptions import SupplierException
 # commonly used by client code
 from .loader import preprocess_spec, preprocess_and_format, Loader
-from . import suppliers, outputs
+from . import suppliers, outputs, metrics
+from .pools import pool
+from .rates import rate_limited
 from .usage import build_api_help as type_usage
 from .usage import build_cli_help as cli_usage
 # registry decorators
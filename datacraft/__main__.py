@@ -5,7 +5,7 @@ Entry point for datacraft tool
 import os.path
 import sys
 
-from . import cli, suppliers
+from . import cli, suppliers, rates, registries, metrics
 from .logging_handler import *
 # this activates the decorators, so they will be discoverable
 from .preprocessor import *
@@ -31,17 +31,41 @@ def main(argv):
         run_server(args)
         return
 
-    generator = cli.process_args(args)
-    if generator is None:
+    limiter = None
+    if args.rate is not None:
+        limiter = _rate_limiter(args)
+        args.batch_size = rates.batch_size_for(args.rate, args.batch_size)
+
+    batches = cli.process_args(args, batched=True)
+    if batches is None:
         return
+    if limiter is not None:
+        batches = rates.rate_limited(batches, limiter, per_item=args.batch_size)
 
     _log.info('Starting Processing...')
-    for _ in range(0, args.iterations):
-        # Generator will handle writing to configured output
-        next(generator)
+    if args.progress is None:
+        for _ in batches:
+            # Output is written as each batch is consumed
+            pass
+    else:
+        progress = metrics.Progress(float(args.progress))
+        for _ in batches:
+            progress.update()
+        progress.report(final=True)
     _log.info('Finished Processing')
 
 
+def _rate_limiter(args) -> rates.RateLimiter:
+    """ limiter for the --rate args """
+    try:
+        return rates.RateLimiter(args.rate,
+                                 burst=args.rate_burst,
+                                 profile=args.rate_profile,
+                                 log_interval=float(registries.get_default('rate_log_interval')))
+    except ValueError as err:
+        raise SpecException(f'Invalid --rate-profile {args.rate_profile}: {err}') from err
+
+
 def run_server(args):
     if args.endpoint_spec:
         if not os.path.exists(args.endpoint_spec):
@@ -1,11 +1,9 @@
 """module for csv type datacraft registry functions"""
-import csv
 import json
 import logging
 import os
 
 import datacraft
-from datacraft.supplier.common import weighted_values_explicit
 from . import schemas
 
 _log = logging.getLogger(__name__)
@@ -74,23 +72,15 @@ def _configure_weighted_csv(field_spec, loader):
     config = datacraft.utils.load_config(field_spec, loader)
 
     field_name = config.get('column', 1)
-    weight_column = config.get('weight_column', 2)
-    count_supplier = datacraft.suppliers.count_supplier(**config)
-
-    datafile = config.get('datafile', datacraft.registries.get_default('csv_file'))
-    csv_path = f'{loader.datadir}/{datafile}'
-    has_headers = datacraft.utils.is_affirmative('headers', config)
     numeric_index = isinstance(field_name, int)
     if numeric_index and field_name < 1:
         raise datacraft.SpecException(f'Invalid index {field_name}, one based indexing used for column numbers')
+    if not numeric_index and not datacraft.utils.is_affirmative('headers', config):
+        raise datacraft.SpecException(f'headers required to use named column {field_name}: {json.dumps(field_spec)}')
 
-    if has_headers and not numeric_index:
-        choices = _read_named_column(csv_path, field_name)
-        weights = _read_named_column_weights(csv_path, weight_column)
-    else:
-        choices = _read_indexed_column(csv_path, int(field_name), skip_first=numeric_index)
-        weights = _read_indexed_column_weights(csv_path, int(weight_column), skip_first=numeric_index)
-    return weighted_values_explicit(choices, weights, count_supplier)
+    datafile = config.get('datafile', datacraft.registries.get_default('csv_file'))
+    csv_path = f'{loader.datadir}/{datafile}'
+    return datacraft.suppliers.weighted_csv(csv_path, **config)
 
 
 @datacraft.registry.schemas(_WEIGHTED_CSV)
@@ -109,35 +99,3 @@ def _example_csv_usage():
 def _example_weighted_csv_usage():
     formatted_spec = datacraft.preprocess_and_format(_WEIGHTED_CSV_EXAMPLE)
     return f'Example Spec:\n{formatted_spec}'
-
-
-def _read_named_column(csv_path: str, column_name: str):
-    """ reads values from a named column into a list """
-    with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        return [val[column_name] for val in reader]
-
-
-def _read_named_column_weights(csv_path: str, column_name: str):
-    """ reads values for weights for named column into a list """
-    with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        return [float(val[column_name]) for val in reader]
-
-
-def _read_indexed_column(csv_path: str, column_index: int, skip_first: bool):
-    """ reads values from a indexed column into a list """
-    with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile)
-        if skip_first:
-            next(reader)
-        return [val[column_index - 1] for val in reader]
-
-
-def _read_indexed_column_weights(csv_path: str, column_index: int, skip_first: bool):
-    """ reads values for weights for indexed column into a list """
-    with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile)
-        if skip_first:
-            next(reader)
-        return [float(val[column_index - 1]) for val in reader]
@@ -11,6 +11,8 @@ _ITERATION_ALIAS_ROW = 'rownum'
 
 
 class _IterationSupplier(datacraft.ValueSupplierInterface):
+    distinct = True
+
     def __init__(self, offset: int):
         self.offset = offset
 
@@ -1,6 +1,6 @@
 """module for nested type datacraft registry functions"""
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 
 import datacraft
 from datacraft import ValueSupplierInterface, KeyProviderInterface, SupplierException
@@ -10,6 +10,8 @@ from . import schemas
 
 _log = logging.getLogger(__name__)
 _NESTED_KEY = 'nested'
+# fewer objects than this are generated an object at a time, batching the fields costs more than it saves for these
+_MIN_COLUMNS_COUNT = 16
 
 
 @datacraft.registry.schemas(_NESTED_KEY)
@@ -27,8 +29,10 @@ def _configure_nested_supplier(spec, loader):
     count_supplier = datacraft.suppliers.count_supplier(**config)
     if 'field_groups' in spec:
         key_supplier = key_suppliers.from_spec(spec)
+        field_groups = key_suppliers.field_groups(spec)
     else:
         key_supplier = key_suppliers.from_spec(fields)
+        field_groups = key_suppliers.field_groups(fields)
 
     as_list = datacraft.utils.is_affirmative('as_list', config)
 
@@ -41,7 +45,7 @@ def _configure_nested_supplier(spec, loader):
         else:
             supplier = loader.get_from_spec(nested_spec)
         field_supplier_map[key] = supplier
-    return nested_supplier(field_supplier_map, count_supplier, key_supplier, as_list)
+    return nested_supplier(field_supplier_map, count_supplier, key_supplier, as_list, field_groups)
 
 
 @datacraft.registry.usage(_NESTED_KEY)
@@ -72,15 +76,24 @@ def _example_nested_usage():
 def nested_supplier(field_supplier_map: Dict[str, ValueSupplierInterface],
                     count_supplier: ValueSupplierInterface,
                     key_supplier: KeyProviderInterface,
-                    as_list: bool) -> ValueSupplierInterface:
+                    as_list: bool,
+                    field_groups: Optional[Dict[str, List[str]]] = None) -> ValueSupplierInterface:
     """
     Args:
         field_supplier_map: mapping of nested field name to value supplier for it
         count_supplier: number of nested objects to create
         key_supplier: to supply nest fields names
         as_list: for counts of one, if the result should be a list instead of an object
+        field_groups: name and keys of each group the key supplier supplies, so the keys can be checked up front
+
+    Raises:
+        SupplierException if any of the keys in the field groups are not valid
     """
-    return _NestedSupplier(field_supplier_map, count_supplier, key_supplier, as_list)
+    return _NestedSupplier(field_supplier_map, count_supplier, key_supplier, as_list, field_groups)
+
+
+# keys and the supplier for each key, for one field group
+_Plan = Tuple[Tuple[str, ValueSupplierInterface], ...]
 
 
 class _NestedSupplier(ValueSupplierInterface):
@@ -92,39 +105,77 @@ class _NestedSupplier(ValueSupplierInterface):
                  field_supplier_map: Dict[str, ValueSupplierInterface],
                  count_supplier: ValueSupplierInterface,
                  key_supplier: KeyProviderInterface,
-                 as_list: bool):
+                 as_list: bool,
+                 field_groups: Optional[Dict[str, List[str]]] = None):
         """
         Args:
             field_supplier_map: mapping of nested field name to value supplier for it
             count_supplier: number of nested objects to create
             key_supplier: to supply nest fields names
             as_list: for counts of one, if the result should be a list instead of an object
+            field_groups: name and keys of each group the key supplier supplies
         """
         self.field_supplier_map = field_supplier_map
         self.count_supplier = count_supplier
         self.key_supplier = key_supplier
         self.as_list = as_list
+        # group name -> plan for the group
+        self.plans: Dict[str, _Plan] = {}
+        for group, keys in (field_groups or {}).items():
+            self.plans[group] = self._plan(keys)
+        # with only one group there is no need to ask the key supplier for the keys
+        self.only_plan = next(iter(self.plans.values())) if len(self.plans) == 1 else None
 
     def next(self, iteration: int):
-        count = int(self.count_supplier.next(iteration))
+        return self._value(iteration, int(self.count_supplier.next(iteration)))
+
+    def next_batch(self, iteration: int, count: int) -> list:
+        counts = [int(value) for value in self.count_supplier.next_batch(iteration, count)]
+        if self.only_plan is not None and count >= _MIN_COLUMNS_COUNT and all(value == 1 for value in counts):
+            values = self._columns(self.only_plan, iteration, count)
+            if self.as_list:
+                return [[value] for value in values]
+            return values
+        return [self._value(iteration + i, value) for i, value in enumerate(counts)]
+
+    def _value(self, iteration: int, count: int):
+        """ the nested object, or list of them, for the given count """
         if count == 0:
             if self.as_list:
                 return []
             return None
         if count > 1:
-            vals = [self._single_pass(iteration + i) for i in range(count)]
-            return vals
+            if self.only_plan is not None and count >= _MIN_COLUMNS_COUNT:
+                return self._columns(self.only_plan, iteration, count)
+            return [self._single_pass(iteration + i) for i in range(count)]
         # this is dict
-        vals = self._single_pass(iteration)  # type: ignore
+        vals = self._single_pass(iteration)
         if self.as_list:
             return [vals]
         return vals
 
     def _single_pass(self, iteration: int) -> Dict[str, Any]:
         """ get set of values for this iteration """
-        _, keys = self.key_supplier.get()
-        subset = {key: self.field_supplier_map.get(key) for key in keys}
-        if any(val is None for val in subset.values()):
+        plan = self.only_plan
+        if plan is None:
+            group, keys = self.key_supplier.get()
+            plan = self.plans.get(group)
+            if plan is None:
+                plan = self.plans[group] = self._plan(keys)
+        return {key: supplier.next(iteration) for key, supplier in plan}
+
+    @staticmethod
+    def _columns(plan: _Plan, iteration: int, count: int) -> List[Dict[str, Any]]:
+        """ count objects for consecutive iterations, generated a field at a time """
+        if not plan:
+            return [{} for _ in range(count)]
+        keys = [key for key, _ in plan]
+        columns = [supplier.next_batch(iteration, count) for _, supplier in plan]
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+
+    def _plan(self, keys: List[str]) -> _Plan:
+        """ pairs each key with its supplier """
+        if any(key not in self.field_supplier_map for key in keys):
             raise SupplierException(f'One or more keys provided in nested spec are not valid: {keys}, valid keys: '
                                     f'{list(self.field_supplier_map.keys())}')
-        return {key: supplier.next(iteration) for key, supplier in subset.items()}  # type: ignore
+        return tuple((key, self.field_supplier_map[key]) for key in keys)
@@ -59,7 +59,10 @@ def _configure_precise_ip(field_spec, _):
     sample = datacraft.utils.is_affirmative('sample', config, 'no')
     if cidr is None:
         raise datacraft.SpecException('Invalid config for: ' + json.dumps(field_spec) + ', param cidr required')
-    return datacraft.suppliers.ip_precise(cidr, sample)
+    try:
+        return datacraft.suppliers.ip_precise(cidr, sample)
+    except ValueError as err:
+        raise datacraft.SpecException(str(err)) from err
 
 
 @datacraft.registry.types(_NET_MAC_KEY)
@@ -166,8 +166,9 @@ def _configure_range_supplier_for_data(field_spec, data):
         step = 1
     else:
         step = data[2]
+    unique = datacraft.utils.is_affirmative('unique', config)
     try:
-        return datacraft.suppliers.range_supplier(start, end, step, precision=precision)
+        return datacraft.suppliers.range_supplier(start, end, step, precision=precision, unique=unique)
     except ValueError as err:
         raise datacraft.SpecException(str(err)) from err
 
@@ -260,4 +261,14 @@ def _configure_rand_range_supplier_for_data(field_spec, data):
 
     # config overrides third data element if specified
     precision = config.get('precision', precision)
+    if _is_unique_int_range(config, start, end):
+        # a random order of the whole numbers in the range never repeats, so no values need to be drawn again
+        return datacraft.suppliers.shuffled_range(start, end)
     return datacraft.suppliers.random_range(start, end, precision)
+
+
+def _is_unique_int_range(config, start, end):
+    """ if the values should be unique whole numbers from start up to end """
+    if not datacraft.utils.is_affirmative('unique', config) or config.get('cast') != 'int':
+        return False
+    return all(isinstance(bound, int) and not isinstance(bound, bool) for bound in [start, end]) and end > start
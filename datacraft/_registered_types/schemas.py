@@ -1,4 +1,5 @@
 """module for schema loading for internal registered types"""
+import functools
 import json
 import logging
 
@@ -13,9 +14,15 @@ _log = logging.getLogger(__name__)
 
 def load_resource_as_json(resource_name: str) -> dict:
     """ loads the internal json resource with the given resource_name """
+    return json.loads(_read_resource(resource_name))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_resource(resource_name: str) -> bytes:
+    """ reads the internal resource once, callers get a new dictionary each time since schemas are modified """
     try:
         with (pkg_resources.files(schema) / resource_name).open('rb') as schema_resource:
-            return json.load(schema_resource)
+            return schema_resource.read()
     except FileNotFoundError as err:
         raise ResourceError(f'No resource with name {resource_name} was found') from err
 
@@ -4,20 +4,25 @@ Module for parsing and helper functions for specs
 import copy
 import json
 import logging
-from typing import Dict, List, TypeVar, Type
-from typing import Generator
+import queue
+import threading
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TypeVar, Type, Tuple, get_type_hints
+from typing import Any, Generator, Generic, Union
 from dataclasses import dataclass, fields, MISSING, is_dataclass
 
-from . import registries
+from . import registries, frames, metrics
 from .loader import preprocess_spec, field_loader
 from .outputs import OutputHandlerInterface
 from .supplier import key_suppliers
-from .supplier.model import DataSpec, RecordProcessor
+from .supplier.model import DataSpec, RecordProcessor, ValueSupplierInterface
 from .exceptions import SpecException
 
 _log = logging.getLogger(__name__)
 
 T = TypeVar('T')
+# number of records generated between updates of the records generated metric
+_METRICS_CHUNK = 16
 
 
 def _ensure_dataclass(data_class: Type[T]):
@@ -34,32 +39,122 @@ def _ensure_dataclass(data_class: Type[T]):
         raise TypeError(f"Expected a dataclass type, got {type(data_class).__name__}")
 
 
-def _from_dict(data_class: Type[T], data: dict) -> T:
+class _ConstructorPlan(Generic[T]):
     """
-    Convert a dictionary to an instance of a given data class.
-
-    Args:
-        data_class: The data class to convert to.
-        data: The dictionary to convert.
-
-    Returns:
-        An instance of the data class populated with the data from the dictionary.
+    How to construct instances of a data class from generated values. The fields, nested data class plans, and defaults
+    are resolved once per data class, and a constructor is bound once for each set of generated keys.
     """
-    field_types = {f.name: f.type for f in fields(data_class)}  # type: ignore[arg-type]
-    kwargs = {}
-    for f in fields(data_class):  # type: ignore[arg-type]
-        if f.name in data:
-            value = data[f.name]
-            if isinstance(value, dict) and not isinstance(field_types[f.name], type):
-                value = _from_dict(field_types[f.name], value)  # type: ignore[arg-type]
-            kwargs[f.name] = value
-        elif f.default is not MISSING:
-            kwargs[f.name] = f.default
-        elif f.default_factory is not MISSING:  # For fields with default_factory
-            kwargs[f.name] = f.default_factory()
-        else:
-            raise KeyError(f"Missing required field: {f.name} for {data_class.__name__}")
-    return data_class(**kwargs)
+
+    def __init__(self, data_class: Type[T]):
+        self.data_class = data_class
+        hints = _type_hints(data_class)
+        # name, if keyword only, plan for nested data class, default, default factory
+        self.fields: List[Tuple[str, bool, Optional[_ConstructorPlan], Any, Any]] = []
+        for field in fields(data_class):  # type: ignore[arg-type]
+            if not field.init:
+                continue
+            field_type = hints.get(field.name, field.type)
+            nested = None
+            if isinstance(field_type, type) and is_dataclass(field_type):
+                nested = _constructor_plan(field_type)
+            kw_only = getattr(field, 'kw_only', False) is True
+            self.fields.append((field.name, kw_only, nested, field.default, field.default_factory))
+        self._bound: Dict[Tuple[str, ...], Callable[[Sequence], T]] = {}
+
+    def bind(self, keys: Tuple[str, ...]) -> Callable[[Sequence], T]:
+        """
+        Creates a function that constructs an instance of the data class from the values generated for the keys
+
+        Args:
+            keys: names of the generated values in order
+
+        Returns:
+            function that takes the list of values and returns the instance
+
+        Raises:
+            KeyError if a field without a default is not one of the keys
+        """
+        constructor = self._bound.get(keys)
+        if constructor is None:
+            constructor = self._bound[keys] = self._bind(keys)
+        return constructor
+
+    def from_dict(self, data: dict) -> T:
+        """
+        Convert a dictionary to an instance of the data class.
+
+        Args:
+            data: The dictionary to convert.
+
+        Returns:
+            An instance of the data class populated with the data from the dictionary.
+        """
+        return self.bind(tuple(data.keys()))(list(data.values()))
+
+    def _bind(self, keys: Tuple[str, ...]) -> Callable[[Sequence], T]:
+        index = {key: idx for idx, key in enumerate(keys)}
+        # (name or None for positional, index of value or None for default, nested plan, default, default factory)
+        sources: List[Tuple[Optional[str], Optional[int], Optional[_ConstructorPlan], Any, Any]] = []
+        for name, kw_only, nested, default, default_factory in self.fields:
+            if name in index:
+                sources.append((name if kw_only else None, index[name], nested, MISSING, MISSING))
+            elif default is not MISSING or default_factory is not MISSING:
+                sources.append((name if kw_only else None, None, None, default, default_factory))
+            else:
+                raise KeyError(f"Missing required field: {name} for {self.data_class.__name__}")
+        data_class = self.data_class
+        if all(name is None and idx is not None and nested is None for name, idx, nested, _, _ in sources):
+            indexes = [idx for _, idx, _, _, _ in sources if idx is not None]
+            if indexes == list(range(len(keys))):
+                return lambda values: data_class(*values)
+            if indexes == list(range(len(indexes))):
+                num_fields = len(indexes)
+                return lambda values: data_class(*values[:num_fields])
+            return lambda values: data_class(*[values[idx] for idx in indexes])
+
+        def construct(values):
+            args = []
+            kwargs = {}
+            for name, idx, nested, default, default_factory in sources:
+                if idx is not None:
+                    value = values[idx]
+                    if nested is not None and isinstance(value, dict):
+                        value = nested.from_dict(value)
+                elif default_factory is not MISSING:
+                    value = default_factory()
+                else:
+                    value = default
+                if name is None:
+                    args.append(value)
+                else:
+                    kwargs[name] = value
+            return data_class(*args, **kwargs)
+
+        return construct
+
+
+_plans: Dict[type, _ConstructorPlan] = {}
+
+
+def _constructor_plan(data_class: Type[T]) -> _ConstructorPlan[T]:
+    """ gets the cached plan for constructing the data class """
+    plan = _plans.get(data_class)
+    if plan is None:
+        plan = _plans[data_class] = _ConstructorPlan(data_class)
+    return plan
+
+
+def _type_hints(data_class) -> dict:
+    """ resolved field types, handles string annotations i.e. from __future__ import annotations """
+    try:
+        return get_type_hints(data_class)
+    except (NameError, TypeError):
+        return {}
+
+
+def _row_type(keys: Tuple[str, ...]):
+    """ named tuple type for rows with the given keys, keys that are not valid identifiers are renamed """
+    return namedtuple('Record', keys, rename=True)  # type: ignore[misc]
 
 
 def parse_spec(raw_spec: dict) -> DataSpec:
@@ -80,8 +175,17 @@ def parse_spec(raw_spec: dict) -> DataSpec:
         >>> spec = datacraft.parse_spec(raw_spec)
         >>> record = list(spec.generator(1))
     """
-    specs = preprocess_spec(raw_spec)
-    return _DataSpecImpl(specs)
+    spec = _DataSpecImpl(preprocess_spec(raw_spec))
+    spec.preprocessed = True
+    return spec
+
+
+def _copied_spec(raw_spec: Union[Dict[str, Dict], DataSpec]) -> '_DataSpecImpl':
+    """ copy of the spec to generate from, a parsed spec stays marked as preprocessed """
+    copied = copy.deepcopy(raw_spec)
+    if isinstance(copied, _DataSpecImpl):
+        return copied
+    return _DataSpecImpl(copied)
 
 
 def entries(raw_spec: Dict[str, Dict], iterations: int, **kwargs) -> List[dict]:
@@ -150,9 +254,7 @@ def record_entries(data_class: Type[T], raw_spec: Dict[str, Dict], iterations: i
         Entry(id='acde6f46-4692-45a7-8f0c-d0a8736c4386', timestamp='2024-07-06T17:43:36.653', handle='@vBTf71sP')
         Entry(id='4bb5542f-bf7d-4237-a972-257e24a659dd', timestamp='2024-08-01T03:06:49.724', handle='@gzfY_akS')
     """
-    _ensure_dataclass(data_class)
-    list_of_maps = entries(raw_spec, iterations, **kwargs)
-    return [_from_dict(data_class, entry) for entry in list_of_maps]
+    return list(record_generator(data_class, raw_spec, iterations, **kwargs))
 
 
 def generator(raw_spec: Dict[str, Dict], iterations: int, **kwargs) -> Generator:
@@ -175,7 +277,38 @@ def generator(raw_spec: Dict[str, Dict], iterations: int, **kwargs) -> Generator
     Returns:
         the generator for the provided spec
     """
-    return _DataSpecImpl(copy.deepcopy(raw_spec)).generator(iterations, **kwargs)
+    return _copied_spec(raw_spec).generator(iterations, **kwargs)
+
+
+def stream(raw_spec: Dict[str, Dict], iterations: int, batch_size: Optional[int] = None, prefetch: int = 0,
+           **kwargs) -> Generator[list, None, None]:
+    """
+    Creates a generator that yields lists of up to batch_size records for the raw spec. With prefetch, a background
+    thread generates up to that many batches ahead while the caller works on the previous ones, i.e. writing to a
+    database or message queue.
+
+    Args:
+        raw_spec: to create generator for
+        iterations: number of iterations before max
+        batch_size: number of records in each batch, default is stream_batch_size default
+        prefetch: number of batches to generate ahead in the background, 0 means generate each batch on demand
+
+    Keyword Args:
+        processor: (RecordProcessor): For any Record Level transformations such templating or formatters
+        output: (OutputHandlerInterface): For any field or record level output
+        data_dir (str): path the data directory with csv files and such
+        enforce_schema (bool): If schema validation should be applied where possible
+
+    Yields:
+        Lists of records or rendered template strings
+
+    Examples:
+        >>> import datacraft
+        >>> raw_spec = {"id": {"type": "uuid"}}
+        >>> for batch in datacraft.stream(raw_spec, 10_000, batch_size=1000, prefetch=2):
+        ...     cursor.executemany('INSERT INTO ids VALUES (:id)', batch)
+    """
+    return _copied_spec(raw_spec).stream(iterations, batch_size, prefetch, **kwargs)
 
 
 def record_generator(data_class: Type[T], raw_spec: Dict[str, Dict], iterations: int, **kwargs) -> Generator[
@@ -201,10 +334,62 @@ def record_generator(data_class: Type[T], raw_spec: Dict[str, Dict], iterations:
         The generator for the provided spec.
     """
     _ensure_dataclass(data_class)
+    plan = _constructor_plan(data_class)
+
+    data_spec_impl = _copied_spec(raw_spec)
+    if kwargs.get('output') is not None:
+        # output handlers need the records as dictionaries
+        kwargs.pop('processor', None)
+        for entry in data_spec_impl.generator(iterations, **kwargs):
+            yield plan.from_dict(entry)
+        return
+    # group name -> constructor for values generated for group
+    constructors: Dict[str, Callable[[Sequence], T]] = {}
+    for _, group, keys, values in data_spec_impl.rows(iterations, **kwargs):
+        constructor = constructors.get(group)
+        if constructor is None:
+            constructor = constructors[group] = plan.bind(keys)
+        yield constructor(values)
+
+
+def tuple_generator(raw_spec: Dict[str, Dict], iterations: int, named: bool = False, **kwargs) -> Generator[
+    tuple, None, None]:
+    """
+    Creates a generator that yields each record as a tuple of the values in the order of the fields in the spec, or
+    in the order of the field group being generated. This skips building a dictionary for each record.
 
-    data_spec_impl = _DataSpecImpl(copy.deepcopy(raw_spec))
-    for entry in data_spec_impl.generator(iterations, **kwargs):
-        yield _from_dict(data_class, entry)
+    Args:
+        raw_spec: Specification to create generator for.
+        iterations: Number of iterations before max.
+        named: if the tuples should be named tuples with the field names as attributes
+
+    Keyword Args:
+        data_dir (str): Path to the data directory with CSV files and such.
+        enforce_schema (bool): If schema validation should be applied where possible.
+
+    Yields:
+        tuple of the values for each record
+
+    Examples:
+        >>> import datacraft
+        >>> raw_spec = {"id": {"type": "values", "data": [1, 2]}, "name": {"type": "values", "data": ["a", "b"]}}
+        >>> list(datacraft.tuple_generator(raw_spec, 2))
+        [(1, 'a'), (2, 'b')]
+        >>> list(datacraft.tuple_generator(raw_spec, 2, named=True))
+        [Record(id=1, name='a'), Record(id=2, name='b')]
+    """
+    data_spec_impl = _copied_spec(raw_spec)
+    if not named:
+        for _, _, _, values in data_spec_impl.rows(iterations, **kwargs):
+            yield tuple(values)
+        return
+    # group name -> named tuple type for group
+    row_types: Dict[str, Callable] = {}
+    for _, group, keys, values in data_spec_impl.rows(iterations, **kwargs):
+        row_type = row_types.get(group)
+        if row_type is None:
+            row_type = row_types[group] = _row_type(keys)._make
+        yield row_type(values)
 
 
 def values_for(field_spec: Dict[str, Dict], iterations: int, **kwargs) -> List[dict]:
@@ -242,34 +427,89 @@ def values_for(field_spec: Dict[str, Dict], iterations: int, **kwargs) -> List[d
     return [r['temp'] for r in records]
 
 
+def _processor_and_output(kwargs: dict) -> Tuple[Optional[RecordProcessor], Optional[OutputHandlerInterface]]:
+    """ validated processor and output from the generator keyword args """
+    processor = kwargs.get('processor', None)
+    if processor is not None and not isinstance(processor, RecordProcessor):
+        raise TypeError(f"Expected a RecordProcessor, got {type(processor).__name__}")
+    output = kwargs.get('output', None)
+    if output is not None and not isinstance(output, OutputHandlerInterface):
+        raise TypeError(f"Expected a OutputHandlerInterface, got {type(output).__name__}")
+    return processor, output
+
+
+_END = object()
+
+
+def _prefetched(items: Iterator[T], prefetch: int) -> Generator[T, None, None]:
+    """
+    Yields the items while a background thread produces up to prefetch items ahead. Errors raised while producing
+    are raised again in the consumer. The producer stops if the consumer closes the generator.
+    """
+    produced: queue.Queue = queue.Queue(maxsize=prefetch)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                produced.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as err:  # pylint: disable=broad-except
+            put(_ProducerError(err))
+            return
+        put(_END)
+
+    producer = threading.Thread(target=produce, name='datacraft-prefetch', daemon=True)
+    producer.start()
+    untrack = metrics.queue_depth.track(produced.qsize, queue='prefetch')
+    try:
+        while True:
+            item = produced.get()
+            if item is _END:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        untrack()
+        stopped.set()
+        producer.join()
+
+
+class _ProducerError:
+    """ holds the error raised by the producer thread """
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _first_values(loader, keys: List[str], iteration: int, bound: list) -> list:
+    """ generates the values for the first use of a group, recording the supplier for each key in bound """
+    # all the suppliers are built first, so refs shared by the keys are known to be shared before any values are made
+    bound.extend(loader.get(key) for key in keys)
+    return [supplier.next(iteration) for supplier in bound]
+
+
 class _DataSpecImpl(DataSpec):
     """ Implementation for DataSpec """
 
     def generator(self, iterations: int, **kwargs):
-        processor = kwargs.get('processor', None)
-        if processor is not None and not isinstance(processor, RecordProcessor):
-            raise TypeError(f"Expected a RecordProcessor, got {type(processor).__name__}")
-        data_dir = kwargs.get('data_dir', registries.get_default('data_dir'))
-        enforce_schema = kwargs.get('enforce_schema', False)
+        processor, output = _processor_and_output(kwargs)
         exclude_internal = kwargs.get('exclude_internal', False)
-        output = kwargs.get('output', None)
-        if output is not None and not isinstance(output, OutputHandlerInterface):
-            raise TypeError(f"Expected a OutputHandlerInterface, got {type(output).__name__}")
 
-        loader = field_loader(self.raw_spec, data_dir=data_dir, enforce_schema=enforce_schema)
-
-        key_provider = key_suppliers.from_spec(loader.spec)
-
-        for i in range(0, iterations):
-            group, keys = key_provider.get()
-            record = {}
-            for key in keys:
-                value = loader.get(key).next(i)
-                if output:
-                    output.handle(key, value)
-                record[key] = value
+        for i, group, keys, values in self.rows(iterations, **kwargs):
+            record = dict(zip(keys, values))
             if output:
-                output.finished_record(i, group, exclude_internal)
+                output.handle_record(i, group, record, exclude_internal)
                 if i == iterations - 1:
                     output.finished_iterations()
             if processor is not None:
@@ -277,11 +517,86 @@ class _DataSpecImpl(DataSpec):
             else:
                 yield record
 
-    def to_pandas(self, iterations):
+    def stream(self, iterations: int, batch_size: Optional[int] = None, prefetch: int = 0, **kwargs):
+        processor, output = _processor_and_output(kwargs)
+        exclude_internal = kwargs.get('exclude_internal', False)
+        if batch_size is None:
+            batch_size = int(registries.get_default('stream_batch_size'))
+        if batch_size <= 0:
+            raise ValueError(f'batch_size must be positive, got {batch_size}')
+
+        batches = self._batches(iterations, batch_size, **kwargs)
+        if prefetch > 0:
+            batches = _prefetched(batches, prefetch)
+        for batch in batches:
+            if output:
+                output.handle_batch(batch, exclude_internal)
+            if processor is not None:
+                yield [processor.process(record) for _, _, record in batch]
+            else:
+                yield [record for _, _, record in batch]
+        if output and iterations > 0:
+            output.finished_iterations()
+
+    def _batches(self,
+                 iterations: int,
+                 batch_size: int,
+                 **kwargs) -> Generator[List[Tuple[int, str, dict]], None, None]:
+        """ generates lists of iteration, group, and record for batch_size records at a time """
+        batch = []
+        for i, group, keys, values in self.rows(iterations, **kwargs):
+            batch.append((i, group, dict(zip(keys, values))))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def rows(self, iterations: int, **kwargs) -> Generator[Tuple[int, str, Tuple[str, ...], list], None, None]:
+        """
+        Generates the values for each record without building the record
+
+        Args:
+            iterations: number of iterations to execute
+
+        Keyword Args:
+            data_dir (str): path the data directory with csv files and such
+            enforce_schema (bool): If schema validation should be applied where possible
+
+        Yields:
+            iteration, field group name, keys for the group, and the list of values for the keys
+        """
+        data_dir = kwargs.get('data_dir', registries.get_default('data_dir'))
+        enforce_schema = kwargs.get('enforce_schema', False)
+        loader = field_loader(self, data_dir=data_dir, enforce_schema=enforce_schema)
+
+        key_provider = key_suppliers.from_spec(loader.spec)
+        # group name -> keys and suppliers for the group, resolved on first use of the group
+        groups: Dict[str, Tuple[Tuple[str, ...], List[ValueSupplierInterface]]] = {}
+
+        # records are added to the metrics a chunk at a time to keep the cost per record down, or when they are read
+        pending = metrics.records_generated.track()
         try:
-            import pandas  # type: ignore
-        except ModuleNotFoundError:
-            _log.error('pandas not installed, please pip/conda install pandas to allow conversion')
-            return None
-        records = list(self.generator(iterations))
-        return pandas.json_normalize(records)
+            for i in range(0, iterations):
+                group, keys = key_provider.get()
+                plan = groups.get(group)
+                if plan is None:
+                    group_suppliers: List[ValueSupplierInterface] = []
+                    values = _first_values(loader, keys, i, group_suppliers)
+                    group_keys = tuple(keys)
+                    groups[group] = (group_keys, group_suppliers)
+                else:
+                    group_keys, group_suppliers = plan
+                    values = [supplier.next(i) for supplier in group_suppliers]
+                pending.produced = i + 1
+                yield i, group, group_keys, values
+                if pending.produced - pending.counted >= _METRICS_CHUNK:
+                    metrics.records_generated.flush(pending)
+        finally:
+            metrics.records_generated.untrack(pending)
+
+    def to_pandas(self, iterations: int, chunk_size: Optional[int] = None, **kwargs):
+        return frames.to_pandas(self, iterations, chunk_size, **kwargs)
+
+    def to_arrow(self, iterations: int, chunk_size: Optional[int] = None, **kwargs):
+        return frames.to_arrow(self, iterations, chunk_size, **kwargs)
@@ -174,6 +174,20 @@ def get(name):
     return _MultiCaster(casters)
 
 
+def is_builtin(name) -> bool:
+    """
+    Checks if all of the casters for the name are builtin ones
+
+    Args:
+        name: of caster or casters, i.e. "trim;lower"
+
+    Returns:
+        True if all casters are builtin, False if any are custom registered casters
+    """
+    names = name if isinstance(name, list) else str(name).split(";")
+    return all(caster_name in _CASTER_MAP for caster_name in names)
+
+
 def all_names():
     """gets the unique set of all casters registered and builtin"""
     names = [
@@ -4,6 +4,7 @@ Entry point for datacraft tool
 import argparse
 import os
 import re
+import sqlite3
 import sys
 import json
 import logging
@@ -102,6 +103,39 @@ def parseargs(argv):
                         help='Path to template to populate, or template inline as a string')
     parser.add_argument('-r', '--records-per-file', dest='records_per_file', default=None, type=int,
                         help='Number of records to place in each iteration, default is all')
+    parser.add_argument('--batch-size', dest='batch_size', type=int,
+                        default=registries.get_default('stream_batch_size'),
+                        help='Number of records to generate and output at a time')
+    parser.add_argument('--prefetch', type=int, default=registries.get_default('stream_prefetch'),
+                        help='Number of batches to generate ahead in the background while output is written')
+    parser.add_argument('--partition-by', dest='partition_by', metavar='FIELD', nargs='+',
+                        help='Write records into key=value directories by the values of these fields, use name:N for '
+                             'the first N characters of the value, or _field_group for the name of the field group')
+    parser.add_argument('--max-open-files', dest='max_open_files', type=int,
+                        default=registries.get_default('max_open_files'),
+                        help='Max number of partition files to have open at once')
+    parser.add_argument('--sqlite', metavar='DB_FILE',
+                        help='Insert records into a table in this SQLite database file instead of writing them out')
+    parser.add_argument('--table', default='data',
+                        help='Name of table to insert records into, created if it does not exist, default is data')
+    parser.add_argument('--db-pool-size', dest='db_pool_size', type=int, default=1,
+                        help='Number of database connections to insert batches of records with in parallel')
+    parser.add_argument('--max-file-size', dest='max_file_size', type=_size, metavar='SIZE',
+                        help='Write records to files of at most this size i.e. 256MB, one record per line, each file '
+                             'gets the next unused number so multiple processes can share an output directory')
+    parser.add_argument('--rate', type=_rate, metavar='RATE',
+                        help='Generate records at this rate i.e. 5000/s, 300/m, or 10/h, batches are made small enough '
+                             'to be written out smoothly at the rate')
+    parser.add_argument('--rate-profile', dest='rate_profile', metavar='DIST',
+                        help='Distribution sampled each second for the multiplier of the --rate i.e. '
+                             '"diurnal(low=0.2, high=1.5, period=86400)" or "spikes(height=5, every=600, length=30)"')
+    parser.add_argument('--rate-burst', dest='rate_burst', type=float, metavar='N',
+                        help='Max records to generate at once to catch up after falling behind the --rate, default is '
+                             'a tenth of a second of records')
+    parser.add_argument('--progress', type=float, nargs='?', metavar='SECONDS',
+                        const=registries.get_default('progress_interval'),
+                        help='Write a JSON line with the records generated, records per second, bytes written, and '
+                             'queue depths to stderr every SECONDS, default is every 10 seconds')
     parser.add_argument('-k', '--printkey', action='store_true',
                         help='When printing to stdout field name should be printed along with value')
     parser.add_argument('-c', '--code', nargs='+',
@@ -123,6 +157,8 @@ def parseargs(argv):
                              help='Debug spec after internal reformatting')
     debug_group.add_argument('--debug-spec-yaml', dest='debug_spec_yaml', action='store_true',
                              help='Debug spec after internal reformatting, write out as yaml')
+    debug_group.add_argument('--debug-plan', dest='debug_plan', action='store_true',
+                             help='Write out the optimized supplier plan for the spec, shows constants and unused keys')
     debug_group.add_argument('--debug-defaults', dest='debug_defaults', action='store_true',
                              help='List default values from registry after any external code loading')
     debug_group.add_argument('--type-list', dest='type_list', action='store_true',
@@ -171,13 +207,33 @@ def parseargs(argv):
     return args
 
 
-def process_args(args):
+def _size(value: str) -> int:
+    """ argparse type for sizes with units """
+    try:
+        size = utils.parse_size(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f'size must be positive, got {value}')
+    return size
+
+
+def _rate(value: str) -> float:
+    """ argparse type for rates with units of time """
+    try:
+        return utils.parse_rate(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+
+
+def process_args(args, batched: bool = False):
     """
     Processes the command line args and either writes out various artifacts such as config or interpolated specs,
     or creates the generator from the provided args.
 
     Args:
         args: from parsargs
+        batched: if the generator should yield batches of records
 
     Returns:
         The constructed record generator or None
@@ -254,6 +310,12 @@ def process_args(args):
         writer.write(spec_formatters.format_yaml(raw_spec))
         return None
 
+    if args.debug_plan:
+        writer = _get_writer(args)
+        plan = loader.generation_plan(spec, data_dir=args.datadir, enforce_schema=args.strict)
+        writer.write(json.dumps(plan, indent=4, default=str))
+        return None
+
     # apply the spec as data to the template
     if args.apply_raw:
         engine = template_engines.for_file(args.template)
@@ -264,9 +326,37 @@ def process_args(args):
         writer.write(engine.process(spec))
         return None
 
+    if batched:
+        return stream_for_spec(args, spec)
     return generator_for_spec(args, spec)
 
 
+def stream_for_spec(args, spec):
+    """
+    Creates a generator that yields batches of records for the spec, with output handled as each batch is consumed
+
+    Args:
+        args: from parseargs
+        spec: to generate records for
+
+    Returns:
+        generator of batches of records
+    """
+    processor = outputs.processor(args.template, args.format)
+    writer = _get_writer(args)
+    output = _get_output(args, processor, writer)
+    return builder.stream(
+        spec,
+        args.iterations,
+        batch_size=args.batch_size,
+        prefetch=args.prefetch,
+        enforce_schema=args.strict,
+        data_dir=args.datadir,
+        exclude_internal=args.exclude_internal,
+        output=output,
+        processor=processor)
+
+
 def generator_for_spec(args, spec):
     ###################
     # Regular Flow
@@ -322,6 +412,30 @@ def _get_writer(args):
 
 def _get_output(args, processor, writer):
     """ get the output from the args, processor, and writer """
+    if args.sqlite:
+        return outputs.database(lambda: sqlite3.connect(args.sqlite),
+                                args.table,
+                                batch_size=args.batch_size,
+                                pool_size=args.db_pool_size)
+    if args.max_file_size is not None:
+        if not args.outdir or not processor:
+            raise SpecException('--max-file-size requires an output directory and a format or template')
+        if args.records_per_file is not None:
+            raise SpecException('Only one of --max-file-size or --records-per-file should be specified')
+        return outputs.size_rolling(processor,
+                                    args.outdir,
+                                    args.max_file_size,
+                                    outfile_prefix=args.outfile_prefix,
+                                    extension=args.outfile_extension)
+    if args.partition_by:
+        if not args.outdir or not processor:
+            raise SpecException('--partition-by requires an output directory and a format or template')
+        return outputs.partitioned(processor,
+                                   args.outdir,
+                                   args.partition_by,
+                                   outfile_prefix=args.outfile_prefix,
+                                   extension=args.outfile_extension,
+                                   max_open_files=args.max_open_files)
     if processor:
         records_per_file = args.records_per_file
         if records_per_file is None:
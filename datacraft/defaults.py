@@ -58,6 +58,12 @@ def _default_date_duration_days():
     return 30
 
 
+@registries.Registry.defaults('date_step_seconds')
+def _default_date_step_seconds():
+    """ default seconds between monotonic dates """
+    return 1
+
+
 @registries.Registry.defaults('geo_precision')
 def _default_geo_type_precision():
     """ default digits after decimal for geo types """
@@ -76,6 +82,24 @@ def _default_large_csv_size():
     return _LARGE_CSV_SIZE_MB
 
 
+@registries.Registry.defaults('shared_reference_data')
+def _default_shared_reference_data():
+    """ default if csv, weighted csv, and large values data should be shared across processes """
+    return False
+
+
+@registries.Registry.defaults('shared_values_min_size')
+def _default_shared_values_min_size():
+    """ default minimum number of values in a list before it will be shared across processes """
+    return 10000
+
+
+@registries.Registry.defaults('weighted_csv_cache_dir')
+def _default_weighted_csv_cache_dir():
+    """ default directory to cache parsed weighted_csv columns in, None means no caching to disk """
+    return None
+
+
 @registries.Registry.defaults('data_dir')
 def _default_data_dir():
     """ default location for data directory """
@@ -140,3 +164,63 @@ def _default_uuid_variant():
 def _default_format_json_ascii():
     """ if the JSON formatted data should be ascii """
     return False
+
+
+@registries.Registry.defaults('frame_chunk_size')
+def _default_frame_chunk_size():
+    """ number of records to convert at a time for to_pandas and to_arrow """
+    return 10000
+
+
+@registries.Registry.defaults('stream_batch_size')
+def _default_stream_batch_size():
+    """ number of records in each batch when streaming """
+    return 1000
+
+
+@registries.Registry.defaults('stream_prefetch')
+def _default_stream_prefetch():
+    """ number of batches to generate ahead in the background when streaming """
+    return 0
+
+
+@registries.Registry.defaults('db_batch_size')
+def _default_db_batch_size():
+    """ number of records to insert at a time for database outputs """
+    return 1000
+
+
+@registries.Registry.defaults('max_open_files')
+def _default_max_open_files():
+    """ max number of files to have open at once for partitioned output """
+    return 64
+
+
+@registries.Registry.defaults('cache_shared_refs')
+def _default_cache_shared_refs():
+    """ if refs used by more than one field or ref should produce one value per record """
+    return False
+
+
+@registries.Registry.defaults('pool_cache_size')
+def _default_pool_cache_size():
+    """ max number of record pools to keep in memory and in each pool directory """
+    return 8
+
+
+@registries.Registry.defaults('rate_log_interval')
+def _default_rate_log_interval():
+    """ seconds between logs of the throughput when generating at a rate """
+    return 10
+
+
+@registries.Registry.defaults('progress_interval')
+def _default_progress_interval():
+    """ seconds between progress lines for --progress """
+    return 10
+
+
+@registries.Registry.defaults('unique_retries')
+def _default_unique_retries():
+    """ number of times to draw again for a value that was already generated for a unique field """
+    return 1000
@@ -2,9 +2,11 @@
 Module for numeric distributions such as uniform or gaussian
 """
 from typing import Union
+import math
 import random
 import inspect
 import logging
+import time
 
 from . import registries
 from .supplier.model import Distribution
@@ -44,6 +46,49 @@ class GaussDistribution(Distribution):
         return random.gauss(self.mean, self.stddev)
 
 
+class ExponentialDistribution(Distribution):
+    """Class that samples values from an exponential distribution with the provided rate, i.e. Poisson arrivals """
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: average number of events per unit, mean of distribution is 1 / rate
+        """
+        self.rate = rate
+
+    def next_value(self):
+        return random.expovariate(self.rate)
+
+
+class MonotonicDistribution(Distribution):
+    """Class that produces strictly increasing values, each one step from the last """
+
+    def __init__(self,
+                 start: float,
+                 step: Distribution,
+                 jitter: float = 0.0,
+                 min_step: float = 1e-6):
+        """
+        Args:
+            start: first value to return
+            step: distribution for the distance between consecutive values
+            jitter: max amount to randomly add or subtract from each step
+            min_step: smallest step to take, steps at or below zero are replaced with this
+        """
+        self.current = start
+        self.step = step
+        self.jitter = jitter
+        self.min_step = min_step
+
+    def next_value(self):
+        value = self.current
+        step = self.step.next_value()
+        if self.jitter:
+            step += random.uniform(-self.jitter, self.jitter)
+        self.current += step if step > 0 else self.min_step
+        return value
+
+
 class BoundedDistribution(Distribution):
     """Class bounds another distribution """
 
@@ -70,6 +115,47 @@ class BoundedDistribution(Distribution):
         return value
 
 
+class DiurnalDistribution(Distribution):
+    """Class that follows a cosine curve over time from low up to high and back to low, once per period """
+
+    def __init__(self, low: float, high: float, period: float):
+        """
+        Args:
+            low: value at the start and end of each period
+            high: value in the middle of each period
+            period: length of each cycle in seconds
+        """
+        self.low = low
+        self.high = high
+        self.period = period
+        self.start = time.monotonic()
+
+    def next_value(self):
+        elapsed = time.monotonic() - self.start
+        return self.low + (self.high - self.low) * (1 - math.cos(2 * math.pi * elapsed / self.period)) / 2
+
+
+class SpikeDistribution(Distribution):
+    """Class that returns 1 except for spikes of height that last length seconds once every period seconds """
+
+    def __init__(self, height: float, every: float, length: float):
+        """
+        Args:
+            height: value during a spike
+            every: seconds from the start of one spike to the start of the next
+            length: seconds each spike lasts
+        """
+        self.height = height
+        self.every = every
+        self.length = length
+        self.start = time.monotonic()
+
+    def next_value(self):
+        elapsed = time.monotonic() - self.start
+        # spikes come at the end of each period so there is a normal stretch first
+        return self.height if elapsed % self.every >= self.every - self.length else 1.0
+
+
 @registries.Registry.distribution('uniform')
 def uniform(start, end):
     """ uniform distribution for from start to end """
@@ -94,6 +180,42 @@ def gaussian(mean, stddev, **kwargs):
     return _gaussian_distribution(mean, stddev, **kwargs)
 
 
+@registries.Registry.distribution('exponential')
+def exponential(rate, **kwargs):
+    """ exponential distribution for the given rate """
+    distribution = ExponentialDistribution(rate)
+    if 'min' in kwargs or 'max' in kwargs:
+        return BoundedDistribution(distribution, kwargs.get('min'), kwargs.get('max'))
+    return distribution
+
+
+@registries.Registry.distribution('diurnal')
+def diurnal(low, high, period):
+    """ cosine curve over time from low to high and back each period seconds """
+    return DiurnalDistribution(low, high, period)
+
+
+@registries.Registry.distribution('spikes')
+def spikes(height, every, length):
+    """ 1 except for spikes of height lasting length seconds every so many seconds """
+    return SpikeDistribution(height, every, length)
+
+
+def monotonic(start: float, step: Distribution, jitter: float = 0.0) -> Distribution:
+    """
+    Distribution that produces strictly increasing values starting at start
+
+    Args:
+        start: first value
+        step: distribution for distance between consecutive values
+        jitter: max amount to randomly add or subtract from each step
+
+    Returns:
+        the monotonic distribution
+    """
+    return MonotonicDistribution(start, step, jitter)
+
+
 def _gaussian_distribution(mean, stddev, **kwargs):
     """ normal distribution for mean and standard deviation """
     distribution = GaussDistribution(mean, stddev)
@@ -0,0 +1,207 @@
+"""
+Module for converting generated records into column oriented data frames. Values are gathered column by column one
+chunk of records at a time, so the full list of records is never built. Nested fields are flattened into columns
+named with the dotted path to the value i.e. user.address.zip.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import registries
+
+_log = logging.getLogger(__name__)
+
+
+def to_pandas(data_spec, iterations: int, chunk_size: Optional[int] = None, **kwargs):
+    """
+    Converts iterations number of records into a pandas DataFrame. Missing values are NaN, the same as
+    pandas.json_normalize.
+
+    Args:
+        data_spec: with rows function to generate values from
+        iterations: number of iterations to run / records to generate
+        chunk_size: number of records to generate before converting the values to typed columns
+
+    Keyword Args:
+        data_dir (str): path the data directory with csv files and such
+        enforce_schema (bool): If schema validation should be applied where possible
+
+    Returns:
+        DataFrame with records as rows, None if pandas is not installed
+    """
+    try:
+        import numpy  # type: ignore
+        import pandas  # type: ignore
+    except ModuleNotFoundError:
+        _log.error('pandas not installed, please pip/conda install pandas to allow conversion')
+        return None
+
+    def to_series(values: list):
+        return pandas.Series(values)
+
+    columns = _generate_columns(data_spec, iterations, chunk_size, to_series, numpy.nan, **kwargs)
+    if not columns:
+        return pandas.DataFrame(index=range(iterations))
+    frame_columns = {}
+    for name in list(columns.keys()):
+        chunks = columns.pop(name)
+        if len(chunks) == 1:
+            frame_columns[name] = chunks[0]
+        else:
+            column = pandas.concat(chunks, ignore_index=True)
+            if column.dtype == object and len({chunk.dtype for chunk in chunks}) > 1:
+                # chunks that were all missing values do not have the type of the other chunks
+                column = column.infer_objects()
+            frame_columns[name] = column
+        # release the chunks for this column before combining the next one
+        del chunks
+    return pandas.DataFrame(frame_columns, copy=False)
+
+
+def to_arrow(data_spec, iterations: int, chunk_size: Optional[int] = None, **kwargs):
+    """
+    Converts iterations number of records into a pyarrow Table. Each chunk of records becomes one chunk of the columns
+    in the table, so the columns are never copied. Missing values are null.
+
+    Args:
+        data_spec: with rows function to generate values from
+        iterations: number of iterations to run / records to generate
+        chunk_size: number of records to generate before converting the values to arrow arrays
+
+    Keyword Args:
+        data_dir (str): path the data directory with csv files and such
+        enforce_schema (bool): If schema validation should be applied where possible
+
+    Returns:
+        Table with records as rows, None if pyarrow is not installed
+    """
+    try:
+        import pyarrow  # type: ignore
+    except ModuleNotFoundError:
+        _log.error('pyarrow not installed, please pip/conda install pyarrow to allow conversion')
+        return None
+
+    columns = _generate_columns(data_spec, iterations, chunk_size, pyarrow.array, None, **kwargs)
+    names = list(columns.keys())
+    arrays = [_unify_chunks(pyarrow, columns.pop(name)) for name in names]
+    return pyarrow.Table.from_arrays(arrays, names=names)
+
+
+def _generate_columns(data_spec,
+                      iterations: int,
+                      chunk_size: Optional[int],
+                      convert: Callable[[list], Any],
+                      missing: Any,
+                      **kwargs) -> Dict[str, list]:
+    """
+    Generates the records and converts them column wise a chunk at a time
+
+    Args:
+        data_spec: with rows function to generate values from
+        iterations: number of records to generate
+        chunk_size: number of records per chunk
+        convert: function to convert the list of values for a column in a chunk into a typed array
+        missing: value to use when a record does not have a value for a column
+
+    Returns:
+        dictionary of column name to list of converted chunks for the column, in the order the columns were first seen
+    """
+    if chunk_size is None:
+        chunk_size = int(registries.get_default('frame_chunk_size'))
+    if chunk_size <= 0:
+        raise ValueError(f'chunk_size must be positive, got {chunk_size}')
+    columns: Dict[str, list] = {}
+    rows_done = 0
+    # column name -> values for current chunk
+    current: Dict[str, list] = {}
+    # (prefix, key) -> column name for nested values
+    path_names: Dict[Tuple[str, str], str] = {}
+    row = 0
+    chunk_len = min(chunk_size, iterations)
+    for _, _, keys, values in data_spec.rows(iterations, **kwargs):
+        nested = None
+        for key, value in zip(keys, values):
+            if isinstance(value, dict):
+                if nested is None:
+                    nested = []
+                nested.append((key, value))
+            else:
+                _column(current, key, chunk_len, missing)[row] = value
+        if nested is not None:
+            # nested values come after the top level values, the same as pandas.json_normalize
+            for key, value in nested:
+                _flatten(key, value, current, row, chunk_len, missing, path_names)
+        row += 1
+        if row == chunk_len:
+            _finish_chunk(columns, current, convert, rows_done, chunk_len, missing)
+            rows_done += chunk_len
+            row = 0
+            chunk_len = min(chunk_size, iterations - rows_done)
+    return columns
+
+
+def _column(current: Dict[str, list], name: str, chunk_len: int, missing: Any) -> list:
+    """ gets the values for the named column in the current chunk """
+    column = current.get(name)
+    if column is None:
+        column = current[name] = [missing] * chunk_len
+    return column
+
+
+def _flatten(prefix: str,
+             value: dict,
+             current: Dict[str, list],
+             row: int,
+             chunk_len: int,
+             missing: Any,
+             path_names: Dict[Tuple[str, str], str]):
+    """ sets the values for the nested dictionary in the columns named by the path to each value """
+    for key, nested_value in value.items():
+        name = path_names.get((prefix, key))
+        if name is None:
+            name = path_names[(prefix, key)] = f'{prefix}.{key}'
+        if isinstance(nested_value, dict):
+            _flatten(name, nested_value, current, row, chunk_len, missing, path_names)
+        else:
+            _column(current, name, chunk_len, missing)[row] = nested_value
+
+
+def _finish_chunk(columns: Dict[str, list],
+                  current: Dict[str, list],
+                  convert: Callable[[list], Any],
+                  rows_done: int,
+                  chunk_len: int,
+                  missing: Any):
+    """ converts the values for the chunk and adds them to the columns, columns not in the chunk get missing values """
+    for name, values in current.items():
+        chunks = columns.get(name)
+        if chunks is None:
+            chunks = columns[name] = []
+            if rows_done > 0:
+                # column first seen in this chunk, previous chunks had no values for it
+                chunks.append(convert([missing] * rows_done))
+        chunks.append(convert(values))
+    for name, chunks in columns.items():
+        if name not in current:
+            chunks.append(convert([missing] * chunk_len))
+    current.clear()
+
+
+def _unify_chunks(pyarrow, chunks: List[Any]):
+    """ creates a chunked array from the arrow arrays, casting them to a common type if needed """
+    types = {chunk.type for chunk in chunks}
+    if len(types) > 1:
+        target = _common_type(pyarrow, types)
+        chunks = [chunk if chunk.type == target else chunk.cast(target) for chunk in chunks]
+    return pyarrow.chunked_array(chunks)
+
+
+def _common_type(pyarrow, types: set):
+    """ type all the chunks can be cast to, nulls take on the other type and mixed numbers become floats """
+    types = {arrow_type for arrow_type in types if not pyarrow.types.is_null(arrow_type)}
+    if len(types) == 1:
+        return types.pop()
+    if all(pyarrow.types.is_integer(arrow_type) or pyarrow.types.is_floating(arrow_type) for arrow_type in types):
+        if all(pyarrow.types.is_integer(arrow_type) for arrow_type in types):
+            return pyarrow.int64()
+        return pyarrow.float64()
+    return pyarrow.string()
@@ -5,17 +5,26 @@ delegating the handling of various data types.
 
 import json
 import logging
-from typing import Any, Dict, Union
+import re
+from typing import Any, Dict, List, Optional, Set, Union
 from abc import ABC, abstractmethod
 
-from . import utils, suppliers, preprocessor, spec_formatters
+from . import utils, suppliers, preprocessor, spec_formatters, casters
 from .exceptions import SpecException
+from .supplier import key_suppliers
+from .supplier.common import SingleValue, RecordCachedSupplier
 from .supplier.model import DataSpec, ValueSupplierInterface
-from .schemas import validate_schema_for_spec
-from .registries import lookup_type, lookup_schema, Registry
+from .schemas import validate_spec_for_type
+from .registries import lookup_type, get_default, Registry
 
 _log = logging.getLogger(__name__)
 
+# types whose value is only a function of the values of the fields or refs they use
+_DERIVED_TYPES = {'templated': 'data', 'calculate': 'formula'}
+# config params that make each value differ even if the underlying supplier is constant
+_VARYING_CONFIG = ['count', 'count_dist', 'buffer', 'buffer_size', 'unique']
+_TEMPLATE_EXPRESSIONS = re.compile(r'{{(.*?)}}|{%(.*?)%}', re.DOTALL)
+
 
 class Refs:
     """Holder object for references """
@@ -108,12 +117,21 @@ class _LoaderImpl(Loader):
     """Field loader implementation """
 
     def __init__(self, data_spec, data_dir='./data', enforce_schema=False):
-        raw_spec = utils.get_raw_spec(data_spec)
-        self.specs = preprocess_spec(raw_spec)
+        self.specs = preprocess_spec(data_spec)
         self.datadir = data_dir
         self.enforce_schema = enforce_schema
         self.cache = {}
         self.refs = Refs(self.specs.get('refs'))
+        # key -> keys of the fields or refs it was built from
+        self.dependencies: Dict[str, List[str]] = {}
+        self._building: List[str] = []
+        # ids of the field specs being loaded, the innermost one is what uses any ref it gets, i.e. a nested field
+        self._specs_building: List[int] = []
+        # ref key -> ids of the field specs that use the ref, only tracked if refs with more than one user should be
+        # cached per record
+        self.consumers: Optional[Dict[str, Set[int]]] = None
+        if utils.is_affirmative('cache_shared_refs', {'cache_shared_refs': get_default('cache_shared_refs')}):
+            self.consumers = {}
 
     @property
     def spec(self):
@@ -132,18 +150,42 @@ class _LoaderImpl(Loader):
         Raises:
             SpecException if key not found
         """
+        parent = self._building[-1] if self._building else None
+        if parent is not None and key not in self.dependencies[parent]:
+            self.dependencies[parent].append(key)
+        consumer = self._specs_building[-1] if self._specs_building else None
         if key in self.cache:
-            return self.cache[key]
+            supplier = self.cache[key]
+            self._add_consumer(key, consumer, supplier)
+            return supplier
 
         field_spec = self.specs.get(key)
         if field_spec is None:
             field_spec = self.refs.get(key)
         if field_spec is None:
             raise SpecException("No key " + key + " found in specs")
-        supplier = self.get_from_spec(field_spec)
+        self.dependencies.setdefault(key, [])
+        self._building.append(key)
+        try:
+            supplier = self.get_from_spec(field_spec)
+        finally:
+            self._building.pop()
+        if self.consumers is not None and key not in self.specs and not isinstance(supplier, SingleValue):
+            # only starts caching once a second field or ref uses it
+            supplier = RecordCachedSupplier(supplier, caching=False)
         self.cache[key] = supplier
+        self._add_consumer(key, consumer, supplier)
         return supplier
 
+    def _add_consumer(self, key: str, consumer: Optional[int], supplier: ValueSupplierInterface):
+        """ records that the field spec uses the ref, turns on caching for refs used by more than one field spec """
+        if self.consumers is None or consumer is None or not isinstance(supplier, RecordCachedSupplier):
+            return
+        users = self.consumers.setdefault(key, set())
+        users.add(consumer)
+        if len(users) > 1:
+            supplier.caching = True
+
     def get_from_spec(self, field_spec: Any) -> ValueSupplierInterface:
         """
         Retrieve the value supplier for the given field spec
@@ -157,6 +199,14 @@ class _LoaderImpl(Loader):
         Raises:
             SpecException if unable to resolve the spec with appropriate handler for the type
         """
+        self._specs_building.append(id(field_spec))
+        try:
+            return self._load_spec(field_spec)
+        finally:
+            self._specs_building.pop()
+
+    def _load_spec(self, field_spec: Any) -> ValueSupplierInterface:
+        """ creates the supplier for the field spec """
         if isinstance(field_spec, list):
             spec_type = None
         elif isinstance(field_spec, dict):
@@ -169,20 +219,26 @@ class _LoaderImpl(Loader):
             raise SpecException(f'Cannot use config_ref as source of data: {json.dumps(field_spec)}')
         if spec_type is None:
             if self.enforce_schema:
-                _validate_schema_for_spec('values', field_spec)
+                validate_spec_for_type('values', field_spec)
             supplier = suppliers.values(field_spec)
         else:
             handler = lookup_type(spec_type)
             if handler is None:
                 raise SpecException('Unable to load handler for: ' + json.dumps(field_spec))
             if self.enforce_schema:
-                _validate_schema_for_spec(spec_type, field_spec)
+                validate_spec_for_type(spec_type, field_spec)
             supplier = handler(field_spec, self)
         config = field_spec.get('config', {})
         # special case
         if spec_type == 'nested':
-            return supplier
-        return suppliers.alter(supplier, **config)
+            return _cached_if_configured(_unique_if_configured(supplier, supplier, config), config)
+        altered = suppliers.alter(supplier, **config)
+        if _is_constant(spec_type, field_spec, supplier, config):
+            if isinstance(altered, SingleValue):
+                return altered
+            # fold derived values and alterations of a constant into a new constant
+            return SingleValue(altered.next(0))
+        return _cached_if_configured(_unique_if_configured(supplier, altered, config), config)
 
     def get_ref(self, key: str) -> dict:
         """
@@ -197,12 +253,48 @@ class _LoaderImpl(Loader):
         return self.refs.get(key)
 
 
-def _validate_schema_for_spec(spec_type: str, field_spec: dict):
-    """ validates the schema for the given spec type and field spec """
-    type_schema = lookup_schema(spec_type)
-    if type_schema is None:
-        return
-    validate_schema_for_spec(spec_type, field_spec, type_schema)
+def _cached_if_configured(supplier: ValueSupplierInterface, config: dict) -> ValueSupplierInterface:
+    """ wraps the supplier so that it produces one value per iteration if the spec is configured to """
+    if utils.is_affirmative('cache_per_record', config):
+        return suppliers.cached_per_record(supplier)
+    return supplier
+
+
+def _unique_if_configured(supplier: ValueSupplierInterface,
+                          altered: ValueSupplierInterface,
+                          config: dict) -> ValueSupplierInterface:
+    """ wraps the altered supplier so that it never repeats a value if the spec is configured to """
+    if not utils.is_affirmative('unique', config):
+        return altered
+    # an int cast, prefixes, suffixes, and counts do not make distinct values equal
+    if supplier.distinct and config.get('cast', 'int') == 'int':
+        return altered
+    max_retries = config.get('unique_retries', get_default('unique_retries'))
+    try:
+        return suppliers.unique(altered, int(max_retries))
+    except ValueError as err:
+        raise SpecException(f'unique_retries must be a valid integer, got {max_retries}') from err
+
+
+def _is_constant(spec_type, field_spec, supplier: ValueSupplierInterface, config: dict) -> bool:
+    """ if the altered supplier for this spec will produce the same value every iteration """
+    if any(key in config for key in _VARYING_CONFIG):
+        return False
+    if 'cast' in config and not casters.is_builtin(config['cast']):
+        # custom casters may not be deterministic
+        return False
+    if isinstance(supplier, SingleValue):
+        return True
+    if spec_type not in _DERIVED_TYPES or not hasattr(supplier, 'suppliers'):
+        return False
+    if not all(isinstance(value_supplier, SingleValue) for value_supplier in supplier.suppliers.values()):
+        return False
+    # filters and function calls in the template could be random i.e. {{ values | random }}
+    template = str(field_spec.get(_DERIVED_TYPES[spec_type], ''))
+    for expressions in _TEMPLATE_EXPRESSIONS.findall(template):
+        if any('|' in expression or '(' in expression for expression in expressions):
+            return False
+    return True
 
 
 def preprocess_and_format(raw_spec: dict) -> str:
@@ -225,9 +317,53 @@ def preprocess_and_format(raw_spec: dict) -> str:
     return spec_formatters.format_json(preprocessed)
 
 
+def generation_plan(data_spec: Union[Dict[str, Dict], DataSpec],
+                    data_dir: str = './data',
+                    enforce_schema: bool = False) -> dict:
+    """
+    Builds the suppliers for the spec the same way generation would, and describes the result. This shows which
+    fields and refs were folded into constants, what each one is built from, the keys for each field group, and any
+    fields or refs that are never used and so are never built.
+
+    Args:
+        data_spec: to plan
+        data_dir: where to look for external data files
+        enforce_schema: if schemas should be enforced
+
+    Returns:
+        dictionary describing the plan
+
+    Examples:
+        >>> import datacraft
+        >>> spec = {"greeting": {"type": "templated", "data": "{{ hi }}!", "refs": ["hi"]}, "refs": {"hi": "hello"}}
+        >>> datacraft.loader.generation_plan(spec)['suppliers']['greeting']
+        {'supplier': 'SingleValue', 'constant': 'hello!', 'uses': ['hi']}
+    """
+    loader = _LoaderImpl(data_spec, data_dir, enforce_schema)
+    groups = key_suppliers.field_groups(loader.spec)
+    for keys in groups.values():
+        for key in keys:
+            loader.get(key)
+    described = {}
+    for key, supplier in loader.cache.items():
+        description: Dict[str, Any] = {'supplier': type(supplier).__name__}
+        if isinstance(supplier, SingleValue):
+            description['constant'] = supplier.data
+        description['uses'] = loader.dependencies.get(key, [])
+        described[key] = description
+    all_keys = [key for key in loader.spec.keys() if key not in ['refs', 'field_groups']]
+    all_keys.extend(loader.refs.refspec.keys())
+    return {
+        'field_groups': groups,
+        'suppliers': described,
+        'unused': [key for key in all_keys if key not in loader.cache]
+    }
+
+
 def preprocess_spec(data_spec: Union[Dict[str, Dict], DataSpec]):
     """
-    Uses the registered preprocessors to cumulatively update the spec
+    Uses the registered preprocessors to cumulatively update the spec. A DataSpec from parse_spec has already been
+    preprocessed, so only its fields are copied unless the spec could have been changed since.
 
     Args:
         data_spec: to preprocess
@@ -236,9 +372,13 @@ def preprocess_spec(data_spec: Union[Dict[str, Dict], DataSpec]):
         updated version of the spec after all preprocessors have run on it
     """
     raw_spec = utils.get_raw_spec(data_spec)
+    if isinstance(data_spec, DataSpec) and data_spec.preprocessed:
+        return dict(raw_spec)
     updated = dict(raw_spec)
     preprocessors = Registry.preprocessors.get_all()
     for name in preprocessors:
+        if name in preprocessor.DEFAULT_STEPS and 'default' in preprocessors:
+            continue
         preprocessor_func = Registry.preprocessors.get(name)
         _log.debug('Running Preprocessor: %s', name)
         processed = preprocessor_func(updated)
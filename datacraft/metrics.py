@@ -0,0 +1,408 @@
+"""
+Module for live metrics on generation. Counts of records generated and bytes written, depths of the queues used for
+prefetching and inserting, and request latencies in server mode. Metrics can be rendered in the Prometheus text format
+or as a snapshot dictionary for progress reports.
+"""
+import bisect
+import json
+import math
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, IO, List, Optional, Sequence, Tuple
+
+# seconds of history used for the windowed records per second
+_RATE_WINDOW = 10
+# upper bounds in seconds of the request latency histogram buckets
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric(ABC):
+    """ Base for metrics with a name, help text, and values for each combination of label values """
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """ label values in the order of the label names """
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """
+        Returns:
+            the name, labels, and value of each sample for this metric
+        """
+
+    def reset(self):
+        """ clears all the values """
+
+
+class Counter(_Metric):
+    """ Total that only goes up, i.e. records generated """
+
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        """
+        Args:
+            amount: to add to the total
+            **labels: values for the labels of this counter
+        """
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """
+        Returns:
+            the total for the labels
+        """
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        return [(self.name, dict(zip(self.labels, key)), value) for key, value in values]
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+class PendingCount:
+    """ Amount counted by a single producer that has not been added to its WindowedCounter yet """
+
+    def __init__(self):
+        # only changed by the producer
+        self.produced = 0
+        # only changed while holding the lock of the counter
+        self.counted = 0
+
+
+class WindowedCounter(Counter):
+    """
+    Counter that also keeps the counts for each second of the last window, for a rate over the window. Producers that
+    count often can track a PendingCount and add to it without locking, the pending amounts are added to the counter
+    whenever the counter is read.
+    """
+
+    def __init__(self, name: str, description: str, window: int = _RATE_WINDOW):
+        super().__init__(name, description)
+        self.window = window
+        # second -> amount counted in that second, oldest first
+        self.seconds: Deque[List[float]] = deque()
+        self.first: Optional[float] = None
+        self.pending: List[PendingCount] = []
+
+    def inc(self, amount: float = 1, **labels: str):
+        with self.lock:
+            self._add(amount, time.monotonic())
+
+    def _add(self, amount: float, current: float):
+        """ adds the amount counted at the current time, the lock must be held """
+        if self.first is None:
+            self.first = current
+        self.values[()] = self.values.get((), 0) + amount
+        now = math.floor(current)
+        if self.seconds and self.seconds[-1][0] == now:
+            self.seconds[-1][1] += amount
+        else:
+            self.seconds.append([now, amount])
+        while self.seconds[0][0] <= now - self.window:
+            self.seconds.popleft()
+
+    def track(self) -> PendingCount:
+        """
+        Starts the window if nothing has been counted yet, so the rate covers the time before the first count
+
+        Returns:
+            pending count for a producer to add to, untrack it once the producer is done
+        """
+        pending = PendingCount()
+        with self.lock:
+            if self.first is None:
+                self.first = time.monotonic()
+            self.pending.append(pending)
+        return pending
+
+    def untrack(self, pending: PendingCount):
+        """
+        Args:
+            pending: count to add any remaining amount of and stop tracking
+        """
+        self.flush(pending)
+        with self.lock:
+            if pending in self.pending:
+                self.pending.remove(pending)
+
+    def flush(self, pending: Optional[PendingCount] = None):
+        """
+        Args:
+            pending: count to add the amount not yet added of, default is all the tracked counts
+        """
+        with self.lock:
+            current = time.monotonic()
+            for tracked in self.pending if pending is None else [pending]:
+                produced = tracked.produced
+                if produced > tracked.counted:
+                    self._add(produced - tracked.counted, current)
+                    tracked.counted = produced
+
+    def value(self, **labels: str) -> float:
+        self.flush()
+        return super().value(**labels)
+
+    def samples(self):
+        self.flush()
+        return super().samples()
+
+    def rate(self) -> float:
+        """
+        Returns:
+            average amount per second over the window
+        """
+        self.flush()
+        now = time.monotonic()
+        oldest = math.floor(now) - self.window + 1
+        with self.lock:
+            counted = sum(amount for second, amount in self.seconds if second >= oldest)
+            first = self.first
+        if first is None:
+            return 0.0
+        # the window is shorter if counting started part way through it
+        return counted / max(now - max(oldest, first), 1.0)
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+            self.seconds.clear()
+            # producers still running start a new window, what they produced before now is not counted
+            self.first = time.monotonic() if self.pending else None
+            for tracked in self.pending:
+                tracked.counted = tracked.produced
+
+
+class Gauge(_Metric):
+    """ Value that is read when the metrics are collected, i.e. the number of items in a queue """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        # label values -> functions that read the current values, summed if more than one is tracked
+        self.functions: Dict[LabelValues, List[Callable[[], float]]] = {}
+
+    def track(self, function: Callable[[], float], **labels: str) -> Callable[[], None]:
+        """
+        Reads the value of this gauge from the function until untracked
+
+        Args:
+            function: reads the current value
+            **labels: values for the labels of this gauge
+
+        Returns:
+            function to call to stop tracking
+        """
+        key = self._key(labels)
+        with self.lock:
+            self.functions.setdefault(key, []).append(function)
+
+        def untrack():
+            with self.lock:
+                tracked = self.functions.get(key, [])
+                if function in tracked:
+                    tracked.remove(function)
+
+        return untrack
+
+    def value(self, **labels: str) -> float:
+        """
+        Returns:
+            the current value for the labels
+        """
+        with self.lock:
+            functions = list(self.functions.get(self._key(labels), []))
+        return sum(function() for function in functions)
+
+    def samples(self):
+        with self.lock:
+            tracked = [(key, list(functions)) for key, functions in self.functions.items()]
+        return [(self.name, dict(zip(self.labels, key)), sum(function() for function in functions))
+                for key, functions in tracked]
+
+    def reset(self):
+        with self.lock:
+            self.functions.clear()
+
+
+class Histogram(_Metric):
+    """ Counts of observations in buckets by upper bound, along with their sum and count """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = ()):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> count in each bucket, with one more for above the last bound, then the sum
+        self.values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        """
+        Args:
+            value: observed, i.e. seconds taken
+            **labels: values for the labels of this histogram
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self.lock:
+            values = [(key, list(counts)) for key, counts in self.values.items()]
+        samples = []
+        for key, counts in values:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative))
+            samples.append((f'{self.name}_sum', labels, counts[-1]))
+            samples.append((f'{self.name}_count', labels, cumulative))
+        return samples
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+records_generated = WindowedCounter('datacraft_records_generated_total', 'Records generated')
+bytes_written = Counter('datacraft_bytes_written_total', 'Bytes written by each type of writer', ['writer'])
+queue_depth = Gauge('datacraft_queue_depth', 'Items waiting in each type of output queue', ['queue'])
+request_seconds = Histogram('datacraft_request_duration_seconds', 'Time to respond to requests for each endpoint',
+                            ['endpoint'], _LATENCY_BUCKETS)
+records_per_second = Gauge('datacraft_records_per_second',
+                           f'Records generated per second over the last {_RATE_WINDOW} seconds')
+records_per_second.track(records_generated.rate)
+
+_METRICS: List[_Metric] = [records_generated, records_per_second, bytes_written, queue_depth, request_seconds]
+
+
+def render() -> str:
+    """
+    Returns:
+        all the metrics in the Prometheus text format
+
+    Examples:
+        >>> import datacraft
+        >>> _ = datacraft.entries({"id": {"type": "uuid"}}, 5)
+        >>> print(datacraft.metrics.render())
+        # HELP datacraft_records_generated_total Records generated
+        # TYPE datacraft_records_generated_total counter
+        datacraft_records_generated_total 5
+        ...
+    """
+    lines = []
+    for metric in _METRICS:
+        lines.append(f'# HELP {metric.name} {metric.description}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def snapshot() -> dict:
+    """
+    Returns:
+        the records generated, records per second, and the bytes written and queue depths by type
+    """
+    return {
+        'records': int(records_generated.value()),
+        'records_per_second': round(records_generated.rate(), 1),
+        'bytes_written': {labels['writer']: int(value) for _, labels, value in bytes_written.samples()},
+        'queue_depth': {labels['queue']: int(value) for _, labels, value in queue_depth.samples()},
+    }
+
+
+def reset():
+    """ clears the values of all the metrics, queues being tracked stay tracked """
+    for metric in _METRICS:
+        if metric is not records_per_second and metric is not queue_depth:
+            metric.reset()
+
+
+class Progress:
+    """ Writes a JSON line with a snapshot of the metrics and the time elapsed once each interval """
+
+    def __init__(self, interval: float, stream: Optional[IO[str]] = None):
+        """
+        Args:
+            interval: seconds between progress lines
+            stream: to write lines to, default is stderr so progress does not mix with data written to stdout
+        """
+        self.interval = interval
+        self.stream = stream
+        self.started = time.monotonic()
+        self.reported_at = self.started
+
+    def update(self):
+        """ writes a progress line if the interval has passed since the last one """
+        now = time.monotonic()
+        if now - self.reported_at >= self.interval:
+            self.report(now)
+
+    def report(self, now: Optional[float] = None, final: bool = False):
+        """
+        Args:
+            now: time of report, default is now
+            final: if this is the last report
+        """
+        if now is None:
+            now = time.monotonic()
+        self.reported_at = now
+        line = {'elapsed': round(now - self.started, 1), **snapshot()}
+        if final:
+            line['finished'] = True
+        stream = self.stream if self.stream is not None else sys.stderr
+        stream.write(json.dumps(line) + '\n')
+        stream.flush()
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """ labels in braces, empty if there are none """
+    if not labels:
+        return ''
+    escaped = [f'{name}="{_escape(value)}"' for name, value in labels.items()]
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value: str) -> str:
+    """ escapes label value for the text format """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """ whole numbers without the decimal point, infinity as +Inf """
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -1,20 +1,28 @@
 """
 Module holds output related classes and functions
 """
-from typing import Union
+from collections import OrderedDict
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple, Union
 from abc import ABC, abstractmethod
+import copy
 import os
 import json
 import logging
+import queue
+import sys
+import threading
 from pathlib import Path
 import catalogue  # type: ignore
 import yaml
-from . import template_engines, registries, utils
+from . import template_engines, registries, utils, metrics
 from .supplier.model import RecordProcessor, OutputHandlerInterface
 from .exceptions import SpecException
 
 _log = logging.getLogger(__name__)
 
+# number of bytes written between updates of the bytes written metric
+_BYTES_CHUNK = 64 * 1024
+
 
 @registries.Registry.formats('j')
 @registries.Registry.formats('json')
@@ -52,6 +60,30 @@ def _format_yaml(record: Union[list, dict]) -> str:
     return str(yaml.dump(record, sort_keys=False, width=4096)).strip()
 
 
+class _BytesWritten:
+    """ Counts the bytes written by a writer, adding them to the metrics a chunk at a time """
+
+    def __init__(self, writer: str):
+        self.writer = writer
+        self.pending = 0
+
+    def add(self, text: str):
+        """ counts the text as encoded when written """
+        self.add_size(len(text.encode('utf-8')))
+
+    def add_size(self, size: int):
+        """ counts the bytes """
+        self.pending += size
+        if self.pending >= _BYTES_CHUNK:
+            self.flush()
+
+    def flush(self):
+        """ adds the bytes counted so far to the metrics """
+        if self.pending:
+            metrics.bytes_written.inc(self.pending, writer=self.writer)
+            self.pending = 0
+
+
 class WriterInterface(ABC):
     """Interface for classes that write the generated values out"""
 
@@ -63,6 +95,25 @@ class WriterInterface(ABC):
             value: to write
         """
 
+    def finished(self):
+        """Called once all the values have been written"""
+
+
+class PartWriterInterface(WriterInterface):
+    """Interface for writers that can write the parts of a value as they arrive, instead of the whole value at once"""
+
+    @abstractmethod
+    def write_part(self, value: str):
+        """Write part of a value, the value is complete once end_parts is called
+
+        Args:
+            value: part of the value to write
+        """
+
+    @abstractmethod
+    def end_parts(self):
+        """Finishes writing the value made up of the parts written since the last call"""
+
 
 def single_field(writer: WriterInterface, output_key: bool):
     """
@@ -91,11 +142,15 @@ class _SingleFieldOutput(OutputHandlerInterface):
         else:
             self.writer.write(str(value))
 
+    def handle_record(self, iteration, group_name, record, exclude_internal=False):
+        for key, value in record.items():
+            self.handle(key, value)
+
     def finished_record(self, iteration=None, group_name=None, exclude_internal=False):
         pass
 
     def finished_iterations(self):
-        pass
+        self.writer.finished()
 
 
 def record_level(record_processor: RecordProcessor,
@@ -124,38 +179,702 @@ class _RecordLevelOutput(OutputHandlerInterface):
         self.records_per_file = records_per_file
         self.current = {}
         self.buffer = []
+        # records are written as they arrive if the list of them can be processed one record at a time
+        self.stream = _list_stream(record_processor) if records_per_file > 1 else None
+        self.streamed = 0
+        # parts of the list for writers that can only write whole values
+        self.parts: List[str] = []
+        # records are held until there are records_per_file of them
+        self.buffering = records_per_file > 1 and self.stream is None
 
     def handle(self, key, value):
         self.current[key] = value
 
     def finished_record(self, iteration, group_name, exclude_internal=False):
         current = self.current
-        if not exclude_internal:
-            current['_internal'] = {
-                '_iteration': iteration,
-                '_field_group': group_name
-            }
-        if self.records_per_file == 1:
-            processed = self.record_processor.process(current)
-            self.writer.write(processed)
-            self.current.clear()
+        self.current = {}
+        if not exclude_internal and self.record_processor.needs_internal:
+            current['_internal'] = _internal(iteration, group_name)
+        self._process(current)
+
+    def handle_record(self, iteration, group_name, record, exclude_internal=False):
+        # record is shared with the caller, so add metadata to a copy, and buffer a copy the caller cannot change
+        if not exclude_internal and self.record_processor.needs_internal:
+            record = {**record, '_internal': _internal(iteration, group_name)}
+        elif self.buffering:
+            record = dict(record)
+        self._process(record)
+
+    def handle_batch(self, batch, exclude_internal=False):
+        if not exclude_internal and self.record_processor.needs_internal:
+            records = [{**record, '_internal': _internal(iteration, group_name)}
+                       for iteration, group_name, record in batch]
+        elif self.buffering:
+            records = [dict(record) for _, _, record in batch]
         else:
-            self.buffer.append(current.copy())
-            self.current.clear()
+            records = [record for _, _, record in batch]
+        if self.records_per_file == 1:
+            write = self.writer.write
+            process = self.record_processor.process
+            for record in records:
+                write(process(record))
+            return
+        if self.stream is not None:
+            for record in records:
+                self._stream(record)
+            return
+        start = 0
+        while start < len(records):
+            end = start + self.records_per_file - len(self.buffer)
+            self.buffer.extend(records[start:end])
+            start = end
             if len(self.buffer) == self.records_per_file:
-                processed = self.record_processor.process(self.buffer)
-                self.writer.write(processed)
+                self.writer.write(self.record_processor.process(self.buffer))
                 self.buffer.clear()
 
-    def finished_iterations(self):
-        if len(self.buffer) == 0:
+    def _process(self, record: dict):
+        """ process the record right away, or once there are records_per_file of them """
+        if self.records_per_file == 1:
+            self.writer.write(self.record_processor.process(record))
             return
-        processed = self.record_processor.process(self.buffer)
-        self.writer.write(processed)
-        self.buffer.clear()
+        if self.stream is not None:
+            self._stream(record)
+            return
+        self.buffer.append(record)
+        if len(self.buffer) == self.records_per_file:
+            processed = self.record_processor.process(self.buffer)
+            self.writer.write(processed)
+            self.buffer.clear()
+
+    def _stream(self, record: dict):
+        """ writes the record as the next part of the current list of records """
+        if self.streamed == 0:
+            self._write_part(self.stream.first(record))  # type: ignore[union-attr]
+        else:
+            self._write_part(self.stream.next(record))  # type: ignore[union-attr]
+        self.streamed += 1
+        if self.streamed == self.records_per_file:
+            self._end_stream()
+
+    def _write_part(self, part: str):
+        """ writes the part now if the writer can, otherwise holds it until the list of records ends """
+        if isinstance(self.writer, PartWriterInterface):
+            self.writer.write_part(part)
+        else:
+            self.parts.append(part)
+
+    def _end_stream(self):
+        """ finishes the current list of records """
+        if self.stream.end:  # type: ignore[union-attr]
+            self._write_part(self.stream.end)  # type: ignore[union-attr]
+        if isinstance(self.writer, PartWriterInterface):
+            self.writer.end_parts()
+        else:
+            self.writer.write(''.join(self.parts))
+            self.parts.clear()
+        self.streamed = 0
+
+    def finished_iterations(self):
+        if self.streamed > 0:
+            self._end_stream()
+        if len(self.buffer) > 0:
+            processed = self.record_processor.process(self.buffer)
+            self.writer.write(processed)
+            self.buffer.clear()
+        self.writer.finished()
+
+
+class _ListStream:
+    """ Formats a list of records one record at a time, the parts joined are the same as processing the whole list """
+
+    def __init__(self,
+                 start: str,
+                 separator: str,
+                 end: str,
+                 format_record: Callable[[Any], str],
+                 header: Optional[Callable[[dict], str]] = None):
+        self.start = start
+        self.separator = separator
+        self.end = end
+        self.format_record = format_record
+        self.header = header
+
+    def first(self, record: dict) -> str:
+        """ the start of the list up to and including the first record """
+        if self.header is not None:
+            return self.start + self.header(record) + self.separator + self.format_record(record)
+        return self.start + self.format_record(record)
+
+    def next(self, record: dict) -> str:
+        """ the part of the list for each record after the first """
+        return self.separator + self.format_record(record)
+
+
+def _list_stream(record_processor: RecordProcessor) -> Optional[_ListStream]:
+    """ streaming form of the processor for lists of records, None if the whole list has to be processed at once """
+    if record_processor.record_separator is not None:
+        return _ListStream('', record_processor.record_separator, '', record_processor.process)
+    # custom formats registered under the built-in names are processed the usual way
+    format_func = getattr(record_processor, 'format_func', None)
+    if isinstance(record_processor, _CsvFormatProcessor) and format_func is _format_csv:
+        header = _csv_header if record_processor.add_header else None
+        return _ListStream('', '\n', '', _csv_line, header)
+    if not isinstance(record_processor, _FormatProcessor):
+        return None
+    if format_func is _format_json:
+        return _ListStream('[', ', ', ']', _compact_json)
+    if format_func is _format_json_pretty:
+        return _ListStream('[\n', ',\n', '\n]', _indented_json)
+    if format_func is _format_yaml:
+        return _ListStream('', '\n', '', _yaml_list_item)
+    return None
+
+
+def _csv_header(record: dict) -> str:
+    """ header line for the record """
+    return ','.join(record.keys())
+
+
+def _compact_json(record: dict) -> str:
+    """ compressed json for the record, as it would be in a list """
+    return json.dumps(record, ensure_ascii=registries.get_default('format_json_ascii'))
+
+
+def _indented_json(record: dict) -> str:
+    """ pretty json for the record indented one level, as it would be in a list """
+    indent = ' ' * int(registries.get_default('json_indent'))
+    return indent + _format_json_pretty(record).replace('\n', '\n' + indent)
+
+
+def _yaml_list_item(record: dict) -> str:
+    """ yaml for the record as an item in a list """
+    return _format_yaml([record])
+
+
+def _internal(iteration: int, group_name: str) -> dict:
+    """ metadata about the record """
+    return {
+        '_iteration': iteration,
+        '_field_group': group_name
+    }
+
+
+def partitioned(record_processor: RecordProcessor,
+                outdir: str,
+                partition_by: List[str],
+                outfile_prefix: Optional[str] = None,
+                extension: Optional[str] = None,
+                max_open_files: Optional[int] = None) -> OutputHandlerInterface:
+    """
+    Creates an OutputHandler that writes each record to a file in a directory for the partition it belongs to. The
+    directories use the key=value layout, i.e. region=east/day=2050-01-02/generated-0. A partition can be the value of
+    a field, the first N characters of the value with name:N, or the name of the field group with _field_group.
+
+    Open files are kept in a least recently used pool, with at most max_open_files open at a time. Files closed from
+    the pool are appended to if more records come in for that partition.
+
+    Args:
+        record_processor: to process each record into a string
+        outdir: base directory for partition directories
+        partition_by: field names, name:N prefixes of field values, or _field_group to partition on, in order
+        outfile_prefix: prefix for file in each partition, default is outfile_prefix default
+        extension: for file in each partition, default is outfile_extension default
+        max_open_files: max number of files to have open at once, default is max_open_files default
+
+    Returns:
+        OutputHandlerInterface
+
+    Raises:
+        SpecException if there are no partitions or a partition is not valid
+
+    Examples:
+        >>> import datacraft
+        >>> processor = datacraft.outputs.processor(format_name='json')
+        >>> output = datacraft.outputs.partitioned(processor, './lake', ['region', 'timestamp:10'])
+        >>> for _ in datacraft.stream(spec, 100_000, output=output, exclude_internal=True):
+        ...     pass
+    """
+    if not partition_by:
+        raise SpecException('At least one field to partition by is required')
+    partitions = [_parse_partition(partition) for partition in partition_by]
+    if outfile_prefix is None:
+        outfile_prefix = registries.get_default('outfile_prefix')
+    if extension is None:
+        extension = registries.get_default('outfile_extension')
+    if max_open_files is None:
+        max_open_files = int(registries.get_default('max_open_files'))
+    if max_open_files < 1:
+        raise SpecException(f'max_open_files must be at least 1, got {max_open_files}')
+    file_name = file_name_engine(outfile_prefix, extension).process({'count': 0})  # type: ignore[arg-type]
+    return _PartitionedOutput(record_processor, outdir, partitions, file_name, max_open_files)
+
+
+_FIELD_GROUP_PARTITION = '_field_group'
+_DEFAULT_PARTITION = '__DEFAULT_PARTITION__'
+
+
+def _parse_partition(partition: str) -> Tuple[str, Optional[int]]:
+    """ field name and number of leading characters of the value to use """
+    name, separator, length = partition.partition(':')
+    if not name:
+        raise SpecException(f'Invalid partition: {partition}')
+    if not separator:
+        return name, None
+    if not length.isdigit() or int(length) == 0:
+        raise SpecException(f'Invalid partition: {partition}, value after : must be a positive number')
+    return name, int(length)
+
+
+def _partition_value(value: Any, length: Optional[int]) -> str:
+    """ value for use as a directory name """
+    if value is None:
+        return _DEFAULT_PARTITION
+    value = str(value)
+    if length is not None:
+        value = value[:length]
+    if value in ('', '.', '..'):
+        return _DEFAULT_PARTITION
+    return value.replace('%', '%25').replace('/', '%2F').replace('\\', '%5C')
+
+
+class _PartitionedOutput(OutputHandlerInterface):
+    """Writes records into files in partition directories"""
+
+    def __init__(self, record_processor, outdir, partitions, file_name, max_open_files):
+        self.record_processor = record_processor
+        # when csv headers are added, only the first record in each file should have one
+        self.body_processor = record_processor
+        if getattr(record_processor, 'add_header', False):
+            self.body_processor = copy.copy(record_processor)
+            self.body_processor.add_header = False
+        self.outdir = outdir
+        self.partitions = partitions
+        self.file_name = file_name
+        self.max_open_files = max_open_files
+        self.current: Dict[str, Any] = {}
+        # partition path parts -> open file handle, least recently used first
+        self.handles: OrderedDict = OrderedDict()
+        # partition path parts -> path of the partition file
+        self.paths: Dict[Tuple[str, ...], str] = {}
+        self.written = _BytesWritten('partitioned')
+
+    def handle(self, key, value):
+        self.current[key] = value
+
+    def finished_record(self, iteration, group_name, exclude_internal=False):
+        current = self.current
+        self.current = {}
+        self.handle_record(iteration, group_name, current, exclude_internal)
+
+    def handle_record(self, iteration, group_name, record, exclude_internal=False):
+        parts = tuple(
+            f'{name}={_partition_value(group_name if name == _FIELD_GROUP_PARTITION else record.get(name), length)}'
+            for name, length in self.partitions
+        )
+        if not exclude_internal and self.record_processor.needs_internal:
+            record = {**record, '_internal': _internal(iteration, group_name)}
+        handle = self.handles.get(parts)
+        if handle is not None:
+            self.handles.move_to_end(parts)
+            text = self.body_processor.process(record) + '\n'
+        else:
+            handle, is_new = self._open(parts)
+            processor = self.record_processor if is_new else self.body_processor
+            text = processor.process(record) + '\n'
+        handle.write(text)
+        self.written.add(text)
+
+    def handle_batch(self, batch, exclude_internal=False):
+        super().handle_batch(batch, exclude_internal)
+        self.written.flush()
+
+    def finished_iterations(self):
+        for handle in self.handles.values():
+            handle.close()
+        self.handles.clear()
+        self.written.flush()
+        _log.info('Wrote data to %s partitions in %s', len(self.paths), self.outdir)
+
+    def _open(self, parts: Tuple[str, ...]):
+        """ opens the file for the partition, closing the least recently used file if too many are open """
+        if len(self.handles) >= self.max_open_files:
+            _, evicted = self.handles.popitem(last=False)
+            evicted.close()
+        path = self.paths.get(parts)
+        is_new = path is None
+        if is_new:
+            directory = os.path.join(self.outdir, *parts)
+            os.makedirs(directory, exist_ok=True)
+            path = self.paths[parts] = os.path.join(directory, self.file_name)
+        # pylint: disable=consider-using-with
+        handle = open(path, 'w' if is_new else 'a', encoding='utf-8')  # type: ignore[arg-type]
+        self.handles[parts] = handle
+        return handle, is_new
+
+
+def size_rolling(record_processor: RecordProcessor,
+                 outdir: str,
+                 max_file_size: int,
+                 outfile_prefix: Optional[str] = None,
+                 extension: Optional[str] = None) -> OutputHandlerInterface:
+    """
+    Creates an OutputHandler that writes each record to the current output file as it is generated, and moves on to
+    the next file once the current one would go over max_file_size bytes. Records are written one per line, i.e. JSON
+    lines for the json format. A file may go over max_file_size only if a single record is bigger than it.
 
+    Each new file is claimed by creating it exclusively with the next unused count in the file name, so multiple
+    processes writing to the same directory each roll their own series of files with unique names. Existing files are
+    never overwritten.
 
-def stdout_writer() -> WriterInterface:
+    Args:
+        record_processor: to process each record into a string
+        outdir: directory to write files to
+        max_file_size: max number of bytes per file
+        outfile_prefix: prefix for files, default is outfile_prefix default
+        extension: for files, default is outfile_extension default
+
+    Returns:
+        OutputHandlerInterface
+
+    Raises:
+        SpecException if max_file_size is not positive
+    """
+    if max_file_size <= 0:
+        raise SpecException(f'max_file_size must be positive, got {max_file_size}')
+    if outfile_prefix is None:
+        outfile_prefix = registries.get_default('outfile_prefix')
+    if extension is None:
+        extension = registries.get_default('outfile_extension')
+    engine = file_name_engine(outfile_prefix, extension)  # type: ignore[arg-type]
+    return _SizeRollingOutput(record_processor, outdir, max_file_size, engine)
+
+
+class _SizeRollingOutput(OutputHandlerInterface):
+    """Streams records to files, rolling to a new file when the max size is reached"""
+
+    def __init__(self, record_processor, outdir, max_file_size, engine):
+        self.record_processor = record_processor
+        self.body_processor = _without_header(record_processor)
+        self.outdir = outdir
+        self.max_file_size = max_file_size
+        self.engine = engine
+        self.current: Dict[str, Any] = {}
+        self.outfile = None
+        self.path: Optional[str] = None
+        self.size = 0
+        self.count = 0
+        self.written = _BytesWritten('size_rolling')
+        os.makedirs(outdir, exist_ok=True)
+
+    def handle(self, key, value):
+        self.current[key] = value
+
+    def finished_record(self, iteration, group_name, exclude_internal=False):
+        current = self.current
+        self.current = {}
+        self.handle_record(iteration, group_name, current, exclude_internal)
+
+    def handle_record(self, iteration, group_name, record, exclude_internal=False):
+        if not exclude_internal and self.record_processor.needs_internal:
+            record = {**record, '_internal': _internal(iteration, group_name)}
+        if self.outfile is not None:
+            data = (self.body_processor.process(record) + '\n').encode('utf-8')
+            if self.size + len(data) <= self.max_file_size:
+                self.outfile.write(data)
+                self.size += len(data)
+                self.written.add_size(len(data))
+                return
+            self._close()
+        self._claim()
+        data = (self.record_processor.process(record) + '\n').encode('utf-8')
+        self.outfile.write(data)
+        self.size = len(data)
+        self.written.add_size(len(data))
+
+    def handle_batch(self, batch, exclude_internal=False):
+        super().handle_batch(batch, exclude_internal)
+        self.written.flush()
+
+    def finished_iterations(self):
+        self._close()
+        self.written.flush()
+
+    def _claim(self):
+        """ creates the next file that does not already exist """
+        while True:
+            path = os.path.join(self.outdir, self.engine.process({'count': self.count}))
+            self.count += 1
+            try:
+                # pylint: disable=consider-using-with
+                self.outfile = open(path, 'xb')
+                self.path = path
+                return
+            except FileExistsError:
+                continue
+
+    def _close(self):
+        if self.outfile is not None:
+            self.outfile.close()
+            self.outfile = None
+            _log.info('Wrote data to %s', self.path)
+
+
+def _without_header(record_processor: RecordProcessor) -> RecordProcessor:
+    """ processor for records after the first in a file, csv headers are only added to the first """
+    if not getattr(record_processor, 'add_header', False):
+        return record_processor
+    body_processor = copy.copy(record_processor)
+    body_processor.add_header = False  # type: ignore[attr-defined]
+    return body_processor
+
+
+def database(connect: Callable[[], Any],
+             table: str,
+             columns: Optional[List[str]] = None,
+             batch_size: Optional[int] = None,
+             pool_size: int = 1,
+             paramstyle: str = 'qmark',
+             create_table: bool = True) -> OutputHandlerInterface:
+    """
+    Creates an OutputHandler that inserts the records into a database table using any DB-API 2.0 connection. Records
+    are inserted batch_size at a time with executemany, each batch is committed as one transaction. With a pool_size
+    greater than one, batches are inserted in parallel by that many worker threads, each with its own connection.
+
+    Values that are lists or dictionaries are inserted as JSON strings. Records without a value for a column insert a
+    NULL. The _internal metadata is never inserted.
+
+    Args:
+        connect: function that returns a new DB-API connection, called once for each connection in the pool
+        table: name of table to insert into
+        columns: names of columns to insert, default is the fields of the first record
+        batch_size: number of records to insert at a time, default is db_batch_size default
+        pool_size: number of connections to insert with in parallel
+        paramstyle: DB-API paramstyle of the database module, one of qmark, numeric, named, format, or pyformat
+        create_table: if the table should be created if it does not already exist, types are determined from the
+                      values of the first record
+
+    Returns:
+        OutputHandlerInterface
+
+    Raises:
+        SpecException if the paramstyle is not supported
+
+    Examples:
+        >>> import sqlite3
+        >>> import datacraft
+        >>> output = datacraft.outputs.database(lambda: sqlite3.connect('fixtures.db'), 'users', batch_size=5000)
+        >>> for _ in datacraft.stream(spec, 100_000, output=output):
+        ...     pass
+    """
+    if paramstyle not in _PLACEHOLDERS:
+        raise SpecException(f'Unsupported paramstyle {paramstyle}, valid are {list(_PLACEHOLDERS.keys())}')
+    if batch_size is None:
+        batch_size = int(registries.get_default('db_batch_size'))
+    return _DatabaseOutput(connect, table, columns, batch_size, pool_size, paramstyle, create_table)
+
+
+_PLACEHOLDERS = {
+    'qmark': lambda idx, name: '?',
+    'numeric': lambda idx, name: f':{idx + 1}',
+    'named': lambda idx, name: f':p{idx}',
+    'format': lambda idx, name: '%s',
+    'pyformat': lambda idx, name: f'%(p{idx})s',
+}
+
+
+class _DatabaseOutput(OutputHandlerInterface):
+    """Inserts records into a database table in batches"""
+
+    def __init__(self, connect, table, columns, batch_size, pool_size, paramstyle, create_table):
+        self.connect = connect
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.paramstyle = paramstyle
+        self.create_table = create_table
+        self.rows: List[Any] = []
+        self.current: Dict[str, Any] = {}
+        self.insert_sql: Optional[str] = None
+        self.connection = None
+        self.pool: Optional[_ConnectionPool] = None
+
+    def handle(self, key, value):
+        self.current[key] = value
+
+    def finished_record(self, iteration, group_name, exclude_internal=False):
+        current = self.current
+        self.current = {}
+        self.handle_record(iteration, group_name, current, exclude_internal)
+
+    def handle_record(self, iteration, group_name, record, exclude_internal=False):
+        insert_sql = self.insert_sql if self.insert_sql is not None else self._prepare(record)
+        self.rows.append(self._row(record))
+        if len(self.rows) >= self.batch_size:
+            self._flush(insert_sql)
+
+    def handle_batch(self, batch, exclude_internal=False):
+        insert_sql = self.insert_sql if self.insert_sql is not None else self._prepare(batch[0][2])
+        to_row = self._row
+        self.rows.extend(to_row(record) for _, _, record in batch)
+        if len(self.rows) >= self.batch_size:
+            self._flush(insert_sql)
+
+    def finished_iterations(self):
+        # there are only rows to insert once the insert statement has been built
+        if self.insert_sql is not None:
+            self._flush(self.insert_sql, final=True)
+        if self.pool is not None:
+            self.pool.close()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _prepare(self, first_record: dict) -> str:
+        """ determines the columns, creates the table, and returns the insert statement """
+        if self.columns is None:
+            self.columns = [key for key in first_record.keys() if key != '_internal']
+        quoted = ', '.join(_quote_identifier(column) for column in self.columns)
+        placeholders = ', '.join(_PLACEHOLDERS[self.paramstyle](idx, column) for idx, column in enumerate(self.columns))
+        insert_sql = f'INSERT INTO {_quote_identifier(self.table)} ({quoted}) VALUES ({placeholders})'
+        if self.pool_size > 1:
+            self.pool = _ConnectionPool(self.connect, self.pool_size, insert_sql)
+        if self.create_table:
+            definitions = ', '.join(f'{_quote_identifier(column)} {_sql_type(first_record.get(column))}'
+                                    for column in self.columns)
+            create_sql = f'CREATE TABLE IF NOT EXISTS {_quote_identifier(self.table)} ({definitions})'
+            if self.pool is None:
+                self.connection = self.connect()
+                _execute(self.connection, create_sql)
+            else:
+                connection = self.connect()
+                try:
+                    _execute(connection, create_sql)
+                finally:
+                    connection.close()
+        self.insert_sql = insert_sql
+        return insert_sql
+
+    def _row(self, record: dict):
+        """ parameters for the insert statement for the record """
+        values = [_sql_value(record.get(column)) for column in self.columns]  # type: ignore[union-attr]
+        if self.paramstyle in ('named', 'pyformat'):
+            return {f'p{idx}': value for idx, value in enumerate(values)}
+        return values
+
+    def _flush(self, insert_sql: str, final: bool = False):
+        """ inserts the full batches of rows with the insert statement, or all the rows if final """
+        while len(self.rows) >= self.batch_size or (final and self.rows):
+            rows = self.rows[:self.batch_size]
+            self.rows = self.rows[self.batch_size:]
+            if self.pool is not None:
+                self.pool.submit(rows)
+            else:
+                if self.connection is None:
+                    self.connection = self.connect()
+                _insert(self.connection, insert_sql, rows)
+
+
+class _ConnectionPool:
+    """Worker threads that each insert batches of rows with their own connection"""
+
+    def __init__(self, connect, size: int, insert_sql: str):
+        self.connect = connect
+        self.insert_sql = insert_sql
+        self.batches: queue.Queue = queue.Queue(maxsize=size * 2)
+        self.errors: List[BaseException] = []
+        self.workers = [threading.Thread(target=self._work, name=f'datacraft-db-{idx}', daemon=True)
+                        for idx in range(size)]
+        for worker in self.workers:
+            worker.start()
+        self.untrack = metrics.queue_depth.track(self.batches.qsize, queue='database')
+
+    def submit(self, rows: list):
+        """ queue the rows to be inserted by the next available worker """
+        self._raise_errors()
+        self.batches.put(rows)
+
+    def close(self):
+        """ waits for all queued batches to be inserted, then closes the connections """
+        for _ in self.workers:
+            self.batches.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.untrack()
+        self._raise_errors()
+
+    def _raise_errors(self):
+        if self.errors:
+            raise self.errors[0]
+
+    def _work(self):
+        connection = None
+        try:
+            while True:
+                rows = self.batches.get()
+                if rows is None:
+                    return
+                if self.errors:
+                    # drain remaining batches once any worker has failed
+                    continue
+                if connection is None:
+                    connection = self.connect()
+                _insert(connection, self.insert_sql, rows)
+        except BaseException as err:  # pylint: disable=broad-except
+            self.errors.append(err)
+            # keep draining so the producer does not block on a full queue
+            while self.batches.get() is not None:
+                pass
+        finally:
+            if connection is not None:
+                connection.close()
+
+
+def _execute(connection, sql: str):
+    """ executes the statement in a single transaction """
+    try:
+        connection.cursor().execute(sql)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def _insert(connection, insert_sql: str, rows: list):
+    """ inserts the rows in a single transaction """
+    try:
+        connection.cursor().executemany(insert_sql, rows)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def _quote_identifier(name: str) -> str:
+    """ quotes table or column name for use in SQL """
+    escaped = str(name).replace('"', '""')
+    return f'"{escaped}"'
+
+
+def _sql_type(value: Any) -> str:
+    """ column type for the value """
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _sql_value(value: Any) -> Any:
+    """ value as a DB-API parameter, lists and dictionaries are stored as JSON """
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def stdout_writer() -> PartWriterInterface:
     """Creates a WriterInterface that writes results to stdout
 
     Returns:
@@ -164,26 +883,48 @@ def stdout_writer() -> WriterInterface:
     return _StdOutWriter()
 
 
-class _StdOutWriter(WriterInterface):
+class _StdOutWriter(PartWriterInterface):
     """Writes values to stdout"""
 
+    def __init__(self):
+        self.written = _BytesWritten('stdout')
+
     def write(self, value: str):
         print(value)
+        self.written.add(f'{value}\n')
+
+    def write_part(self, value: str):
+        sys.stdout.write(value)
+        self.written.add(value)
+
+    def end_parts(self):
+        sys.stdout.write('\n')
+        self.written.add_size(1)
+        self.written.flush()
 
+    def finished(self):
+        self.written.flush()
 
-def suppress_output_writer() -> WriterInterface:
+
+def suppress_output_writer() -> PartWriterInterface:
     """ Returns a writer that suppresses the output to stdout """
     return _SuppressOutput()
 
 
-class _SuppressOutput(WriterInterface):
+class _SuppressOutput(PartWriterInterface):
     """ Suppresses output """
 
     def write(self, value):
         pass
 
+    def write_part(self, value: str):
+        pass
+
+    def end_parts(self):
+        pass
+
 
-def single_file_writer(outdir: str, outname: str, overwrite: bool) -> WriterInterface:
+def single_file_writer(outdir: str, outname: str, overwrite: bool) -> PartWriterInterface:
     """Creates a Writer for a single output file
 
     Args:
@@ -197,28 +938,46 @@ def single_file_writer(outdir: str, outname: str, overwrite: bool) -> WriterInte
     return _SingleFileWriter(outdir, outname, overwrite)
 
 
-class _SingleFileWriter(WriterInterface):
+class _SingleFileWriter(PartWriterInterface):
     """Writes all values to same file"""
 
     def __init__(self, outdir: str, outname: str, overwrite: bool):
         self.outdir = outdir
         self.outname = outname
         self.overwrite = overwrite
+        # open while the parts of a value are being written
+        self.handle: Optional[IO[str]] = None
+        self.written = _BytesWritten('file')
 
     def write(self, value):
-        outfile = os.path.join(self.outdir, self.outname)
-        if self.overwrite:
-            mode = 'w'
-        else:
-            mode = 'a'
-        with open(outfile, mode, encoding='utf-8') as handle:
-            handle.write(value)
-            handle.write('\n')
-        _log.info('Wrote data to %s', outfile)
+        self.write_part(value)
+        self.end_parts()
+
+    def write_part(self, value: str):
+        if self.handle is None:
+            outfile = os.path.join(self.outdir, self.outname)
+            if self.overwrite:
+                mode = 'w'
+            else:
+                mode = 'a'
+            # pylint: disable=consider-using-with
+            self.handle = open(outfile, mode, encoding='utf-8')
+        self.handle.write(value)
+        self.written.add(value)
+
+    def end_parts(self):
+        if self.handle is None:
+            return
+        self.handle.write('\n')
+        self.handle.close()
+        self.handle = None
+        self.written.add_size(1)
+        self.written.flush()
+        _log.info('Wrote data to %s', os.path.join(self.outdir, self.outname))
 
 
 def incrementing_file_writer(outdir: str,
-                             engine: RecordProcessor) -> WriterInterface:
+                             engine: RecordProcessor) -> PartWriterInterface:
     """Creates a WriterInterface that increments the count in the file name once records_per_file have been written
 
     Args:
@@ -231,7 +990,7 @@ def incrementing_file_writer(outdir: str,
     return _IncrementingFileWriter(outdir, engine)
 
 
-class _IncrementingFileWriter(WriterInterface):
+class _IncrementingFileWriter(PartWriterInterface):
     """Writes processed output to disk and increments the file name with a count"""
 
     def __init__(self, outdir, engine: RecordProcessor):
@@ -240,14 +999,33 @@ class _IncrementingFileWriter(WriterInterface):
         if not os.path.exists(outdir):
             os.makedirs(outdir)
         self.count = 0
+        # open while the parts of a value are being written
+        self.outfile: Optional[str] = None
+        self.handle: Optional[IO[str]] = None
+        self.written = _BytesWritten('file')
 
     def write(self, value):
-        outfile = os.path.join(self.outdir, self.engine.process({'count': self.count}))
-        self.count += 1
-        with open(outfile, 'w', encoding='utf-8') as handle:
-            handle.write(value)
-            handle.write('\n')
-        _log.info('Wrote data to %s', outfile.replace('/', os.path.sep))
+        self.write_part(value)
+        self.end_parts()
+
+    def write_part(self, value: str):
+        if self.handle is None:
+            self.outfile = os.path.join(self.outdir, self.engine.process({'count': self.count}))
+            self.count += 1
+            # pylint: disable=consider-using-with
+            self.handle = open(self.outfile, 'w', encoding='utf-8')
+        self.handle.write(value)
+        self.written.add(value)
+
+    def end_parts(self):
+        if self.handle is None:
+            return
+        self.handle.write('\n')
+        self.handle.close()
+        self.handle = None
+        self.written.add_size(1)
+        self.written.flush()
+        _log.info('Wrote data to %s', self.outfile.replace('/', os.path.sep))
 
 
 class _FormatProcessor(RecordProcessor):
@@ -0,0 +1,284 @@
+"""
+Module for pools of pregenerated records. A pool generates the records for a spec once, then hands out copies of them
+in place of generating new ones. Pools are kept in memory and can also be persisted to disk, so later runs only need to
+map the file in to get at the records.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from importlib import metadata
+from typing import Any, Dict, List, Optional, Union
+
+from . import registries
+from .builder import generator
+from .exceptions import SpecException
+from .supplier.model import DataSpec
+from .utils import get_raw_spec
+
+_log = logging.getLogger(__name__)
+
+# magic, number of records, position of the record offsets
+_POOL_HEADER = struct.Struct('<8sQQ')
+_POOL_MAGIC = b'DCPOOL01'
+_POOL_EXTENSION = '.pool'
+_OFFSET_SIZE = array('Q').itemsize
+
+# cache key -> pool, most recently used last
+_pools: 'OrderedDict[str, RecordPool]' = OrderedDict()
+
+
+class RecordPool:
+    """
+    Pregenerated records for a spec. Records are stored JSON encoded one after another with the offset of each, so any
+    record, or run of records, can be decoded without touching the others. Each record handed out is a new copy.
+    """
+
+    def __init__(self, key: str, buffer: Union[bytes, mmap.mmap], path: Optional[str] = None):
+        """
+        Args:
+            key: cache key for the pool
+            buffer: encoded pool
+            path: file the pool was loaded from or saved to, if any
+        """
+        magic, size, index = _POOL_HEADER.unpack_from(buffer, 0)
+        if magic != _POOL_MAGIC or len(buffer) != index + (size + 1) * _OFFSET_SIZE:
+            raise ValueError('Invalid record pool')
+        self.key = key
+        self.path = path
+        self.buffer = buffer
+        self.offsets = array('Q')
+        self.offsets.frombytes(buffer[index:])
+        self.position = 0
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f'pool index {index} out of range for pool of {len(self)} records')
+        # each record is followed by a comma
+        return json.loads(self.buffer[self.offsets[index]:self.offsets[index + 1] - 1])
+
+    def entries(self, count: int) -> List[dict]:
+        """
+        Hands out the next count records. Each call starts where the last one finished, going back to the first
+        record after the last one.
+
+        Args:
+            count: number of records
+
+        Returns:
+            list of records
+        """
+        records: List[dict] = []
+        while len(records) < count:
+            end = min(len(self), self.position + count - len(records))
+            records.extend(self._run(self.position, end))
+            self.position = end % len(self)
+        return records
+
+    def sample(self, count: int) -> List[dict]:
+        """
+        Args:
+            count: number of records, at most the size of the pool
+
+        Returns:
+            count different records chosen at random
+        """
+        return [self[index] for index in random.sample(range(len(self)), count)]
+
+    def _run(self, start: int, end: int) -> List[dict]:
+        """ decodes the records from start up to end at once, they are stored one after another """
+        return json.loads(b'[' + self.buffer[self.offsets[start]:self.offsets[end] - 1] + b']')
+
+    def close(self):
+        """ unmaps the pool file, if the pool was loaded from one """
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+def pool(data_spec: Union[Dict[str, Dict], DataSpec],
+         size: int,
+         persist: Optional[str] = None,
+         seed: Any = None,
+         **kwargs) -> RecordPool:
+    """
+    Gets the pool of records for the spec, generating it only if there is not already a pool for the same spec, size,
+    seed, and datacraft version. Pools are kept in memory for reuse and, with persist, saved to the persist directory.
+    The least recently used pools beyond the pool_cache_size default are dropped from memory and from the directory.
+
+    Args:
+        data_spec: to generate records with, the records must be JSON serializable
+        size: number of records in the pool
+        persist: directory to save pools in and load them from
+        seed: to seed the random module with while generating the pool, restored after
+
+    Keyword Args:
+        data_dir (str): path the data directory with csv files and such
+        enforce_schema (bool): If schema validation should be applied where possible
+
+    Returns:
+        the pool of records
+
+    Examples:
+        >>> import datacraft
+        >>> spec = {"id": {"type": "uuid"}, "handle": {"type": "cc-word", "config": {"min": 4, "max": 8}}}
+        >>> records = datacraft.pool(spec, 10_000, persist='.pools')
+        >>> first = records.entries(100)
+        >>> chosen = records.sample(5)
+    """
+    if size <= 0:
+        raise ValueError(f'size must be positive, got {size}')
+    key = pool_key(data_spec, size, seed, **kwargs)
+    path = os.path.join(persist, key + _POOL_EXTENSION) if persist else None
+    record_pool = _pools.get(key)
+    if record_pool is not None:
+        _pools.move_to_end(key)
+        if path and record_pool.path is None:
+            _save(path, bytes(record_pool.buffer))
+            record_pool.path = path
+        elif record_pool.path:
+            _touch(record_pool.path)
+        return record_pool
+    if path:
+        record_pool = _load(key, path)
+    if record_pool is None:
+        record_pool = _generate(key, data_spec, size, seed, path, **kwargs)
+    _pools[key] = record_pool
+    _evict(persist)
+    return record_pool
+
+
+def pool_key(data_spec: Union[Dict[str, Dict], DataSpec], size: int, seed: Any = None, **kwargs) -> str:
+    """
+    Args:
+        data_spec: pool is for
+        size: number of records in pool
+        seed: pool is generated with
+
+    Returns:
+        the key for the pool, from the spec, size, seed, generation args, and datacraft version
+    """
+    spec = json.dumps(get_raw_spec(data_spec), sort_keys=True, default=str)
+    params = json.dumps([size, seed, kwargs, _version(), sys.byteorder], sort_keys=True, default=str)
+    return hashlib.sha1(f'{spec}\n{params}'.encode('utf-8')).hexdigest()
+
+
+def clear():
+    """ drops all the pools held in memory, pools saved to disk are kept """
+    _pools.clear()
+
+
+def _generate(key: str,
+              data_spec: Union[Dict[str, Dict], DataSpec],
+              size: int,
+              seed: Any,
+              path: Optional[str],
+              **kwargs) -> RecordPool:
+    """ generates the records and encodes them into a pool, saved to path if given """
+    state = random.getstate()
+    if seed is not None:
+        random.seed(seed)
+    try:
+        encoded = _encode(generator(get_raw_spec(data_spec), size, **kwargs))
+    finally:
+        if seed is not None:
+            random.setstate(state)
+    if path:
+        _save(path, encoded)
+    return RecordPool(key, encoded, path)
+
+
+def _encode(records) -> bytes:
+    """ header, then each JSON encoded record followed by a comma, then the offsets of the records """
+    parts = [b'']
+    offsets = array('Q', [_POOL_HEADER.size])
+    for record in records:
+        try:
+            encoded = json.dumps(record).encode('utf-8') + b','
+        except TypeError as err:
+            raise SpecException(f'Records must be JSON serializable to be pooled: {err}') from err
+        parts.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+    parts[0] = _POOL_HEADER.pack(_POOL_MAGIC, len(offsets) - 1, offsets[-1])
+    parts.append(offsets.tobytes())
+    return b''.join(parts)
+
+
+def _save(path: str, encoded: bytes):
+    """ saves the pool, written to a temp file first so readers never see a partial file """
+    temp_file = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(temp_file, 'wb') as handle:
+            handle.write(encoded)
+        os.replace(temp_file, path)
+    except OSError as err:
+        _log.warning('Unable to save record pool to %s: %s', path, err)
+
+
+def _load(key: str, path: str) -> Optional[RecordPool]:
+    """ maps in the saved pool, None if there is no valid pool file """
+    try:
+        with open(path, 'rb') as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        record_pool = RecordPool(key, buffer, path)
+    except (ValueError, struct.error):
+        buffer.close()
+        _log.warning('Ignoring invalid record pool %s', path)
+        return None
+    _touch(path)
+    _log.debug('Loaded pool of %s records from %s', len(record_pool), path)
+    return record_pool
+
+
+def _evict(persist: Optional[str]):
+    """ drops the least recently used pools beyond the pool_cache_size default from memory and the persist dir """
+    max_pools = int(registries.get_default('pool_cache_size'))
+    while len(_pools) > max_pools:
+        _pools.popitem(last=False)
+    if not persist or not os.path.isdir(persist):
+        return
+    saved = [os.path.join(persist, name) for name in os.listdir(persist) if name.endswith(_POOL_EXTENSION)]
+    saved.sort(key=_mtime, reverse=True)
+    for path in saved[max_pools:]:
+        try:
+            os.remove(path)
+        except OSError as err:
+            _log.debug('Unable to remove record pool %s: %s', path, err)
+
+
+def _touch(path: str):
+    """ marks the pool file as recently used """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _mtime(path: str) -> float:
+    """ modified time of file, 0 if it no longer exists """
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def _version() -> str:
+    """ installed version of datacraft """
+    try:
+        return metadata.version('datacraft')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
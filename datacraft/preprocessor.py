@@ -5,12 +5,18 @@ pushing params from URL form of field?param=value in to config object.
 import re
 import json
 import logging
+import functools
+from typing import Any, Callable, Dict, Optional
 from urllib.parse import parse_qs
 from .exceptions import SpecException
 from . import registries, entrypoints
 
 _log = logging.getLogger(__name__)
 
+# preprocessors that are part of the single pass of the default preprocessor. They are still registered so they can be
+# looked up and run on their own, but are skipped when the default preprocessor runs so the spec is only walked once.
+DEFAULT_STEPS = ['csv-select', 'nested', 'type_check']
+
 
 @registries.Registry.preprocessors('load-entry-points')
 def _load_entry_points(raw_spec: dict) -> dict:
@@ -23,7 +29,8 @@ def _load_entry_points(raw_spec: dict) -> dict:
 def _preprocess_spec(raw_spec: dict) -> dict:
     """
     Preprocesses the spec into a format that is easier to use.
-    Pushes all url params in keys into config object. Converts shorthand specs into full specs
+    Pushes all url params in keys into config object. Converts shorthand specs into full specs. Expands csv_select
+    specs into csv ones and does the same for the fields of nested specs. This is done in a single pass over the spec.
 
     Args:
         raw_spec: to preprocess
@@ -31,26 +38,13 @@ def _preprocess_spec(raw_spec: dict) -> dict:
     Returns:
         the reformatted spec
     """
-    updated_specs = {}
-    for key, spec in raw_spec.items():
-        if key == 'refs':
-            updated_specs[key] = _preprocess_spec(raw_spec[key])
-            continue
-        if key == 'field_groups':
-            updated_specs[key] = spec
-            continue
-        if '?' not in key:
-            _update_no_params(key, spec, updated_specs)
-        else:
-            _update_with_params(key, spec, updated_specs)
-
-    return updated_specs
+    return _walk(raw_spec)
 
 
 @registries.Registry.preprocessors('csv-select')
 def _preprocess_csv_select(raw_spec: dict) -> dict:
     """
-    Converts and csv-select elements into standard csv ones
+    Converts and csv-select elements into standard csv ones, this is now part of the default preprocessor
 
     Args:
         raw_spec: to process
@@ -58,147 +52,139 @@ def _preprocess_csv_select(raw_spec: dict) -> dict:
     Returns:
         converted spec
     """
-    return _preprocess_csv_select_recursive(raw_spec)
-
-
-def _preprocess_csv_select_recursive(raw_spec: dict, is_refs: bool = False) -> dict:
-    """process spec slightly different depending if this is the refs section or not"""
-    updated_specs = {}
-    for key, spec in raw_spec.items():
-        if key == 'refs':
-            # run preprocessors on refs too
-            updated_specs['refs'] = _preprocess_csv_select_recursive(spec, True)
-        if 'type' in spec and spec['type'] == 'csv_select':
-            # convention is that refs have upper case names
-            config_ref_name = _add_config_ref_if_needed(key, is_refs, raw_spec, spec, updated_specs)
-            if config_ref_name is None:
-                raise SpecException(f'field {key} in csv_select has invalid configuration for csv type data: {spec}')
-            for name, column in spec.get('data', {}).items():
-                cast = None
-                if isinstance(column, dict):
-                    column_number = column.get('col')
-                    cast = column.get('cast', None)
-                else:
-                    column_number = column
-                if ':' in name:
-                    name, cast = name.split(':', 2)
-                spec_for_column = {
-                    'type': 'csv',
-                    'config': {
-                        'column': column_number,
-                        'config_ref': config_ref_name
-                    }
-                }
-                if cast:
-                    spec_for_column['config']['cast'] = cast  # type: ignore
-                if name not in raw_spec:
-                    updated_specs[name] = spec_for_column
-                else:
-                    alt_name = f'{name}-{column_number}'
-                    updated_specs[alt_name] = spec_for_column
-        else:
-            updated_specs[key] = spec
-    return updated_specs
-
-
-def _add_config_ref_if_needed(key, is_refs, raw_spec, spec, updated_specs):
-    """ adds in the config ref element to appropriate location if it is required.
-    If required return name of config ref, if config is empty returns None for name """
-    config_ref_name = f'{key}_config_ref'
-    if is_refs:
-        config_ref_name = config_ref_name.upper()
-    config = spec.get('config')
-    if config is None or len(config) == 0:
-        return None
-    config_ref = {
-        'type': 'config_ref',
-        'config': config
-    }
-    if is_refs:
-        updated_specs[config_ref_name] = config_ref
-    elif 'refs' not in raw_spec:
-        updated_specs['refs'] = {config_ref_name: config_ref}
-    else:
-        updated_specs['refs'][config_ref_name] = config_ref
-    return config_ref_name
+    return _walk(raw_spec)
 
 
 @registries.Registry.preprocessors('nested')
 def _preprocess_nested(raw_spec: dict) -> dict:
     """
-    Converts all nested elements
+    Converts all nested elements, this is now part of the default preprocessor
 
     Args:
         raw_spec: to process
-        is_refs: is this the refs section of the spec
 
     Returns:
         converted spec
     """
-    updated_specs = {}  # type: ignore
-    if 'refs' in raw_spec:
-        if 'refs' in updated_specs:
-            updated_specs['refs'].update(_preprocess_spec(raw_spec['refs']))
-        else:
-            updated_specs['refs'] = _preprocess_spec(raw_spec['refs'])
-    for key, spec in raw_spec.items():
-        if key == 'refs':
-            # run preprocessors on refs too
-            updated_refs = _preprocess_spec(spec)
-            updated_refs = _preprocess_csv_select_recursive(updated_refs, True)
-            # in case we have nested nested elements
-            updated_refs = _preprocess_nested(updated_refs)
-            updated_specs['refs'] = updated_refs
-            continue
-
-        if 'type' in spec and spec['type'] == 'nested':
-            if 'fields' not in spec:
-                raise SpecException('Missing fields key for nested spec: ' + json.dumps(spec))
-            fields = spec['fields']
-            updated = _preprocess_spec(fields)
-            updated = _preprocess_csv_select(updated)
-            # in case we have nested nested elements
-            updated = _preprocess_nested(updated)
-            # this may have created a refs element, need to move this to the root
-            _update_root_refs(updated_specs, updated)
-            spec['fields'] = updated
-            updated_specs[key] = spec
-        else:
-            updated_specs[key] = spec
-    return updated_specs
+    return _walk(raw_spec)
 
 
 @registries.Registry.preprocessors('type_check')
 def _preprocess_verify_types(raw_spec: dict) -> dict:
-    """ log only checks """
+    """ log only checks, this is now part of the default preprocessor """
     for key, field_spec in raw_spec.items():
         if key == 'field_groups':
             continue
         if key == 'refs':
             _preprocess_verify_types(field_spec)
             continue
-        type_name = field_spec.get('type')
-        if registries.lookup_type(type_name) is None:
-            _log.warning('Unknown type key: %s for spec %s, known types are %s',
-                         type_name, field_spec, registries.registered_types())
+        _visit_spec(key, field_spec, raw_spec, {}, False)
     return raw_spec
 
 
-def _update_root_refs(updated_specs, updated):
+def _walk(raw_spec: dict, is_refs: bool = False) -> dict:
     """
-    Updates to root refs if needed by popping the refs from the updated and merging with existing refs or creating
-    a new refs element
+    Walks the fields or refs once. The keys are expanded from their shorthand notation first, so that all the names at
+    this level are known, then each spec is handed to the visitor for its type.
 
     Args:
-        updated_specs: specs being updated
-        updated: current updated spec that may have refs injected into it
+        raw_spec: fields or refs to process
+        is_refs: is this the refs section of the spec
+
+    Returns:
+        the processed fields or refs, any refs created for the fields are under the refs key
     """
-    if 'refs' in updated:
-        refs = updated.pop('refs')
-        if 'refs' in updated_specs:
-            updated_specs.get('refs').update(refs)
+    names: dict = {}
+    for key, spec in raw_spec.items():
+        if key in ('refs', 'field_groups'):
+            names[key] = spec
+        elif '?' not in key:
+            _update_no_params(key, spec, names)
+        else:
+            _update_with_params(key, spec, names)
+    updated_specs: dict = {}
+    for key, spec in names.items():
+        if key == 'refs':
+            _add_refs(updated_specs, is_refs, _walk(spec, True))
+        elif key == 'field_groups':
+            updated_specs[key] = spec
         else:
-            updated_specs['refs'] = refs
+            spec_type = spec.get('type') if isinstance(spec, dict) else None
+            visitor = _VISITORS.get(spec_type, _visit_spec)
+            visitor(key, spec, names, updated_specs, is_refs)
+    return updated_specs
+
+
+def _visit_spec(key: str, spec: Any, names: dict, updated_specs: dict, is_refs: bool):
+    """ keeps the spec as is, logs if the type is not known """
+    updated_specs[key] = spec
+    type_name = spec.get('type') if isinstance(spec, dict) else None
+    if type_name not in registries.Registry.types:
+        _log.warning('Unknown type key: %s for spec %s, known types are %s',
+                     type_name, spec, registries.registered_types())
+
+
+def _visit_csv_select(key: str, spec: dict, names: dict, updated_specs: dict, is_refs: bool):
+    """ converts the csv_select spec into a csv spec for each column that share a config ref """
+    config = spec.get('config')
+    if config is None or len(config) == 0:
+        raise SpecException(f'field {key} in csv_select has invalid configuration for csv type data: {spec}')
+    # convention is that refs have upper case names
+    config_ref_name = f'{key}_config_ref'
+    if is_refs:
+        config_ref_name = config_ref_name.upper()
+    _add_refs(updated_specs, is_refs, {config_ref_name: {'type': 'config_ref', 'config': config}})
+    for name, column in spec.get('data', {}).items():
+        cast = None
+        if isinstance(column, dict):
+            column_number = column.get('col')
+            cast = column.get('cast', None)
+        else:
+            column_number = column
+        if ':' in name:
+            name, cast = name.split(':', 2)
+        spec_for_column = {
+            'type': 'csv',
+            'config': {
+                'column': column_number,
+                'config_ref': config_ref_name
+            }
+        }
+        if cast:
+            spec_for_column['config']['cast'] = cast  # type: ignore
+        if name not in names:
+            updated_specs[name] = spec_for_column
+        else:
+            alt_name = f'{name}-{column_number}'
+            updated_specs[alt_name] = spec_for_column
+
+
+def _visit_nested(key: str, spec: dict, names: dict, updated_specs: dict, is_refs: bool):
+    """ processes the fields of the nested spec, any refs created for them are moved up to this level """
+    if 'fields' not in spec:
+        raise SpecException('Missing fields key for nested spec: ' + json.dumps(spec))
+    fields = _walk(spec['fields'])
+    refs = fields.pop('refs', None)
+    if refs:
+        _add_refs(updated_specs, is_refs, refs)
+    updated = dict(spec)
+    updated['fields'] = fields
+    updated_specs[key] = updated
+
+
+# spec type -> function to visit specs of that type with, all others are kept as is
+_VISITORS: Dict[Optional[str], Callable[[str, Any, dict, dict, bool], None]] = {
+    'csv_select': _visit_csv_select,
+    'nested': _visit_nested
+}
+
+
+def _add_refs(updated_specs: dict, is_refs: bool, refs: dict):
+    """ adds the refs to the refs section, which is the updated specs themselves if these are the refs """
+    if is_refs:
+        updated_specs.update(refs)
+    else:
+        updated_specs.setdefault('refs', {}).update(refs)
 
 
 def _update_with_params(key, spec, updated_specs):
@@ -269,6 +255,14 @@ def _parse_key(field_name):
 
     2. field?param1=val...
     """
+    newkey, spectype, config = _parse_key_cached(field_name)
+    # fresh config for each caller, since the parsed one is shared
+    return newkey, spectype, {key: list(value) if isinstance(value, list) else value for key, value in config.items()}
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_key_cached(field_name):
+    """ parses the key, generated specs often repeat the same keys """
     parts = re.split(r'\?', field_name)
     key_type = parts[0].split(':')
     parsed_query = parse_qs(parts[1])
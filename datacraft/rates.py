@@ -0,0 +1,166 @@
+"""
+Module for pacing generation to a target rate. A token bucket decides when the next records may be generated, and an
+optional profile distribution scales the rate over time for bursts, spikes, or daily cycles.
+"""
+import logging
+import time
+from typing import Callable, Generator, Iterable, Optional, TypeVar, Union
+
+from . import distributions
+from .supplier.model import Distribution
+from .utils import parse_rate
+
+_log = logging.getLogger(__name__)
+
+# longest a batch should take at the target rate, so batched output is still written out smoothly
+_MAX_BATCH_SECONDS = 0.1
+
+T = TypeVar('T')
+
+
+class RateLimiter:
+    """
+    Token bucket that paces callers to the rate. Each acquire schedules its tokens after those already handed out,
+    so time lost to slow sleeps or slow callers is made up on the next acquire instead of adding up over a long run.
+    At most burst tokens are made up at once.
+    """
+
+    def __init__(self,
+                 rate: Union[str, float],
+                 burst: Optional[float] = None,
+                 profile: Union[str, Distribution, None] = None,
+                 period: float = 1.0,
+                 log_interval: Optional[float] = None,
+                 clock: Optional[Callable[[], float]] = None,
+                 sleep: Optional[Callable[[float], None]] = None):
+        """
+        Args:
+            rate: tokens per second, or with a unit i.e. 5000/s, 300/m
+            burst: max tokens to hand out without waiting after falling behind, default is a tenth of a second's worth
+            profile: distribution, or distribution string, sampled each period for the multiplier of the rate
+            period: seconds between samples of the profile
+            log_interval: seconds between logs of the throughput, None to not log
+            clock: monotonic time in seconds, default is time.monotonic
+            sleep: to wait with, default is time.sleep
+        """
+        self.rate = parse_rate(rate)
+        self.burst = burst if burst is not None else max(1.0, self.rate * _MAX_BATCH_SECONDS)
+        if isinstance(profile, str):
+            profile = distributions.from_string(profile)
+        self.profile = profile
+        self.period = period
+        self.log_interval = log_interval
+        self.clock = clock or time.monotonic
+        self.sleep = sleep or time.sleep
+        self.multiplier = 1.0
+        self.started = self.clock()
+        # time at which the tokens handed out so far are all due
+        self.due = self.started
+        self.period_end = self.started
+        self.count = 0.0
+        self.logged_at = self.started
+        self.logged_count = 0.0
+
+    @property
+    def current_rate(self) -> float:
+        """ target tokens per second, with the latest multiplier from the profile """
+        return self.rate * self.multiplier
+
+    @property
+    def throughput(self) -> float:
+        """ tokens per second handed out since the limiter was created """
+        elapsed = self.clock() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def acquire(self, count: float = 1):
+        """
+        Waits until count more tokens are due
+
+        Args:
+            count: number of tokens
+        """
+        now = self.clock()
+        rate = self._rate_at(now)
+        while rate <= 0:
+            # paused until the profile is sampled again
+            self.sleep(self.period_end - now)
+            now = self.clock()
+            self.due = max(self.due, now)
+            rate = self._rate_at(now)
+        # do not make up for more than burst tokens of lost time
+        self.due = max(self.due, now - self.burst / rate) + count / rate
+        if self.due > now:
+            self.sleep(self.due - now)
+        self.count += count
+        if self.log_interval is not None:
+            self._log_throughput()
+
+    def _rate_at(self, now: float) -> float:
+        """ rate at the given time, samples the profile for a new multiplier once each period """
+        if self.profile is not None and now >= self.period_end:
+            self.multiplier = max(0.0, float(self.profile.next_value()))
+            self.period_end = now + self.period
+        return self.current_rate
+
+    def _log_throughput(self):
+        """ logs the throughput since the last log once each log interval """
+        now = self.clock()
+        elapsed = now - self.logged_at
+        if elapsed < self.log_interval:
+            return
+        _log.info('Generated %d at %.1f/s, target %.1f/s, %.1f/s overall',
+                  self.count, (self.count - self.logged_count) / elapsed, self.current_rate, self.throughput)
+        self.logged_at = now
+        self.logged_count = self.count
+
+
+def rate_limited(items: Iterable[T],
+                 rate: Union[str, float, RateLimiter],
+                 per_item: float = 1,
+                 **kwargs) -> Generator[T, None, None]:
+    """
+    Paces iteration over the items to the rate. Each item is only requested from the iterable once it is due, so
+    generators produce, and write out, each record or batch at the rate.
+
+    Args:
+        items: to pace, usually a generator from DataSpec.generator or DataSpec.stream
+        rate: items per second, or with a unit i.e. 5000/s, 300/m, or a RateLimiter
+        per_item: tokens for each item, i.e. the batch size when pacing records that are streamed in batches
+
+    Keyword Args:
+        burst (float): max tokens to hand out without waiting after falling behind
+        profile (str): distribution sampled each period for the multiplier of the rate i.e. diurnal(...), spikes(...)
+        period (float): seconds between samples of the profile
+        log_interval (float): seconds between logs of the throughput
+
+    Yields:
+        the items
+
+    Examples:
+        >>> import datacraft
+        >>> spec = datacraft.parse_spec({"id": {"type": "uuid"}})
+        >>> profile = 'spikes(height=4, every=60, length=5)'
+        >>> for record in datacraft.rate_limited(spec.generator(10_000), '500/s', profile=profile):
+        ...     pass
+    """
+    limiter = rate if isinstance(rate, RateLimiter) else RateLimiter(rate, **kwargs)
+    iterator = iter(items)
+    while True:
+        limiter.acquire(per_item)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        yield item
+
+
+def batch_size_for(rate: Union[str, float], batch_size: int) -> int:
+    """
+    Args:
+        rate: target records per second
+        batch_size: requested batch size
+
+    Returns:
+        the batch size, reduced if needed so a batch is a small slice of a second at the rate
+    """
+    return max(1, min(batch_size, int(parse_rate(rate) * _MAX_BATCH_SECONDS)))
@@ -120,8 +120,7 @@ def lookup_type(key):
     Returns:
         the type if found
     """
-    all_keys = list(Registry.types.get_all().keys())
-    if key in all_keys:
+    if key in Registry.types:
         func = Registry.types.get(key)
     else:
         _log.debug('No type found for key %s', key)
@@ -140,8 +139,7 @@ def lookup_schema(key):
     Returns:
         the schema if found
     """
-    all_keys = list(Registry.schemas.get_all().keys())
-    if key in all_keys:
+    if key in Registry.schemas:
         schema_load_function = Registry.schemas.get(key)
     else:
         _log.debug('No schema found for type %s', key)
@@ -160,8 +158,7 @@ def lookup_caster(key):
     Returns:
         the caster if found
     """
-    all_keys = list(Registry.casters.get_all().keys())
-    if key in all_keys:
+    if key in Registry.casters:
         caster_load_function = Registry.casters.get(key)
     else:
         _log.debug('No caster found for key %s', key)
@@ -180,8 +177,7 @@ def lookup_analyzer(key):
     Returns:
         the analyzer if found
     """
-    all_keys = list(Registry.analyzers.get_all().keys())
-    if key in all_keys:
+    if key in Registry.analyzers:
         analyzer_load_function = Registry.analyzers.get(key)
     else:
         _log.debug('No analyzer found for key %s', key)
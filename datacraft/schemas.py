@@ -2,11 +2,17 @@
 Module for validating schemas for various types
 """
 import logging
+from typing import Callable, Dict, Optional, Tuple
+
 from jsonschema import Draft7Validator  # type: ignore
 from .exceptions import SpecException
+from .registries import Registry
 
 _log = logging.getLogger(__name__)
 
+# spec type -> registered schema function and the validator compiled from the schema it returned
+_validators: Dict[str, Tuple[Callable, Draft7Validator]] = {}
+
 
 def validate_schema_for_spec(spec_type: str, field_spec: dict, type_schema: dict):
     """
@@ -20,9 +26,54 @@ def validate_schema_for_spec(spec_type: str, field_spec: dict, type_schema: dict
     Raises:
         SpecException if validation fails
     """
-    validator = Draft7Validator(type_schema)
+    _validate(Draft7Validator(type_schema), spec_type, field_spec)
+
+
+def validate_spec_for_type(spec_type: str, field_spec: dict):
+    """
+    performs schema validation for the provided field_spec against the registered schema for the type, if there is
+    one. The schema is loaded and compiled into a validator once and reused for every spec of the same type
+
+    Args:
+        spec_type: type name for spec
+        field_spec: spec to apply validation to
+
+    Raises:
+        SpecException if validation fails
+    """
+    validator = validator_for_type(spec_type)
+    if validator is not None:
+        _validate(validator, spec_type, field_spec)
+
+
+def validator_for_type(spec_type: str) -> Optional[Draft7Validator]:
+    """
+    get the compiled validator for the registered schema of the type, the validator is compiled again only if a
+    different schema function is registered for the type
+
+    Args:
+        spec_type: type name to get validator for
+
+    Returns:
+        the validator, None if no schema is registered for the type
+    """
+    if spec_type not in Registry.schemas:
+        _log.debug('No schema found for type %s', spec_type)
+        return None
+    schema_load_function = Registry.schemas.get(spec_type)
+    cached = _validators.get(spec_type)
+    if cached is not None and cached[0] is schema_load_function:
+        return cached[1]
+    validator = Draft7Validator(schema_load_function())
+    _validators[spec_type] = (schema_load_function, validator)
+    return validator
+
+
+def _validate(validator: Draft7Validator, spec_type: str, field_spec: dict):
+    """ checks the spec, only collects the errors if it is not valid """
+    if validator.is_valid(field_spec):
+        return
     errors = sorted(validator.iter_errors(field_spec), key=lambda e: e.path)
-    if len(errors) > 0:
-        for error in errors:
-            _log.warning(error.message)
-        raise SpecException(f'Failed to validate spec type: {spec_type} with spec: {field_spec}')
+    for error in errors:
+        _log.warning(error.message)
+    raise SpecException(f'Failed to validate spec type: {spec_type} with spec: {field_spec}')
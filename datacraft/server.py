@@ -7,10 +7,25 @@ import logging
 import flask
 
 import datacraft
+from datacraft import metrics
 
 _log = logging.getLogger(__name__)
 
 
+# path metrics are served at in the Prometheus text format
+_METRICS_PATH = '/metrics'
+
+
+def metrics_view():
+    """
+    Callback for metrics requests
+
+    Returns:
+        the metrics in the Prometheus text format
+    """
+    return flask.Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 class _Server:
     """
     Light weight Flask server
@@ -31,16 +46,24 @@ class _Server:
         self.delay = delay
         self.call_number = 0
 
-    def generate_view_func(self, generator):
+    def generate_view_func(self, generator, endpoint_path: str = '/'):
         """Generate a unique view function for a given endpoint configuration."""
 
         def view_func():
             """
-            Callback for endpoint requests
+            Callback for endpoint requests, the time taken is added to the latency metrics for the endpoint
 
             Returns:
                 data as JSON or raw, until stop iteration, then 204 no more content
             """
+            started = time.perf_counter()
+            try:
+                return respond()
+            finally:
+                metrics.request_seconds.observe(time.perf_counter() - started, endpoint=endpoint_path)
+
+        def respond():
+            """ generates the response data """
             # next generated record
             num_records = self.count_supplier.next(self.call_number)
             try:
@@ -60,20 +83,29 @@ class _Server:
 
         return view_func
 
-    def run(self):
-        """ run the Flask app """
+    def app(self) -> flask.Flask:
+        """ creates the Flask app with a route for each endpoint, and one for the metrics """
         app = flask.Flask(__name__)
+        paths = []
         for endpoint_path, generator in self.endpoint_specs.items():
             if not endpoint_path.startswith('/'):
                 endpoint_path = '/' + endpoint_path
             _log.info('Adding endpoint to server: %s', endpoint_path)
-            view_func = self.generate_view_func(generator)
+            view_func = self.generate_view_func(generator, endpoint_path)
             app.add_url_rule(endpoint_path,
                              endpoint=endpoint_path,
                              view_func=view_func,
                              methods=['POST', 'GET'])
+            paths.append(endpoint_path)
+        if _METRICS_PATH in paths:
+            _log.warning('Endpoint %s is used for data, metrics will not be served', _METRICS_PATH)
+        else:
+            app.add_url_rule(_METRICS_PATH, endpoint=_METRICS_PATH, view_func=metrics_view, methods=['GET'])
+        return app
 
-        app.run(port=self.port, host=self.host)
+    def run(self):
+        """ run the Flask app """
+        self.app().run(port=self.port, host=self.host)
 
 
 def run(endpoint_map: dict,
@@ -85,6 +117,8 @@ def run(endpoint_map: dict,
     """
     Runs a light weight Flask server with data returned by the provided generator served at each subsequent call to
     the provided endpoint. End point should start with /. When StopIteration encountered, returns a 204 status code.
+    Metrics, including the latency of the requests to each endpoint, are served at /metrics in the Prometheus text
+    format.
 
     Args:
         endpoint_map: endpoint to generator that provides response data as dictionary for that end point
@@ -0,0 +1,200 @@
+"""
+Module for character class value supplier implementations. Characters are drawn many at a time from one buffer of
+random bytes that is mapped onto the characters with a translation table.
+"""
+import bisect
+import itertools
+import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Union
+
+from .model import ValueSupplierInterface
+
+# number of characters to draw at once when supplying single values
+_POOL_SIZE = 4096
+
+
+def char_class_supplier(data: Union[str, list],
+                        lengths: ValueSupplierInterface,
+                        join_with: Optional[str] = '',
+                        unique: bool = False) -> ValueSupplierInterface:
+    """
+    Args:
+        data: characters, or strings for escaped characters, to draw from
+        lengths: supplies the number of characters for each value
+        join_with: how to join the characters into a string, None means return as list
+        unique: if the characters in a value should not repeat, i.e. sampled without replacement
+
+    Returns:
+        supplier for strings of characters
+    """
+    return _CharClassSupplier(data, lengths, join_with, unique)
+
+
+def uniform_lengths(min_length: int, max_length: int) -> ValueSupplierInterface:
+    """
+    Args:
+        min_length: minimum number of characters
+        max_length: maximum number of characters, inclusive
+
+    Returns:
+        supplier for lengths equally likely to be anywhere in the range
+    """
+    return _LengthSupplier(list(range(min_length, max_length + 1)))
+
+
+def normal_lengths(size: int, **kwargs) -> ValueSupplierInterface:
+    """
+    Precomputes the likelihood of each length for lengths drawn from a normal distribution, rounded down and clamped
+    to the min and max.
+
+    Args:
+        size: number of characters to draw from, lengths will not exceed this
+
+    Keyword Args:
+        mean (float): mean number of characters
+        stddev (float): standard deviation from mean
+        min (int): min number of characters
+        max (int): max number of characters
+
+    Returns:
+        supplier for lengths
+    """
+    mean = float(kwargs.get('mean', 1))
+    min_length = int(kwargs.get('min', 1))
+    max_length = int(kwargs.get('max', size))
+    # attempt to create a reasonable standard deviation
+    if abs(int(mean - min_length)) < abs(int(mean - max_length)):
+        lower_delta = abs(int(mean - min_length))
+    else:
+        lower_delta = abs(int(mean - max_length))
+    stddev = float(kwargs.get('stddev', lower_delta))
+
+    def clamp(count: int) -> int:
+        if count <= 0:
+            count = 1
+        if count > max_length:
+            count = max_length
+        if count < min_length:
+            count = min_length
+        # cant sample more than exists
+        return min(count, size)
+
+    if stddev == 0:
+        return _LengthSupplier([clamp(int(mean))])
+    distribution = NormalDist(mean, abs(stddev))
+    # every count at or below zero and at or above highest clamp to the same length
+    highest = max(min_length, max_length, 1) + 1
+    weights: Dict[int, float] = {}
+    below = 0.0
+    for count in range(highest):
+        cumulative = distribution.cdf(count + 1)
+        weights[clamp(count)] = weights.get(clamp(count), 0.0) + cumulative - below
+        below = cumulative
+    weights[clamp(highest)] = weights.get(clamp(highest), 0.0) + 1.0 - below
+    weights = {length: weight for length, weight in weights.items() if weight > 0}
+    return _LengthSupplier(list(weights.keys()), list(weights.values()))
+
+
+class _LengthSupplier(ValueSupplierInterface):
+    """ Supplies lengths from a precomputed list of lengths and their weights """
+
+    def __init__(self, lengths: List[int], weights: Optional[List[float]] = None):
+        self.lengths = lengths
+        if weights is None:
+            weights = [1.0] * len(lengths)
+        self.cum_weights = list(itertools.accumulate(weights))
+        self.total = self.cum_weights[-1]
+
+    def next(self, iteration):
+        if len(self.lengths) == 1:
+            return self.lengths[0]
+        return self.lengths[bisect.bisect(self.cum_weights, random.random() * self.total, 0, len(self.lengths) - 1)]
+
+    def next_batch(self, iteration: int, count: int) -> list:
+        if len(self.lengths) == 1:
+            return self.lengths * count
+        return random.choices(self.lengths, cum_weights=self.cum_weights, k=count)
+
+
+class _CharClassSupplier(ValueSupplierInterface):
+    """ Value Supplier for char_class types """
+
+    def __init__(self,
+                 data: Union[str, list],
+                 lengths: ValueSupplierInterface,
+                 join_with: Optional[str],
+                 unique: bool):
+        self.chars: Sequence[str] = data if isinstance(data, str) else list(data)
+        self.lengths = lengths
+        self.join_with = join_with
+        self.unique = unique
+        self.table = _translation_table(self.chars)
+        self.pool = ''
+        self.pool_position = 0
+
+    def next(self, iteration):
+        length = self.lengths.next(iteration)
+        if self.unique:
+            return self._format(random.sample(self.chars, length))
+        if self.table is None:
+            return self._format(random.choices(self.chars, k=length))
+        if self.pool_position + length > len(self.pool):
+            self.pool = self.pool[self.pool_position:] + self.table.draw(max(_POOL_SIZE, length))
+            self.pool_position = 0
+        start = self.pool_position
+        self.pool_position += length
+        return self._format(self.pool[start:self.pool_position])
+
+    def next_batch(self, iteration: int, count: int) -> list:
+        lengths = self.lengths.next_batch(iteration, count)
+        if self.unique:
+            return [self._format(random.sample(self.chars, length)) for length in lengths]
+        drawn: Sequence[str]
+        if self.table is None:
+            drawn = random.choices(self.chars, k=sum(lengths))
+        else:
+            drawn = self.table.draw(sum(lengths))
+        values = []
+        start = 0
+        for length in lengths:
+            values.append(self._format(drawn[start:start + length]))
+            start += length
+        return values
+
+    def _format(self, chars: Sequence[str]) -> Union[str, List[str]]:
+        """ joins the characters or returns them as a list """
+        if self.join_with is None:
+            return list(chars)
+        if self.join_with == '' and isinstance(chars, str):
+            return chars
+        return self.join_with.join(chars)
+
+
+class _TranslationTable:
+    """ Maps random bytes onto the characters so that each character is equally likely """
+
+    def __init__(self, chars: Sequence[str]):
+        # bytes at or above accepted would make the first characters more likely, so are dropped
+        self.accepted = 256 - 256 % len(chars)
+        self.table = bytes(ord(chars[byte % len(chars)]) for byte in range(256))
+        self.delete = bytes(range(self.accepted, 256))
+
+    def draw(self, count: int) -> str:
+        """ draws count random characters """
+        drawn = b''
+        while len(drawn) < count:
+            # draw extra to make up for the dropped bytes
+            size = (count - len(drawn)) * 256 // self.accepted + 16
+            buffer = random.getrandbits(size * 8).to_bytes(size, 'little')
+            drawn += buffer.translate(self.table, self.delete)
+        return drawn[:count].decode('latin-1')
+
+
+def _translation_table(chars: Sequence[str]) -> Optional[_TranslationTable]:
+    """ table for the characters if they are all single byte characters, None otherwise """
+    if not 0 < len(chars) <= 256:
+        return None
+    if not all(len(char) == 1 and ord(char) < 256 for char in chars):
+        return None
+    return _TranslationTable(chars)
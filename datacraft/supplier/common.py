@@ -10,6 +10,9 @@ from collections import deque
 
 from .model import ValueSupplierInterface, CasterInterface, Distribution, ResettableIterator
 
+# most iterations a RecordCachedSupplier keeps values for, enough for all the objects of a large nested count
+_RECORD_CACHE_SIZE = 4096
+
 
 class SingleValue(ValueSupplierInterface):
     """
@@ -120,6 +123,124 @@ class CastingSupplier(ValueSupplierInterface):
         return self.caster.cast(self.wrapped.next(iteration))
 
 
+class AlteredSupplier(ValueSupplierInterface):
+    """
+    Class that applies all configured alterations (cast, decorate, buffer, and count) to the values of another supplier
+    in a single step. Produces the same values as stacking the CastingSupplier, DecoratedSupplier,
+    BufferedValueSupplier and MultipleValueSupplier in that order. A next function specialized to the configured
+    alterations is built once, so each value only pays for the alterations that are in use.
+    """
+
+    def __init__(self,
+                 wrapped: ValueSupplierInterface,
+                 caster: Optional[CasterInterface] = None,
+                 decorate: bool = False,
+                 buffer_size: Optional[int] = None,
+                 count_supplier: Optional[ValueSupplierInterface] = None,
+                 **kwargs):
+        """
+        Args:
+            wrapped: supplier that provides values
+            caster: to use to cast values
+            decorate: if the values should have the prefix, suffix, and quote added
+            buffer_size: size of buffer to use, None for no buffering
+            count_supplier: supplier that provides the number of values to generate, None for a single value
+            **kwargs: prefix, suffix, and quote for decorating
+        """
+        self.wrapped = wrapped
+        self.caster = caster
+        quote = kwargs.get('quote', '')
+        self.head = f"{quote}{kwargs.get('prefix', '')}" if decorate else None
+        self.tail = f"{kwargs.get('suffix', '')}{quote}" if decorate else None
+        self.buffer: Optional[deque] = deque(maxlen=buffer_size) if buffer_size is not None else None
+        self.current = -1
+        self.count_supplier = count_supplier
+        # replaces the next method on this instance, avoids an extra call per value
+        self.next = self._next_function()  # type: ignore  # pylint: disable=method-hidden
+
+    def next(self, iteration):
+        # replaced by specialized function in __init__
+        return self._next_function()(iteration)
+
+    def next_batch(self, iteration, count):
+        if self.count_supplier is not None or self.buffer is not None:
+            next_value = self.next
+            return [next_value(iteration + i) for i in range(count)]
+        values = self.wrapped.next_batch(iteration, count)
+        cast = self.caster.cast if self.caster is not None else None
+        if cast is not None:
+            values = [cast(value) for value in values]
+        if self.head is not None:
+            head = self.head
+            tail = self.tail
+            values = [[f'{head}{val}{tail}' for val in value] if isinstance(value, list) else f'{head}{value}{tail}'
+                      for value in values]
+        return values
+
+    def _next_function(self):
+        """ builds the function for the next value with only the configured alterations """
+        value_for = self._value_function()
+        if self.buffer is not None:
+            value_for = self._buffered_function(value_for)
+        if self.count_supplier is None:
+            return value_for
+        count_next = self.count_supplier.next
+
+        def multiple(iteration):
+            return [value_for(iteration + i) for i in range(count_next(iteration))]
+
+        return multiple
+
+    def _value_function(self):
+        """ function that gets the cast and decorated value from the wrapped supplier """
+        wrapped_next = self.wrapped.next
+        head = self.head
+        tail = self.tail
+        if self.caster is None and head is None:
+            return wrapped_next
+        if head is None:
+            cast = self.caster.cast  # type: ignore
+
+            def cast_value(iteration):
+                return cast(wrapped_next(iteration))
+
+            return cast_value
+        if self.caster is None:
+            def decorate_value(iteration):
+                value = wrapped_next(iteration)
+                if isinstance(value, list):
+                    return [f'{head}{val}{tail}' for val in value]
+                return f'{head}{value}{tail}'
+
+            return decorate_value
+        cast = self.caster.cast
+
+        def cast_and_decorate_value(iteration):
+            value = cast(wrapped_next(iteration))
+            if isinstance(value, list):
+                return [f'{head}{val}{tail}' for val in value]
+            return f'{head}{value}{tail}'
+
+        return cast_and_decorate_value
+
+    def _buffered_function(self, value_for):
+        """ wraps the value function so previously generated values are served from the buffer """
+        buffer = self.buffer
+
+        def buffered_value(iteration):
+            if iteration > self.current:
+                value = value_for(iteration)
+                buffer.append(value)  # type: ignore
+                self.current = iteration
+                return value
+            idx = len(buffer) - (self.current - iteration) - 1  # type: ignore
+            if idx < 0:
+                raise ValueError('Buffer index out of range')
+            return buffer[idx]  # type: ignore
+
+        return buffered_value
+
+
 class RandomRangeSupplier(ValueSupplierInterface):
     """
     Class that supplies values uniformly selected from specified bounds
@@ -201,6 +322,70 @@ class BufferedValueSupplier(ValueSupplierInterface):
         return self.buffer[idx]
 
 
+class RecordCachedSupplier(ValueSupplierInterface):
+    """
+    Class for sharing the values of another supplier between everything that uses it. The wrapped supplier is only
+    called once for each iteration, so all the fields that use it get the same value in a record
+    """
+
+    def __init__(self, wrapped: ValueSupplierInterface, caching: bool = True):
+        """
+        Args:
+            wrapped: supplier to cache values for
+            caching: if values are cached, if not every call goes to the wrapped supplier until caching is set
+        """
+        self.wrapped = wrapped
+        self.caching = caching
+        # values for consecutive iterations from start, shared by next and next_batch
+        self.start = 0
+        self.values: list = []
+
+    def next(self, iteration):
+        if not self.caching:
+            return self.wrapped.next(iteration)
+        offset = iteration - self.start
+        if 0 <= offset < len(self.values):
+            return self.values[offset]
+        value = self.wrapped.next(iteration)
+        self._store(iteration, [value])
+        return value
+
+    def next_batch(self, iteration: int, count: int) -> list:
+        if not self.caching:
+            return self.wrapped.next_batch(iteration, count)
+        start = self.start
+        end = start + len(self.values)
+        if iteration >= end or iteration + count <= start:
+            values = self.wrapped.next_batch(iteration, count)
+            self._store(iteration, values)
+            return values
+        # only the iterations on either side of the cached ones are new
+        if iteration < start:
+            self.values[:0] = self.wrapped.next_batch(iteration, start - iteration)
+            self.start = iteration
+        if iteration + count > end:
+            self.values.extend(self.wrapped.next_batch(end, iteration + count - end))
+        offset = iteration - self.start
+        values = self.values[offset:offset + count]
+        self._trim()
+        return values
+
+    def _store(self, iteration: int, values: list):
+        """ caches the values for the iterations from iteration, the cache starts over unless they follow on """
+        if iteration != self.start + len(self.values):
+            self.start = iteration
+            self.values = []
+        self.values.extend(values)
+        self._trim()
+
+    def _trim(self):
+        """ drops the values for the oldest iterations once there are too many """
+        excess = len(self.values) - _RECORD_CACHE_SIZE
+        if excess > 0:
+            del self.values[:excess]
+            self.start += excess
+
+
 class WeightedValueSupplier(ValueSupplierInterface):
     """
     Value supplier implementation for weighted values
@@ -2,13 +2,22 @@
 Module for csv supplier implementations
 """
 import csv
+import hashlib
+import json
+import logging
+import os
 import random
+import struct
+import sys
 from abc import ABC, abstractmethod
-from typing import Union, Dict
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from .exceptions import SupplierException
 from .model import ValueSupplierInterface
+from . import shared
 
+_log = logging.getLogger(__name__)
 _DEFAULT_BUFFER_SIZE = 1000000
 
 
@@ -194,6 +203,55 @@ class _BufferedCsvData(CsvData):
         return self.data[idx][colidx]
 
 
+class _SharedCsvData(CsvData):
+    """
+    CSV Data that is published once into shared memory and attached to by other processes. Supports sampling of
+    columns, sampling at a row level, and counts greater than 1.
+    """
+
+    def __init__(self, csv_path: str, delimiter: str, quotechar: str, has_headers: bool, sample_rows: bool):
+        self.csv_path = csv_path
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.sample_rows = sample_rows
+        self.current = -1
+        self.idx = -1
+        self.table = shared.share_csv(csv_path, delimiter, quotechar)
+        # header row stays in shared memory, skip over it
+        self.start = 1 if has_headers else 0
+        self.size = len(self.table) - self.start
+        if self.size <= 0:
+            raise SupplierException(f'No data rows found in csv: {csv_path}')
+        if has_headers:
+            first_row = self.table.row(0)
+            self.mapping = {first_row[i]: i for i in range(len(first_row))}
+        else:
+            self.mapping = {}
+        self.valid_keys = list(self.mapping.keys())
+        if len(self.valid_keys) == 0:
+            self.valid_keys = [i + 1 for i in range(self.table.num_columns)]
+
+    def _load_data(self):
+        return self.table
+
+    def next(self, field, iteration, sample, count):
+        colidx = self._get_column_index(field)
+        if self.sample_rows:
+            # update the index only when the iteration changes
+            if iteration != self.current:
+                self.current = iteration
+                self.idx = random.randint(0, self.size - count)
+            indices = [self.idx + i for i in range(count)]
+        elif sample:
+            indices = [random.randint(0, self.size - 1) for _ in range(count)]
+        else:
+            indices = [(iteration + i) % self.size for i in range(count)]
+        values = [self.table.cell(self.start + idx, colidx) for idx in indices]
+        if count == 1:
+            return values[0]
+        return values
+
+
 class _CsvSupplier(ValueSupplierInterface):
     """
     Class for supplying data from a specific field in a csv file
@@ -210,8 +268,8 @@ class _CsvSupplier(ValueSupplierInterface):
         return self.csv_data.next(self.field_name, iteration, self.sample, count)
 
 
-# to keep from reloading the same CsvData
-_csv_data_cache: Dict[str, CsvData] = {}
+# to keep from reloading the same CsvData, keyed by path and if the data is in shared memory
+_csv_data_cache: Dict[Tuple[str, bool], CsvData] = {}
 
 
 def load_csv_data(csv_path: str,
@@ -219,7 +277,8 @@ def load_csv_data(csv_path: str,
                   has_headers: bool,
                   quotechar: str,
                   sample_rows: bool,
-                  use_buffering: bool) -> CsvData:
+                  use_buffering: bool,
+                  shared_memory: bool = False) -> CsvData:
     """
     Loads the csv appropriate CSVDataBase
 
@@ -230,14 +289,19 @@ def load_csv_data(csv_path: str,
         quotechar: what counts as a quote
         sample_rows: if sampling should happen at a row level, not valid if buffering is set to true
         use_buffering: if the source file is large enough that buffering should be employed
+        shared_memory: if the data should be published to or attached from shared memory so that sibling processes
+                       share a single copy of the data, ignores use_buffering
 
     Returns:
         CsvData to supply csv data from
     """
-    if csv_path in _csv_data_cache:
-        return _csv_data_cache.get(csv_path)  # type: ignore
+    cache_key = (csv_path, shared_memory)
+    if cache_key in _csv_data_cache:
+        return _csv_data_cache[cache_key]
 
-    if use_buffering:
+    if shared_memory:
+        csv_data = _SharedCsvData(csv_path, delimiter, quotechar, has_headers, sample_rows)  # type: ignore
+    elif use_buffering:
         if sample_rows:
             csv_data = _RowLevelSampleEnabledCsv(csv_path, delimiter, quotechar, has_headers)  # type: ignore
         else:
@@ -245,7 +309,7 @@ def load_csv_data(csv_path: str,
     else:
         csv_data = _BufferedCsvData(csv_path, delimiter, quotechar, has_headers, _DEFAULT_BUFFER_SIZE)  # type: ignore
 
-    _csv_data_cache[csv_path] = csv_data
+    _csv_data_cache[cache_key] = csv_data
 
     return csv_data
 
@@ -267,3 +331,197 @@ def csv_supplier(field_name: str,
         ValueSupplierInterface for csv field
     """
     return _CsvSupplier(csv_data, field_name, sample, count_supplier)
+
+
+class WeightedCsvData:
+    """
+    Values and running total of the weights read from two columns of a CSV file, loaded once and shared by every
+    weighted_csv field that uses the same columns of the same file
+    """
+
+    def __init__(self, choices: Sequence[Any], cum_weights: Sequence[float]):
+        """
+        Args:
+            choices: values to choose from
+            cum_weights: cumulative weight for each value
+        """
+        self.choices = choices
+        self.cum_weights = cum_weights
+
+
+# magic, number of rows, size of the json encoded values
+_WEIGHTED_CACHE_HEADER = struct.Struct('<8sQQ')
+_WEIGHTED_CACHE_MAGIC = b'DCWCSV01'
+_WEIGHT_SIZE = array('d').itemsize
+
+# to keep from reloading the same weighted columns, keyed by file, file size, mtime and columns
+_weighted_csv_cache: Dict[tuple, WeightedCsvData] = {}
+
+
+def load_weighted_csv_data(csv_path: str,
+                           column: Union[int, str],
+                           weight_column: Union[int, str],
+                           delimiter: str = ',',
+                           quotechar: str = '"',
+                           cache_dir: Optional[str] = None,
+                           shared_memory: bool = False) -> WeightedCsvData:
+    """
+    Loads the values and weights from the CSV file in a single pass. The first row of the file is the header row.
+
+    Args:
+        csv_path: Path to CSV file to use
+        column: one based column number or name of the column with the values
+        weight_column: one based column number or name of the column with the weights
+        delimiter: how items are separated
+        quotechar: what counts as a quote
+        cache_dir: directory to keep a binary copy of the loaded columns in, so later runs skip parsing the CSV file
+        shared_memory: if the values and weights should be published to or attached from shared memory so that sibling
+                       processes share a single copy of them, only the process that publishes them reads the file
+
+    Returns:
+        WeightedCsvData for the columns
+    """
+    stat = os.stat(csv_path)
+    key = (os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns, column, weight_column, delimiter, quotechar)
+    cache_key = key + (shared_memory,)
+    if cache_key in _weighted_csv_cache:
+        return _weighted_csv_cache[cache_key]
+    if shared_memory:
+        loaded: List[WeightedCsvData] = []
+
+        def load() -> WeightedCsvData:
+            if not loaded:
+                loaded.append(_load_weighted_columns(csv_path, key, cache_dir))
+            return loaded[0]
+
+        weighted_data = WeightedCsvData(shared.share_list(('weighted_csv',) + key, lambda: load().choices),
+                                        shared.share_floats(('weighted_csv',) + key, lambda: load().cum_weights))
+    else:
+        weighted_data = _load_weighted_columns(csv_path, key, cache_dir)
+    _weighted_csv_cache[cache_key] = weighted_data
+    return weighted_data
+
+
+def _load_weighted_columns(csv_path: str, key: tuple, cache_dir: Optional[str]) -> WeightedCsvData:
+    """ reads the columns from the cache file if there is one, otherwise from the csv file """
+    _, _, _, column, weight_column, delimiter, quotechar = key
+    cache_file = None
+    weighted_data = None
+    if cache_dir:
+        digest = hashlib.sha1(repr((key, sys.byteorder)).encode('utf-8')).hexdigest()
+        cache_file = os.path.join(cache_dir, f'{digest}.wcsv')
+        weighted_data = _read_weighted_cache(cache_file)
+    if weighted_data is None:
+        weighted_data = _read_weighted_columns(csv_path, column, weight_column, delimiter, quotechar)
+        if cache_file:
+            _write_weighted_cache(cache_file, weighted_data)
+    return weighted_data
+
+
+def _read_weighted_columns(csv_path: str,
+                           column: Union[int, str],
+                           weight_column: Union[int, str],
+                           delimiter: str,
+                           quotechar: str) -> WeightedCsvData:
+    """ reads the values and weights from the file """
+    choices = []
+    cum_weights = array('d')
+    total = 0.0
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile, delimiter=delimiter, quotechar=quotechar)
+        header = next(reader, [])
+        value_index = _weighted_column_index(header, column)
+        weight_index = _weighted_column_index(header, weight_column)
+        for row in reader:
+            if not row:
+                continue
+            choices.append(row[value_index])
+            total += float(row[weight_index])
+            cum_weights.append(total)
+    return WeightedCsvData(choices, cum_weights)
+
+
+def _weighted_column_index(header: list, column: Union[int, str]) -> int:
+    """ zero based index of the column """
+    if isinstance(column, int):
+        return column - 1
+    if column not in header:
+        raise SupplierException(f'Invalid field name: {column} for csv, known keys: {header}')
+    return header.index(column)
+
+
+def _read_weighted_cache(cache_file: str) -> Optional[WeightedCsvData]:
+    """ loads the cached columns, None if there is no valid cache file """
+    try:
+        with open(cache_file, 'rb') as handle:
+            raw = handle.read()
+    except OSError:
+        return None
+    if len(raw) < _WEIGHTED_CACHE_HEADER.size:
+        return None
+    magic, num_rows, size = _WEIGHTED_CACHE_HEADER.unpack_from(raw, 0)
+    weights_end = _WEIGHTED_CACHE_HEADER.size + num_rows * _WEIGHT_SIZE
+    if magic != _WEIGHTED_CACHE_MAGIC or len(raw) != weights_end + size:
+        return None
+    cum_weights = array('d')
+    cum_weights.frombytes(raw[_WEIGHTED_CACHE_HEADER.size:weights_end])
+    choices = json.loads(raw[weights_end:].decode('utf-8'))
+    _log.debug('Loaded %s weighted values from %s', num_rows, cache_file)
+    return WeightedCsvData(choices, cum_weights)
+
+
+def _write_weighted_cache(cache_file: str, weighted_data: WeightedCsvData):
+    """ saves the columns, written to a temp file first so readers never see a partial file """
+    encoded = json.dumps(list(weighted_data.choices)).encode('utf-8')
+    cum_weights = array('d', weighted_data.cum_weights)
+    temp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, 'wb') as handle:
+            handle.write(_WEIGHTED_CACHE_HEADER.pack(_WEIGHTED_CACHE_MAGIC, len(cum_weights), len(encoded)))
+            handle.write(cum_weights.tobytes())
+            handle.write(encoded)
+        os.replace(temp_file, cache_file)
+    except OSError as err:
+        _log.warning('Unable to cache weighted csv data to %s: %s', cache_file, err)
+
+
+def weighted_csv_supplier(weighted_data: WeightedCsvData,
+                          count_supplier: ValueSupplierInterface) -> ValueSupplierInterface:
+    """
+    Creates supplier that chooses values from the weighted csv data according to the weights
+
+    Args:
+        weighted_data: values and weights to choose from
+        count_supplier: supplier for counts
+
+    Returns:
+        ValueSupplierInterface for weighted csv field
+    """
+    return _WeightedCsvSupplier(weighted_data, count_supplier)
+
+
+class _WeightedCsvSupplier(ValueSupplierInterface):
+    """ Chooses values using the precomputed cumulative weights, so each choice is a binary search """
+
+    def __init__(self, weighted_data: WeightedCsvData, count_supplier: ValueSupplierInterface):
+        self.choices = weighted_data.choices
+        self.cum_weights = weighted_data.cum_weights
+        self.count_supplier = count_supplier
+
+    def next(self, iteration):
+        count = self.count_supplier.next(iteration)
+        values = random.choices(self.choices, cum_weights=self.cum_weights, k=count)
+        if count == 1:
+            return values[0]
+        return values
+
+    def next_batch(self, iteration: int, count: int) -> list:
+        counts = self.count_supplier.next_batch(iteration, count)
+        if all(value_count == 1 for value_count in counts):
+            return random.choices(self.choices, cum_weights=self.cum_weights, k=count)
+        values = []
+        for value_count in counts:
+            chosen = random.choices(self.choices, cum_weights=self.cum_weights, k=value_count)
+            values.append(chosen[0] if value_count == 1 else chosen)
+        return values
@@ -2,13 +2,56 @@
 Module for date type implementations
 """
 import datetime
+import locale
 import logging
-from typing import Union, Tuple
+import re
+from typing import Union, Tuple, List, Dict, Optional, Iterable
 
 from .model import ValueSupplierInterface, Distribution
 
 _log = logging.getLogger(__name__)
 
+_SECONDS_IN_HOUR = 3600
+_SECONDS_IN_DAY = 86400
+# date.toordinal() for 1970-01-01
+_EPOCH_ORDINAL = 719163
+_EPOCH = datetime.datetime(1970, 1, 1)
+# caches stop growing past this many entries, about two years of hours, values outside the cache use datetime
+_MAX_CACHE_SIZE = 17568
+_DIRECTIVE = re.compile('%(.)', re.DOTALL)
+_MONTH_ABBR = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+_MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+                'November', 'December']
+_DAY_ABBR = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+_DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# directives that only depend on the day, these are rendered once per day
+_DAY_DIRECTIVES = {
+    'Y': lambda day: str(day.year),
+    'y': lambda day: f'{day.year % 100:02d}',
+    'm': lambda day: f'{day.month:02d}',
+    'd': lambda day: f'{day.day:02d}',
+    'j': lambda day: f'{day.timetuple().tm_yday:03d}',
+    'b': lambda day: _MONTH_ABBR[day.month - 1],
+    'B': lambda day: _MONTH_NAMES[day.month - 1],
+    'a': lambda day: _DAY_ABBR[day.weekday()],
+    'A': lambda day: _DAY_NAMES[day.weekday()],
+}
+# directives that only depend on the hour, these are rendered once per local hour
+_HOUR_DIRECTIVES = {
+    'H': lambda hour: f'{hour:02d}',
+    'I': lambda hour: f'{hour % 12 or 12:02d}',
+    'p': lambda hour: 'AM' if hour < 12 else 'PM',
+}
+# directives rendered per value as positional %-style placeholders
+_MINUTE_DIRECTIVES = {
+    'M': '%02d',
+    'S': '%02d',
+    'f': '%06d',
+}
+_MISSING = object()
+# directives whose output depends on the locale
+_LOCALE_DIRECTIVES = {'b', 'B', 'a', 'A', 'p'}
+
 
 def date_supplier(date_format: str,
                   timestamp_distribution: Distribution,
@@ -42,6 +85,209 @@ def epoch_date_supplier(timestamp_distribution: Distribution,
     return _EpochDateSupplier(timestamp_distribution, is_millis)
 
 
+def date_formatter(date_format: Optional[str]) -> 'DateFormatter':
+    """
+    Creates a formatter that converts epoch timestamps into local date strings
+
+    Args:
+        date_format: strftime style format string, None or empty means ISO format without microseconds
+
+    Returns:
+        DateFormatter for the format
+    """
+    return DateFormatter(date_format)
+
+
+class DateFormatter:
+    """
+    Formats epoch timestamps as local date strings. Produces the same output as ``datetime.fromtimestamp(ts)`` followed
+    by ``strftime``, but without creating a datetime for every value.
+
+    The format string is compiled once into a plan. The calendar fields are computed arithmetically from the epoch
+    seconds. Everything down to the hour is rendered once per local hour and cached, so only the minutes, seconds, and
+    microseconds are formatted per value. Formats with directives that the plan does not support fall back to strftime.
+    """
+
+    def __init__(self, date_format: Optional[str]):
+        """
+        Args:
+            date_format: strftime style format string, None or empty means ISO format without microseconds
+        """
+        self.date_format = date_format if date_format else '%Y-%m-%dT%H:%M:%S'
+        self.iso = not date_format
+        self.parts = _compile(self.date_format)
+        minute_fields = [value for kind, value in self.parts if kind == 'minute'] if self.parts else []
+        # formats without hour directives only need one template per day
+        self._hours_per_key = 1 if self.parts and any(kind == 'hour' for kind, _ in self.parts) else 24
+        self._minute_values = _minute_values(minute_fields)
+        self._offsets: Dict[int, Optional[int]] = {}
+        self._templates: Dict[int, str] = {}
+
+    @property
+    def compiled(self) -> bool:
+        """ if the format could be compiled into a plan, otherwise strftime is used """
+        return self.parts is not None
+
+    def format(self, timestamp: float, hour: Optional[int] = None) -> str:
+        """
+        Formats the timestamp as a local date string
+
+        Args:
+            timestamp: seconds since epoch
+            hour: optional hour to replace the hour of the date with
+
+        Returns:
+            formatted date string
+        """
+        if hour is None:
+            return self.format_batch((timestamp,))[0]
+        return self.format_batch((timestamp,), (hour,))[0]
+
+    def format_batch(self, timestamps: Iterable[float], hours: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Formats a column of timestamps at once
+
+        Args:
+            timestamps: seconds since epoch for each value
+            hours: optional hours to replace the hour of each date with
+
+        Returns:
+            list of formatted date strings
+        """
+        if self.parts is None:
+            if hours is None:
+                return [self._format_slow(timestamp, None) for timestamp in timestamps]
+            return [self._format_slow(timestamp, hour) for timestamp, hour in zip(timestamps, hours)]
+
+        offsets = self._offsets
+        templates = self._templates
+        minute_values = self._minute_values
+        hours_per_key = self._hours_per_key
+        formatted = []
+        hour_iter = iter(hours) if hours is not None else None
+        for timestamp in timestamps:
+            hour = next(hour_iter) if hour_iter is not None else None
+            seconds = int(timestamp)
+            # same rounding as datetime.fromtimestamp, fraction is exact so this matches math.modf
+            micros = round((timestamp - seconds) * 1e6)
+            if micros >= 1000000:
+                seconds += 1
+                micros -= 1000000
+            elif micros < 0:
+                seconds -= 1
+                micros += 1000000
+            offset = offsets.get(seconds // _SECONDS_IN_HOUR, _MISSING)
+            if offset is _MISSING:
+                offset = self._offset(seconds)
+            if offset is None:
+                formatted.append(self._format_slow(timestamp, hour))
+                continue
+            local_hour, second_of_hour = divmod(seconds + offset, _SECONDS_IN_HOUR)  # type: ignore
+            if hour is not None:
+                local_hour = (local_hour // 24) * 24 + int(hour)
+            template = templates.get(local_hour // hours_per_key)
+            if template is None:
+                template = self._hour_template(local_hour)
+                if template is None:
+                    formatted.append(self._format_slow(timestamp, hour))
+                    continue
+            minutes, secs = divmod(second_of_hour, 60)
+            formatted.append(template % minute_values(minutes, secs, micros))
+        return formatted
+
+    def _offset(self, seconds: int) -> Optional[int]:
+        """ local utc offset in seconds for the hour containing seconds, None if the offset changes in that hour """
+        if len(self._offsets) >= _MAX_CACHE_SIZE:
+            return None
+        bucket = seconds // _SECONDS_IN_HOUR
+        start = bucket * _SECONDS_IN_HOUR
+        offset: Optional[int]
+        try:
+            offset = _local_offset(start)
+            if _local_offset(start + _SECONDS_IN_HOUR - 1) != offset:
+                # daylight savings or other transition during this hour
+                offset = None
+        except (OverflowError, OSError, ValueError):
+            offset = None
+        self._offsets[bucket] = offset
+        return offset
+
+    def _hour_template(self, local_hour: int) -> Optional[str]:
+        """ renders the directives down to the hour, leaving %-style placeholders for the minute level directives """
+        if len(self._templates) >= _MAX_CACHE_SIZE:
+            return None
+        day_number, hours = divmod(local_hour, 24)
+        day = datetime.date.fromordinal(day_number + _EPOCH_ORDINAL)
+        pieces = []
+        for kind, value in self.parts:  # type: ignore
+            if kind == 'literal':
+                rendered = value
+            elif kind == 'day':
+                rendered = _DAY_DIRECTIVES[value](day)
+            elif kind == 'hour':
+                rendered = _HOUR_DIRECTIVES[value](hours)
+            else:
+                pieces.append(_MINUTE_DIRECTIVES[value])
+                continue
+            pieces.append(rendered.replace('%', '%%'))
+        template = ''.join(pieces)
+        self._templates[local_hour // self._hours_per_key] = template
+        return template
+
+    def _format_slow(self, timestamp: float, hour: Optional[int]) -> str:
+        """ datetime based formatting for unsupported formats or transition hours """
+        next_date = datetime.datetime.fromtimestamp(timestamp)
+        if hour is not None:
+            next_date = next_date.replace(hour=int(hour))
+        if self.iso:
+            return next_date.replace(microsecond=0).isoformat()
+        return next_date.strftime(self.date_format)
+
+
+def _compile(date_format: str) -> Optional[List[Tuple[str, str]]]:
+    """ compiles the format into list of (kind, value) tuples, None if the format has unsupported directives """
+    c_locale = locale.setlocale(locale.LC_TIME) in ('C', 'POSIX')
+    parts = []
+    position = 0
+    for match in _DIRECTIVE.finditer(date_format):
+        if match.start() > position:
+            parts.append(('literal', date_format[position:match.start()]))
+        position = match.end()
+        directive = match.group(1)
+        if directive == '%':
+            parts.append(('literal', '%'))
+        elif directive in _LOCALE_DIRECTIVES and not c_locale:
+            return None
+        elif directive in _DAY_DIRECTIVES:
+            parts.append(('day', directive))
+        elif directive in _HOUR_DIRECTIVES:
+            parts.append(('hour', directive))
+        elif directive in _MINUTE_DIRECTIVES:
+            parts.append(('minute', directive))
+        else:
+            return None
+    if position < len(date_format):
+        parts.append(('literal', date_format[position:]))
+    return parts
+
+
+def _minute_values(fields: List[str]):
+    """ function that orders minutes, seconds, and micros to match the placeholders in the hour template """
+    if fields == ['M', 'S', 'f']:
+        return lambda minutes, secs, micros: (minutes, secs, micros)
+    if fields == ['M', 'S']:
+        return lambda minutes, secs, micros: (minutes, secs)
+    index = {'M': 0, 'S': 1, 'f': 2}
+    order = [index[field] for field in fields]
+    return lambda *values: tuple(values[i] for i in order)
+
+
+def _local_offset(seconds: int) -> int:
+    """ utc offset in seconds of the local timezone at the given epoch seconds """
+    local = datetime.datetime.fromtimestamp(seconds)
+    return int((local - _EPOCH).total_seconds()) - seconds
+
+
 class _DateSupplier(ValueSupplierInterface):
     """
     Value Supplier implementation for dates
@@ -60,16 +306,20 @@ class _DateSupplier(ValueSupplierInterface):
         self.date_format = date_format_string
         self.timestamp_distribution = timestamp_distribution
         self.hour_supplier = hour_supplier
+        self.formatter = date_formatter(date_format_string)
 
     def next(self, iteration):
         random_seconds = self.timestamp_distribution.next_value()
-        next_date = datetime.datetime.fromtimestamp(random_seconds)
         if self.hour_supplier:
-            next_hour = self.hour_supplier.next(iteration)
-            next_date = next_date.replace(hour=int(next_hour))
-        if self.date_format:
-            return next_date.strftime(self.date_format)
-        return next_date.replace(microsecond=0).isoformat()
+            return self.formatter.format(random_seconds, self.hour_supplier.next(iteration))
+        return self.formatter.format(random_seconds)
+
+    def next_batch(self, iteration, count):
+        timestamps = [self.timestamp_distribution.next_value() for _ in range(count)]
+        if self.hour_supplier:
+            hours = self.hour_supplier.next_batch(iteration, count)
+            return self.formatter.format_batch(timestamps, hours)
+        return self.formatter.format_batch(timestamps)
 
 
 class _EpochDateSupplier(ValueSupplierInterface):
@@ -82,6 +82,25 @@ def from_spec(specs: Union[dict, DataSpec]) -> KeyProviderInterface:
     return _KeyListProvider(keys)
 
 
+def field_groups(specs: Union[dict, DataSpec]) -> Dict[str, List[str]]:
+    """
+    Determines the name and list of keys for each of the field groups the key provider for the spec would supply
+
+    Args:
+        specs: to get field groups for
+
+    Returns:
+        dictionary of group name to keys in the group
+    """
+    raw_spec = specs.raw_spec if isinstance(specs, DataSpec) else specs
+    groups = raw_spec.get('field_groups')
+    if isinstance(groups, dict):
+        return {str(name): keys for name, keys in groups.items()}
+    if isinstance(groups, list):
+        return {'_'.join(keys): keys for keys in groups}
+    return {'ALL': [key for key in raw_spec.keys() if key not in _ROOT_KEYS]}
+
+
 class _KeyListProvider(KeyProviderInterface):
     """ Class the provides static list of keys """
 
@@ -1,9 +1,10 @@
 """
 Module to hold models for core data structures and classes
 """
+import copy
 from abc import ABC, abstractmethod
 from collections.abc import Iterator
-from typing import Union, Tuple, List, Any, Generator, Dict
+from typing import Union, Tuple, List, Any, Generator, Dict, Optional
 
 
 class DataSpec(dict):
@@ -13,19 +14,30 @@ class DataSpec(dict):
     def __init__(self, raw_spec: dict):
         super().__init__()
         self.raw_spec = raw_spec
+        # if the raw spec has been through the preprocessors, cleared once the spec or any of the nested specs handed
+        # out could have been changed, so that the spec is preprocessed again
+        self.preprocessed = False
 
     def __delitem__(self, key):
+        self.preprocessed = False
         return self.raw_spec.__delitem__(key)
 
     def __setitem__(self, key, value):
+        self.preprocessed = False
         return self.raw_spec.__setitem__(key, value)
 
     def __getitem__(self, key):
+        self.preprocessed = False
         return self.raw_spec.__getitem__(key)
 
     def __contains__(self, key):
         return self.raw_spec.__contains__(key)
 
+    def __deepcopy__(self, memo):
+        copied = type(self)(copy.deepcopy(self.raw_spec, memo))
+        copied.preprocessed = self.preprocessed
+        return copied
+
     def __repr__(self):
         return str(self.raw_spec)
 
@@ -36,18 +48,22 @@ class DataSpec(dict):
         return len(self.raw_spec)
 
     def get(self, *args, **kwargs):
+        self.preprocessed = False
         return self.raw_spec.get(*args, **kwargs)
 
     def items(self):
+        self.preprocessed = False
         return self.raw_spec.items()
 
     def keys(self):
         return self.raw_spec.keys()
 
     def values(self):
+        self.preprocessed = False
         return self.raw_spec.values()
 
     def pop(self, k, d=None):
+        self.preprocessed = False
         return self.raw_spec.pop(k, d)
 
     @abstractmethod
@@ -83,17 +99,63 @@ class DataSpec(dict):
         """
 
     @abstractmethod
-    def to_pandas(self, iterations: int):
+    def to_pandas(self, iterations: int, chunk_size: Optional[int] = None, **kwargs):
         """
-        Converts iterations number of records into a pandas DataFrame
+        Converts iterations number of records into a pandas DataFrame. Records are generated and converted into typed
+        columns chunk_size records at a time. Nested fields are flattened into columns named by the dotted path to the
+        value, the same as pandas.json_normalize.
 
         Args:
             iterations: number of iterations to run / records to generate
+            chunk_size: number of records to convert at a time, default is frame_chunk_size default
+
+        Keyword Args:
+            data_dir (str): path the data directory with csv files and such
+            enforce_schema (bool): If schema validation should be applied where possible
 
         Returns:
             DataFrame with records as rows
         """
 
+    @abstractmethod
+    def stream(self, iterations: int, batch_size: Optional[int] = None, prefetch: int = 0, **kwargs) -> Generator:
+        """
+        Creates a generator that yields lists of up to batch_size records, or rendered template strings. With prefetch,
+        a background thread generates up to that many batches ahead while the caller works on the previous ones.
+
+        Args:
+            iterations: number of iterations to execute
+            batch_size: number of records in each batch, default is stream_batch_size default
+            prefetch: number of batches to generate ahead in the background, 0 means generate each batch on demand
+
+        Keyword Args:
+            processor: (RecordProcessor): For any Record Level transformations such templating or formatters
+            output: (OutputHandlerInterface): For any field or record level output
+            data_dir (str): path the data directory with csv files and such
+            enforce_schema (bool): If schema validation should be applied where possible
+
+        Yields:
+            Lists of records or rendered template strings
+        """
+
+    @abstractmethod
+    def to_arrow(self, iterations: int, chunk_size: Optional[int] = None, **kwargs):
+        """
+        Converts iterations number of records into a pyarrow Table. Each chunk of chunk_size records becomes a chunk of
+        the columns of the table. Nested fields are flattened into columns named by the dotted path to the value.
+
+        Args:
+            iterations: number of iterations to run / records to generate
+            chunk_size: number of records to convert at a time, default is frame_chunk_size default
+
+        Keyword Args:
+            data_dir (str): path the data directory with csv files and such
+            enforce_schema (bool): If schema validation should be applied where possible
+
+        Returns:
+            Table with records as rows
+        """
+
 
 class Distribution(ABC):
     """
@@ -110,6 +172,9 @@ class ValueSupplierInterface(ABC):
     Interface for Classes that supply values
     """
 
+    # set by suppliers that never produce the same value twice, so unique values need no checks
+    distinct = False
+
     @abstractmethod
     def next(self, iteration):
         """
@@ -122,6 +187,20 @@ class ValueSupplierInterface(ABC):
             the next value
         """
 
+    def next_batch(self, iteration: int, count: int) -> list:
+        """
+        Produces the values for count consecutive iterations starting at iteration. Suppliers that can generate many
+        values more efficiently at once should override this.
+
+        Args:
+            iteration: first iteration of batch
+            count: number of values to produce
+
+        Returns:
+            list of the next count values
+        """
+        return [self.next(iteration + i) for i in range(count)]
+
 
 class KeyProviderInterface(ABC):
     """ Interface for KeyProviders """
@@ -138,6 +217,12 @@ class KeyProviderInterface(ABC):
 class RecordProcessor(ABC):
     """A Class that takes in a generated record and returns it formatted as a string for output"""
 
+    # if records passed to this processor should include the _internal metadata i.e. iteration and field group
+    needs_internal = True
+    # set if processing a list of records is the same as processing each record and joining them with this separator,
+    # so the records can be written out one at a time instead of held as a list
+    record_separator: Optional[str] = None
+
     @abstractmethod
     def process(self, record: Union[list, dict]) -> str:
         """
@@ -164,6 +249,38 @@ class OutputHandlerInterface(ABC):
             value: the new value for the field
         """
 
+    def handle_record(self,
+                      iteration: int,
+                      group_name: str,
+                      record: dict,
+                      exclude_internal: bool = False):
+        """
+        This is called with the whole record once all of the fields for one iteration have been generated. The default
+        is to call handle for each field followed by finished_record. Handlers should override this to process the
+        record at once.
+
+        Args:
+            iteration: iteration we are on
+            group_name: group this record is apart of
+            record: generated record, should not be modified
+            exclude_internal: if external fields should be excluded from output record
+        """
+        for key, value in record.items():
+            self.handle(key, value)
+        self.finished_record(iteration, group_name, exclude_internal)
+
+    def handle_batch(self, batch: List[Tuple[int, str, dict]], exclude_internal: bool = False):
+        """
+        This is called with a batch of records when generating in batches. The default is to call handle_record for
+        each record in the batch.
+
+        Args:
+            batch: list of iteration, group name, and record for each record in the batch
+            exclude_internal: if external fields should be excluded from output records
+        """
+        for iteration, group_name, record in batch:
+            self.handle_record(iteration, group_name, record, exclude_internal)
+
     @abstractmethod
     def finished_record(self,
                         iteration: int,
@@ -3,11 +3,16 @@ Module for network supplier implementations
 """
 import ipaddress
 import random
-import string
-from typing import Dict
+from typing import Dict, List
 
 from .model import ValueSupplierInterface
 
+# text for each possible octet, avoids formatting ints for every address
+_OCTETS = [str(octet) for octet in range(256)]
+_HEX_OCTETS = [f'{octet:02X}' for octet in range(256)]
+# random octets are from 0 to 254
+_OCTET_RANGE = 255
+
 
 def ipv4(octet_supplier_map: Dict[str, ValueSupplierInterface]) -> ValueSupplierInterface:
     """
@@ -40,39 +45,118 @@ class _IpV4Supplier(ValueSupplierInterface):
         return f'{first}.{second}.{third}.{fourth}'
 
 
+def ipv4_random(base_octets: List[str]) -> ValueSupplierInterface:
+    """
+    Args:
+        base_octets: the fixed leading octets of the addresses, the remaining octets are random
+    """
+    return _IpV4RandomSupplier(base_octets)
+
+
+class _IpV4RandomSupplier(ValueSupplierInterface):
+    """
+    Generates random ip addresses with a fixed base by drawing a single random integer for all of the remaining octets.
+    Each random octet is in the range 0 to 254.
+    """
+
+    def __init__(self, base_octets: List[str]):
+        """
+        Args:
+            base_octets: the fixed leading octets of the addresses, the remaining octets are random
+        """
+        self.prefix = ''.join(octet + '.' for octet in base_octets)
+        self.num_random = 4 - len(base_octets)
+        self.limit = _OCTET_RANGE ** self.num_random
+
+    def next(self, iteration):
+        return self._to_text(random.randrange(self.limit))
+
+    def next_batch(self, iteration, count):
+        limit = self.limit
+        to_text = self._to_text
+        return [to_text(random.randrange(limit)) for _ in range(count)]
+
+    def _to_text(self, value: int) -> str:
+        """ formats the random value as the remaining octets in base 255 """
+        octets = []
+        for _ in range(self.num_random):
+            value, octet = divmod(value, _OCTET_RANGE)
+            octets.append(_OCTETS[octet])
+        return self.prefix + '.'.join(octets)
+
+
 def ip_precise(cidr: str, sample: bool) -> ValueSupplierInterface:
     """
     Args:
-        cidr: notation specifying ip range
+        cidr: notation specifying ip range, IPv4 or IPv6
         sample: if the ip addresses should be sampled from the available set
+
+    Raises:
+        ValueError if the cidr is not valid
     """
-    return _IpV4PreciseSupplier(cidr, sample)
+    return _IpPreciseSupplier(cidr, sample)
 
 
-class _IpV4PreciseSupplier(ValueSupplierInterface):
+class _IpPreciseSupplier(ValueSupplierInterface):
     """
-    Class that supports precise ip address generation by specifying cidr values, much slower for large ip ranges
+    Class that supports precise ip address generation by specifying cidr values. Addresses are computed as integer
+    offsets from the network address, so the size of the network does not matter.
     """
 
     def __init__(self, cidr: str, sample: bool):
         """
         Args:
-            cidr: notation specifying ip range
+            cidr: notation specifying ip range, IPv4 or IPv6
             sample: if the ip addresses should be sampled from the available set
         """
-        self.net = ipaddress.ip_network(cidr)
+        net = ipaddress.ip_network(cidr)
+        self.base = int(net.network_address)
+        self.size = net.num_addresses
         self.sample = sample
-        cnt = 0
-        for _ in self.net:
-            cnt += 1
-        self.size = cnt
+        self.to_text = _ipv4_text if net.version == 4 else _ipv6_text
 
     def next(self, iteration):
         if self.sample:
-            idx = random.randint(0, self.size - 1)
+            offset = random.randrange(self.size)
+        else:
+            offset = iteration % self.size
+        return self.to_text(self.base + offset)
+
+    def next_batch(self, iteration, count):
+        base = self.base
+        size = self.size
+        to_text = self.to_text
+        if self.sample:
+            return [to_text(base + random.randrange(size)) for _ in range(count)]
+        return [to_text(base + (i % size)) for i in range(iteration, iteration + count)]
+
+
+def _ipv4_text(address: int) -> str:
+    """ dotted quad text for the integer address """
+    return f'{_OCTETS[address >> 24]}.{_OCTETS[(address >> 16) & 255]}.' \
+           f'{_OCTETS[(address >> 8) & 255]}.{_OCTETS[address & 255]}'
+
+
+def _ipv6_text(address: int) -> str:
+    """ compressed text for the integer address, the longest run of two or more zero groups is replaced with :: """
+    hextets = [(address >> shift) & 0xFFFF for shift in range(112, -16, -16)]
+    best_start = -1
+    best_len = 1
+    run_start = -1
+    for idx, hextet in enumerate(hextets):
+        if hextet == 0:
+            if run_start < 0:
+                run_start = idx
+            if idx - run_start + 1 > best_len:
+                best_start = run_start
+                best_len = idx - run_start + 1
         else:
-            idx = iteration % self.size
-        return str(self.net[idx])
+            run_start = -1
+    if best_start < 0:
+        return ':'.join(f'{hextet:x}' for hextet in hextets)
+    head = ':'.join(f'{hextet:x}' for hextet in hextets[:best_start])
+    tail = ':'.join(f'{hextet:x}' for hextet in hextets[best_start + best_len:])
+    return f'{head}::{tail}'
 
 
 def mac_address(delim: str) -> ValueSupplierInterface:
@@ -91,8 +175,17 @@ class _MacAddressSupplier(ValueSupplierInterface):
             delim: how mac address pieces are separated
         """
         self.delim = delim
-        self.tokens = string.digits + 'ABCDEF'
 
     def next(self, iteration):
-        parts = [''.join(random.sample(self.tokens, 2)) for _ in range(6)]
-        return self.delim.join(parts)
+        return self._to_text(random.getrandbits(48))
+
+    def next_batch(self, iteration, count):
+        to_text = self._to_text
+        getrandbits = random.getrandbits
+        return [to_text(getrandbits(48)) for _ in range(count)]
+
+    def _to_text(self, value: int) -> str:
+        """ formats the 48 bit value as six delimited hex octets """
+        return self.delim.join([_HEX_OCTETS[(value >> 40) & 255], _HEX_OCTETS[(value >> 32) & 255],
+                                _HEX_OCTETS[(value >> 24) & 255], _HEX_OCTETS[(value >> 16) & 255],
+                                _HEX_OCTETS[(value >> 8) & 255], _HEX_OCTETS[value & 255]])
@@ -0,0 +1,360 @@
+"""
+Module for publishing reference data into shared memory so that multiple worker processes can attach to a single copy
+of the data instead of each loading their own.
+
+Data is published as a table of cells. The layout of a shared memory block is:
+
+.. code-block::
+
+    | header | offsets (uint64 * (rows * columns + 1)) | utf-8 encoded cell data |
+
+Numeric columns, i.e. weights, are published as a header followed by the packed doubles, and are read in place.
+
+The header holds a magic marker that is only written once the block is fully populated, so processes that attach
+while another process is still publishing will wait for the data to become ready.
+
+Blocks are tracked by the multiprocessing resource tracker and are removed once every process sharing the tracker has
+exited. Publishing the data before forking workers (i.e. gunicorn --preload) keeps a single copy for the life of the
+parent process.
+"""
+import csv
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+from array import array
+from collections.abc import Sequence
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from .exceptions import SupplierException
+
+_log = logging.getLogger(__name__)
+
+_MAGIC = b'DCSHM001'
+# magic, rows, columns, cell encoding
+_HEADER = struct.Struct('<8sQQQ')
+_OFFSET_SIZE = 8
+_ENCODING_STR = 0
+_ENCODING_JSON = 1
+_ENCODING_DOUBLE = 2
+_DOUBLE_SIZE = 8
+_READY_TIMEOUT_SECONDS = 60.0
+_READY_POLL_SECONDS = 0.05
+
+# segments this process has created or attached to, kept open for the life of the process
+_segments: Dict[str, shared_memory.SharedMemory] = {}
+# released segments that still have views held by suppliers, these cannot be closed until the views are
+_released: List[shared_memory.SharedMemory] = []
+
+
+class SharedTable:
+    """
+    Read only view of a table of cells stored in a shared memory block. Cells are decoded on access, the underlying
+    data is never copied into the process.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        """
+        Args:
+            shm: fully populated shared memory block
+        """
+        self.name = shm.name
+        buf = _buffer(shm)
+        _, self.num_rows, self.num_columns, encoding = _HEADER.unpack_from(buf, 0)
+        self.is_json = encoding == _ENCODING_JSON
+        num_offsets = self.num_rows * self.num_columns + 1
+        offsets_end = _HEADER.size + num_offsets * _OFFSET_SIZE
+        self._offsets = buf[_HEADER.size:offsets_end].cast('Q')
+        self._blob = buf[offsets_end:]
+
+    def __len__(self):
+        return self.num_rows
+
+    def cell(self, row: int, column: int) -> Any:
+        """
+        Decodes the value of a single cell
+
+        Args:
+            row: zero based row index
+            column: zero based column index
+
+        Returns:
+            the decoded value
+        """
+        if not 0 <= column < self.num_columns:
+            raise IndexError(f'column index {column} out of range')
+        idx = row * self.num_columns + column
+        raw = bytes(self._blob[self._offsets[idx]:self._offsets[idx + 1]])
+        if self.is_json:
+            return json.loads(raw)
+        return raw.decode('utf-8')
+
+    def row(self, row: int) -> List[Any]:
+        """
+        Decodes all the cells in a row
+
+        Args:
+            row: zero based row index
+
+        Returns:
+            list of decoded values for the row
+        """
+        return [self.cell(row, column) for column in range(self.num_columns)]
+
+
+class SharedList(Sequence):
+    """
+    Sequence backed by a single column SharedTable. Can be used anywhere a read only list is expected, including
+    random.sample
+    """
+
+    def __init__(self, table: SharedTable):
+        """
+        Args:
+            table: single column table with the list values
+        """
+        self.table = table
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table.cell(i, 0) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('shared list index out of range')
+        return self.table.cell(index, 0)
+
+
+def share_csv(csv_path: str, delimiter: str, quotechar: str) -> SharedTable:
+    """
+    Publishes the contents of the csv file into shared memory, or attaches to the existing copy if another process
+    has already published it. Files are identified by absolute path, size, and modification time, so an updated file
+    will be published as a new block.
+
+    Args:
+        csv_path: path to csv file
+        delimiter: how items are separated
+        quotechar: what counts as a quote
+
+    Returns:
+        SharedTable with all rows of the file, including any header row
+    """
+    stat = os.stat(csv_path)
+    name = _block_name('csv', os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns, delimiter, quotechar)
+
+    def rows():
+        with open(csv_path, newline='', encoding='utf-8') as csvfile:
+            yield from csv.reader(csvfile, delimiter=delimiter, quotechar=quotechar)
+
+    return _attach_or_publish(name, rows, _ENCODING_STR)
+
+
+def share_list(key: Tuple[Any, ...], load: Callable[[], Iterable[Any]]) -> SharedList:
+    """
+    Publishes the values returned by load into shared memory, or attaches to the existing copy if another process has
+    already published the values for the key. The key identifies the source of the values, i.e. the path, size, and
+    modification time of the file they are read from, so processes that attach never load or encode the values.
+
+    Args:
+        key: parts that identify the source of the values
+        load: returns the JSON serializable values, only called by the process that publishes them
+
+    Returns:
+        Sequence of the values backed by shared memory
+
+    Raises:
+        TypeError if the values are not JSON serializable
+    """
+    encoded: List[str] = []
+
+    def rows():
+        if not encoded:
+            encoded.extend(json.dumps(value) for value in load())
+        return ([value] for value in encoded)
+
+    table = _attach_or_publish(_block_name('list', *key), rows, _ENCODING_JSON)
+    return SharedList(table)
+
+
+def share_floats(key: Tuple[Any, ...], load: Callable[[], Iterable[float]]) -> Sequence[float]:
+    """
+    Publishes the numbers returned by load into shared memory as doubles, or attaches to the existing copy if another
+    process has already published the numbers for the key. Only the process that publishes them calls load.
+
+    Args:
+        key: parts that identify the source of the numbers
+        load: returns the numbers, only called by the process that publishes them
+
+    Returns:
+        read only view of the numbers as doubles, backed by shared memory
+    """
+    loaded = array('d')
+
+    def size():
+        loaded.extend(load())
+        return _HEADER.size + max(len(loaded) * _DOUBLE_SIZE, 1)
+
+    def fill(buf: memoryview):
+        buf[_HEADER.size:_HEADER.size + len(loaded) * _DOUBLE_SIZE] = loaded.tobytes()
+        _HEADER.pack_into(buf, 0, b'\x00' * len(_MAGIC), len(loaded), 1, _ENCODING_DOUBLE)
+        buf[:len(_MAGIC)] = _MAGIC
+
+    buf = _buffer(_attach_or_create(_block_name('floats', *key), size, fill))
+    _, num_values, _, _ = _HEADER.unpack_from(buf, 0)
+    return buf[_HEADER.size:_HEADER.size + num_values * _DOUBLE_SIZE].cast('d').toreadonly()
+
+
+def values_key(values: Iterable[Any]) -> Tuple[str, str]:
+    """
+    Key for values that have no source other than the values themselves, i.e. an inline list from a spec. The key is a
+    digest of the JSON encoded values, encoded one value at a time so no encoded copy of the values is kept.
+
+    Args:
+        values: JSON serializable values
+
+    Returns:
+        key to share the values with
+
+    Raises:
+        TypeError if the values are not JSON serializable
+    """
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(json.dumps(value).encode('utf-8'))
+        digest.update(b'\x00')
+    return ('values', digest.hexdigest())
+
+
+def release():
+    """
+    Closes and removes all shared memory blocks created or attached to by this process. Only needs to be called to
+    free the memory before the publishing process exits.
+    """
+    for name, shm in list(_segments.items()):
+        try:
+            shm.close()
+        except BufferError:
+            # views are still held by suppliers, memory is unmapped when the process exits
+            _released.append(shm)
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        del _segments[name]
+
+
+def _block_name(*parts) -> str:
+    """ short, deterministic name for the shared memory block, some platforms limit names to 31 characters """
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'dc_{digest[:24]}'
+
+
+def _buffer(shm: shared_memory.SharedMemory) -> memoryview:
+    """ memory of the block, which is only unavailable once the block has been closed """
+    buf = shm.buf
+    if buf is None:
+        raise SupplierException(f'Shared reference data {shm.name} has been closed')
+    return buf
+
+
+def _attach_or_publish(name: str, rows, encoding: int) -> SharedTable:
+    """ attach to existing block with name or create and populate it from the rows iterable factory """
+    measured = []
+
+    def size():
+        measured.extend(_measure(rows()))
+        return _total_size(*measured)
+
+    def fill(buf: memoryview):
+        _populate(buf, rows(), measured[0], measured[1], encoding)
+
+    return SharedTable(_attach_or_create(name, size, fill))
+
+
+def _attach_or_create(name: str,
+                      size: Callable[[], int],
+                      fill: Callable[[memoryview], None]) -> shared_memory.SharedMemory:
+    """ attach to existing block with name, or create a block of the given size and fill it """
+    if name in _segments:
+        return _segments[name]
+    try:
+        shm = _attach(name)
+        _log.debug('Attached to shared reference data: %s', name)
+    except FileNotFoundError:
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size())
+        except FileExistsError:
+            # another process won the race to publish
+            shm = _attach(name)
+        else:
+            fill(_buffer(shm))
+            _log.debug('Published shared reference data: %s', name)
+    _segments[name] = shm
+    return shm
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """ attach to existing block, waits until it is fully populated """
+    shm = shared_memory.SharedMemory(name=name)
+    deadline = time.monotonic() + _READY_TIMEOUT_SECONDS
+    buf = _buffer(shm)
+    while bytes(buf[:len(_MAGIC)]) != _MAGIC:
+        if time.monotonic() > deadline:
+            shm.close()
+            raise SupplierException(f'Timed out waiting for shared reference data {name} to be published')
+        time.sleep(_READY_POLL_SECONDS)
+    return shm
+
+
+def _cells(rows: Iterable[List[str]], num_columns: int):
+    """ yields encoded bytes for every cell in row order, short rows are padded with empty cells """
+    for row in rows:
+        for value in row:
+            yield value.encode('utf-8')
+        for _ in range(num_columns - len(row)):
+            yield b''
+
+
+def _measure(rows: Iterable[List[str]]):
+    """ first pass over data to size the block, returns number of rows, number of columns, and size of data """
+    num_rows = 0
+    num_columns = 0
+    size = 0
+    for row in rows:
+        num_rows += 1
+        num_columns = max(num_columns, len(row))
+        for value in row:
+            size += len(value.encode('utf-8'))
+    return num_rows, num_columns, size
+
+
+def _total_size(num_rows: int, num_columns: int, size: int) -> int:
+    """ total bytes required for block, zero sized blocks are not allowed """
+    return max(_HEADER.size + (num_rows * num_columns + 1) * _OFFSET_SIZE + size, _HEADER.size + 1)
+
+
+def _populate(buf: memoryview, rows, num_rows, num_columns, encoding):
+    """ second pass over data to write the cells, magic marker written last to signal data is ready """
+    num_offsets = num_rows * num_columns + 1
+    offsets_end = _HEADER.size + num_offsets * _OFFSET_SIZE
+    offsets = buf[_HEADER.size:offsets_end].cast('Q')
+    blob = buf[offsets_end:]
+    position = 0
+    idx = 0
+    offsets[0] = 0
+    for cell in _cells(rows, num_columns):
+        end = position + len(cell)
+        blob[position:end] = cell
+        position = end
+        idx += 1
+        offsets[idx] = position
+    offsets.release()
+    blob.release()
+    _HEADER.pack_into(buf, 0, b'\x00' * len(_MAGIC), num_rows, num_columns, encoding)
+    buf[:len(_MAGIC)] = _MAGIC
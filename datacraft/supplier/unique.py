@@ -0,0 +1,194 @@
+"""
+Module for suppliers of unique values. Values from any supplier can be made unique by keeping a 64 bit fingerprint of
+each value already supplied in a compact hash table, and drawing again when a value has been seen before. Random
+integers from a range are instead drawn from a random permutation of the range, so each draw is a new value.
+"""
+import json
+import random
+import struct
+from array import array
+from typing import Any
+
+from .exceptions import SupplierException
+from .model import ValueSupplierInterface
+
+_MASK_64 = (1 << 64) - 1
+# multiplier for spreading fingerprints across the table, 2^64 divided by the golden ratio
+_SPREAD = 0x9E3779B97F4A7C15
+_INITIAL_BITS = 10
+_DOUBLE = struct.Struct('<d')
+_FEISTEL_ROUNDS = 4
+
+
+class FingerprintSet:
+    """
+    Set of 64 bit fingerprints in one array with open addressing, 8 bytes per slot and at most two thirds of the slots
+    in use. This takes a fraction of the memory of a python set of the values or of their hashes.
+    """
+
+    def __init__(self):
+        self.bits = _INITIAL_BITS
+        self.slots = array('Q', bytes(8 << self.bits))
+        self.size = 0
+        # zero marks an empty slot, so it is kept out of the table
+        self.has_zero = False
+
+    def __len__(self):
+        return self.size + self.has_zero
+
+    def add(self, fingerprint: int) -> bool:
+        """
+        Args:
+            fingerprint: 64 bit fingerprint of value
+
+        Returns:
+            True if the fingerprint was added, False if it was already in the set
+        """
+        if fingerprint == 0:
+            added = not self.has_zero
+            self.has_zero = True
+            return added
+        slots = self.slots
+        mask = len(slots) - 1
+        index = ((fingerprint * _SPREAD) & _MASK_64) >> (64 - self.bits)
+        while True:
+            current = slots[index]
+            if current == 0:
+                break
+            if current == fingerprint:
+                return False
+            index = (index + 1) & mask
+        slots[index] = fingerprint
+        self.size += 1
+        if self.size * 3 > len(slots) * 2:
+            self._grow()
+        return True
+
+    def _grow(self):
+        """ doubles the number of slots """
+        old = self.slots
+        self.bits += 1
+        self.slots = array('Q', bytes(8 << self.bits))
+        self.size = 0
+        for fingerprint in old:
+            if fingerprint:
+                self.add(fingerprint)
+
+
+def fingerprint(value: Any) -> int:
+    """
+    Args:
+        value: to fingerprint
+
+    Returns:
+        64 bit fingerprint that is the same for equal values
+    """
+    if isinstance(value, int) and -(1 << 63) <= value < (1 << 63):
+        return value & _MASK_64
+    if isinstance(value, float):
+        # hash(-1.0) == hash(-2.0), the bits of the float are used instead
+        return int.from_bytes(_DOUBLE.pack(value), 'little')
+    try:
+        return hash(value) & _MASK_64
+    except TypeError:
+        return hash(json.dumps(value, sort_keys=True, default=str)) & _MASK_64
+
+
+class UniqueSupplier(ValueSupplierInterface):
+    """ Supplies only the values from the wrapped supplier that it has not supplied before """
+
+    distinct = True
+
+    def __init__(self, wrapped: ValueSupplierInterface, max_retries: int):
+        """
+        Args:
+            wrapped: supplier to get values from
+            max_retries: number of times to draw again for a value that has been supplied before
+        """
+        self.wrapped = wrapped
+        self.max_retries = max_retries
+        self.seen = FingerprintSet()
+
+    def next(self, iteration):
+        add = self.seen.add
+        for _ in range(self.max_retries + 1):
+            value = self.wrapped.next(iteration)
+            if add(fingerprint(value)):
+                return value
+        raise SupplierException(f'Unable to generate a unique value after {self.max_retries} retries, '
+                                f'{len(self.seen)} unique values were generated so the values may be exhausted')
+
+    def next_batch(self, iteration: int, count: int) -> list:
+        add = self.seen.add
+        values = self.wrapped.next_batch(iteration, count)
+        for index, value in enumerate(values):
+            if not add(fingerprint(value)):
+                values[index] = self.next(iteration + index)
+        return values
+
+
+class ShuffledRangeSupplier(ValueSupplierInterface):
+    """
+    Supplies the integers in a range in a random order with no repeats. The order comes from a Feistel network over
+    enough bits to cover the range, which is a random permutation that needs no memory for the values already used.
+    Positions that map outside the range are mapped again until they are inside it.
+    """
+
+    distinct = True
+
+    def __init__(self, start: int, end: int):
+        """
+        Args:
+            start: first integer of range
+            end: end of range, exclusive
+        """
+        if end <= start:
+            raise SupplierException(f'end must be greater than start for unique values, got {start} and {end}')
+        self.start = start
+        self.size = end - start
+        bits = max(2, (self.size - 1).bit_length())
+        bits += bits % 2
+        self.half_bits = bits // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.keys = [random.getrandbits(64) for _ in range(_FEISTEL_ROUNDS)]
+        self.position = 0
+
+    def next(self, iteration):
+        if self.position >= self.size:
+            raise SupplierException(f'All {self.size} values in the range have been used, '
+                                    f'unable to generate more unique values')
+        value = self._permute(self.position)
+        while value >= self.size:
+            value = self._permute(value)
+        self.position += 1
+        return self.start + value
+
+    def _permute(self, value: int) -> int:
+        """ maps the value to another value with the same number of bits """
+        left = value >> self.half_bits
+        right = value & self.half_mask
+        for key in self.keys:
+            mixed = (((right ^ key) * _SPREAD) & _MASK_64) >> (64 - self.half_bits)
+            left, right = right, left ^ mixed
+        return (left << self.half_bits) | right
+
+
+class DistinctRangeSupplier(ValueSupplierInterface):
+    """ Supplies the values of a range once each in order """
+
+    distinct = True
+
+    def __init__(self, range_obj: range):
+        """
+        Args:
+            range_obj: to supply values from
+        """
+        self.range_obj = range_obj
+        self.range_iter = iter(range_obj)
+
+    def next(self, iteration):
+        try:
+            return next(self.range_iter)
+        except StopIteration as err:
+            raise SupplierException(f'All {len(self.range_obj)} values in {self.range_obj} have been used, '
+                                    f'unable to generate more unique values') from err
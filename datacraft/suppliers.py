@@ -10,19 +10,21 @@ from typing import Union, List, Dict, Any
 from . import registries, casters, distributions, utils, template_engines
 from .exceptions import SpecException
 from .supplier.common import (SingleValue, MultipleValueSupplier, RotatingSupplierList, DecoratedSupplier,
-                              CastingSupplier, RandomRangeSupplier, DistributionBackedSupplier,
-                              BufferedValueSupplier, ListCountSamplerSupplier,
+                              CastingSupplier, RandomRangeSupplier, DistributionBackedSupplier, AlteredSupplier,
+                              BufferedValueSupplier, RecordCachedSupplier, ListCountSamplerSupplier,
                               list_stats_sampler_supplier, list_value_supplier, weighted_values_explicit, iter_supplier)
 from .supplier.model import Distribution, ValueSupplierInterface, ResettableIterator
 from .supplier.combine import combine_supplier
 from .supplier.calculate import calculate_supplier
 from .supplier.date import date_supplier, uniform_date_timestamp, epoch_date_supplier
-from .supplier.csv import load_csv_data, csv_supplier
+from .supplier.csv import load_csv_data, csv_supplier, load_weighted_csv_data, weighted_csv_supplier
 from .supplier.uuid import uuid_supplier
 from .supplier.unicode import unicode_range_supplier
+from .supplier.char_class import char_class_supplier
 from .supplier.templated import templated_supplier
-from .supplier import network, ranges
+from .supplier import char_class, network, ranges, shared
 from .supplier.strings import cut_supplier
+from .supplier.unique import UniqueSupplier, ShuffledRangeSupplier, DistinctRangeSupplier
 
 REPLACEMENTS = {
     '_NONE_': None,
@@ -230,15 +232,20 @@ def alter(supplier, **kwargs) -> ValueSupplierInterface:
     Returns:
         supplier with alterations
     """
-    if _is_cast(**kwargs):
-        supplier = cast(supplier, cast_to=kwargs.get('cast'))  # type: ignore
-    if _is_decorated(**kwargs):
-        supplier = decorated(supplier, **kwargs)
-    if _is_buffered(**kwargs):
-        supplier = buffered(supplier, **kwargs)
-    if _wrap_with_multiple_value(**kwargs):
-        return MultipleValueSupplier(supplier, count_supplier(**kwargs))
-    return supplier
+    is_cast = _is_cast(**kwargs)
+    is_decorated = _is_decorated(**kwargs)
+    is_buffered = _is_buffered(**kwargs)
+    is_multiple = _wrap_with_multiple_value(**kwargs)
+    if not any([is_cast, is_decorated, is_buffered, is_multiple]):
+        return supplier
+    # all alterations are applied by a single supplier instead of a chain of wrappers
+    return AlteredSupplier(
+        supplier,
+        caster=casters.get(kwargs.get('cast')) if is_cast else None,
+        decorate=is_decorated,
+        buffer_size=int(kwargs.get('buffer_size', 10)) if is_buffered else None,
+        count_supplier=count_supplier(**kwargs) if is_multiple else None,
+        **{key: kwargs[key] for key in ['prefix', 'suffix', 'quote'] if key in kwargs})
 
 
 def _wrap_with_multiple_value(**kwargs):
@@ -275,15 +282,33 @@ def list_values(data: list, **kwargs) -> ValueSupplierInterface:
         sample (bool): if the data should be sampled instead of iterated through incrementally
         count: constant, list, or weighted map
         count_dist (str): distribution in named param function style format
+        shared (bool): if large lists should be shared across processes using shared memory
 
     Returns:
         the ValueSupplierInterface for the data list
     """
     as_list = utils.is_affirmative('as_list', kwargs)
     sample = utils.is_affirmative('sample', kwargs, default=registries.get_default('sample_mode'))
+    if _is_shared(kwargs) and len(data) >= int(registries.get_default('shared_values_min_size')):
+        data = _share_list(data)
     return list_value_supplier(data, count_supplier(**kwargs), sample, as_list)
 
 
+def _is_shared(config: dict) -> bool:
+    """ should the reference data for this spec be published to shared memory """
+    return utils.is_affirmative('shared', config, registries.get_default('shared_reference_data'))
+
+
+def _share_list(data: list):
+    """ publish list to shared memory if possible, otherwise use list as is """
+    try:
+        key = shared.values_key(data)
+    except TypeError:
+        _log.debug('Values are not JSON serializable, unable to share list of size %s', len(data))
+        return data
+    return shared.share_list(key, lambda: data)
+
+
 def weighted_values(data: dict, config: Union[dict, None] = None) -> ValueSupplierInterface:
     """
     Creates a weighted value supplier from the data, which is a mapping of value to the weight is should represent.
@@ -501,6 +526,76 @@ def buffered(wrapped: ValueSupplierInterface, **kwargs) -> ValueSupplierInterfac
     return BufferedValueSupplier(wrapped, buffer_size)
 
 
+def cached_per_record(wrapped: ValueSupplierInterface) -> ValueSupplierInterface:
+    """
+    Creates a Value Supplier that only gets one value from the wrapped supplier for each iteration. Everything that
+    uses the supplier gets the same value for the same iteration, i.e. all the fields built from a ref see the same
+    value in a record.
+
+    Args:
+        wrapped: the Value Supplier to cache values for
+
+    Returns:
+        a value supplier that caches the value for the current iteration
+
+    Examples:
+        >>> import datacraft
+        >>> shared = datacraft.suppliers.cached_per_record(datacraft.suppliers.random_range(0, 100))
+        >>> shared.next(0) == shared.next(0)
+        True
+    """
+    return RecordCachedSupplier(wrapped)
+
+
+def unique(wrapped: ValueSupplierInterface, max_retries: Union[int, None] = None) -> ValueSupplierInterface:
+    """
+    Creates a Value Supplier that never produces the same value twice. A 64 bit fingerprint of each value is kept, and
+    values already produced are drawn again from the wrapped supplier, up to max_retries times.
+
+    Args:
+        wrapped: the Value Supplier to get unique values from
+        max_retries: number of times to draw again before giving up, default is the unique_retries default
+
+    Returns:
+        a value supplier that produces unique values
+
+    Raises:
+        SupplierException if no unique value is found within max_retries, i.e. when the values are exhausted
+
+    Examples:
+        >>> import datacraft
+        >>> codes = datacraft.suppliers.unique(datacraft.suppliers.values(['a', 'b', 'c'], sample=True))
+        >>> sorted(codes.next(i) for i in range(3))
+        ['a', 'b', 'c']
+    """
+    if max_retries is None:
+        max_retries = registries.get_default('unique_retries')
+    return UniqueSupplier(wrapped, int(max_retries))
+
+
+def shuffled_range(start: int, end: int) -> ValueSupplierInterface:
+    """
+    Creates a Value Supplier for the integers from start up to end in a random order with no repeats
+
+    Args:
+        start: of range
+        end: of range, exclusive
+
+    Returns:
+        a value supplier for the shuffled range
+
+    Raises:
+        SupplierException once all the values in the range have been used
+
+    Examples:
+        >>> import datacraft
+        >>> ids = datacraft.suppliers.shuffled_range(0, 5)
+        >>> sorted(ids.next(i) for i in range(5))
+        [0, 1, 2, 3, 4]
+    """
+    return ShuffledRangeSupplier(start, end)
+
+
 def calculate(suppliers_map: Dict[str, ValueSupplierInterface], formula: str) -> ValueSupplierInterface:
     """
     Creates a calculate supplier
@@ -551,8 +646,14 @@ def character_class(data, **kwargs):
                 if data[i] == char_to_escape:
                     data[i] = escape_str + char_to_escape
     if utils.any_key_exists(kwargs, ['mean', 'stddev']):
-        return list_stats_sampler(data, **kwargs)
-    return list_count_sampler(data, **kwargs)
+        # characters do not repeat within a value, the same as list_stats_sampler
+        join_with = None if utils.is_affirmative('as_list', kwargs) else kwargs.get('join_with', ' ')
+        return char_class_supplier(data, char_class.normal_lengths(len(data), **kwargs), join_with, unique=True)
+    if 'count' in kwargs or 'count_dist' in kwargs:
+        lengths = count_supplier(**kwargs)
+    else:
+        lengths = char_class.uniform_lengths(int(kwargs.get('min', 1)), int(kwargs.get('max', len(data))))
+    return char_class_supplier(data, lengths, kwargs.get('join_with', None))
 
 
 def csv(csv_path, **kwargs):
@@ -571,6 +672,7 @@ def csv(csv_path, **kwargs):
         quotechar (str): string used to quote values, default is '"'
         headers (bool): if the CSV file has a header row
         sample_rows (bool): if sampling should happen at a row level, not valid if buffering is set to true
+        shared (bool): if the csv data should be shared across processes using shared memory
 
     Returns:
         supplier for csv field
@@ -583,6 +685,42 @@ def csv(csv_path, **kwargs):
     return csv_supplier(field_name, csv_data, counts, sample)
 
 
+def weighted_csv(csv_path, **kwargs):
+    """
+    Creates a weighted csv supplier, values are chosen from one column according to the weights in another. The first
+    row of the file is treated as the header row. The columns are read in a single pass and shared by every field that
+    uses the same columns of the same file.
+
+    Args:
+        csv_path: path to csv file to supply data from
+
+    Keyword Args:
+        column (int): 1 based column number or column name, default is 1
+        weight_column (int): 1 based column number or column name for the weights, default is 2
+        count: constant, list, or weighted map
+        count_dist: distribution in named param function style format
+        delimiter (str): how items are separated, default is ','
+        quotechar (str): string used to quote values, default is '"'
+        cache_dir (str): directory to cache the parsed columns in, default is weighted_csv_cache_dir default
+        shared (bool): if the values and weights should be shared across processes using shared memory
+
+    Returns:
+        supplier for weighted csv field
+    """
+    delimiter = kwargs.get('delimiter', ',')
+    # in case tab came in as string
+    if delimiter == '\\t':
+        delimiter = '\t'
+    weighted_data = load_weighted_csv_data(csv_path,
+                                           kwargs.get('column', 1),
+                                           kwargs.get('weight_column', 2),
+                                           delimiter,
+                                           kwargs.get('quotechar', '"'),
+                                           kwargs.get('cache_dir', registries.get_default('weighted_csv_cache_dir')),
+                                           _is_shared(kwargs))
+    return weighted_csv_supplier(weighted_data, count_supplier(**kwargs))
+
+
 _ONE_MB = 1024 * 1024
 _SMALL_ENOUGH_THRESHOLD = 250 * _ONE_MB
 
@@ -599,6 +737,7 @@ def _load_csv_data(csv_path, **kwargs):
         quotechar (str): string used to quote values, default is '"'
         headers (bool): if the CSV file has a header row
         sample_rows (bool): if sampling should happen at a row level, not valid if buffering is set to true
+        shared (bool): if the csv data should be shared across processes using shared memory
 
     Returns:
         the configured CsvData object
@@ -614,7 +753,7 @@ def _load_csv_data(csv_path, **kwargs):
     max_csv_size = int(registries.get_default('large_csv_size_mb')) * _ONE_MB
     sample_rows = utils.is_affirmative('sample_rows', kwargs)
     buffer = size_in_bytes <= max_csv_size
-    return load_csv_data(csv_path, delimiter, has_headers, quotechar, sample_rows, buffer)
+    return load_csv_data(csv_path, delimiter, has_headers, quotechar, sample_rows, buffer, _is_shared(kwargs))
 
 
 def date(**kwargs) -> ValueSupplierInterface:
@@ -634,11 +773,19 @@ def date(**kwargs) -> ValueSupplierInterface:
         end (str): end date string
         offset (int): number of days to shift the duration, positive is back negative is forward
         duration_days (int): number of days after start, default is 30
+        monotonic (bool): if dates should be strictly increasing from start instead of sampled
+        step (Union[float, str]): seconds between monotonic dates, number or distribution i.e. exponential(rate=0.2)
+        jitter (float): max seconds to randomly add or subtract from each monotonic step
 
     Returns:
         supplier for dates
     """
     hour_supplier = kwargs.pop('hour_supplier')
+    if _is_monotonic(kwargs):
+        if hour_supplier is not None:
+            raise SpecException(f'Cannot specify hours for monotonic dates: {json.dumps(kwargs)}')
+        timestamp_distribution, date_format = _monotonic_date_timestamp(**kwargs)
+        return date_supplier(date_format, timestamp_distribution)
     if 'center_date' in kwargs or 'stddev_days' in kwargs:
         return _create_stats_based_date_supplier(hour_supplier, **kwargs)
     return _create_uniform_date_supplier(hour_supplier, **kwargs)
@@ -661,11 +808,16 @@ def epoch_date(as_millis: bool = False, **kwargs) -> ValueSupplierInterface:
         end (str): end date string
         offset (int): number of days to shift the duration, positive is back negative is forward
         duration_days (str): number of days after start, default is 30
+        monotonic (bool): if dates should be strictly increasing from start instead of sampled
+        step (Union[float, str]): seconds between monotonic dates, number or distribution i.e. exponential(rate=0.2)
+        jitter (float): max seconds to randomly add or subtract from each monotonic step
 
     Returns:
         supplier for dates
     """
-    if 'center_date' in kwargs or 'stddev_days' in kwargs:
+    if _is_monotonic(kwargs):
+        timestamp_distribution, _ = _monotonic_date_timestamp(**kwargs)
+    elif 'center_date' in kwargs or 'stddev_days' in kwargs:
         timestamp_distribution, _ = _gauss_date_timestamp(**kwargs)
     else:
         timestamp_distribution, _ = _uniform_date_timestamp(**kwargs)
@@ -697,6 +849,50 @@ def _uniform_date_timestamp(**kwargs):
     return timestamp_distribution, date_format
 
 
+def _is_monotonic(config: dict) -> bool:
+    """ if the date config is for strictly increasing dates """
+    return utils.is_affirmative('monotonic', config)
+
+
+def _monotonic_date_timestamp(**kwargs):
+    """
+    Creates a strictly increasing date distribution that begins at the start date
+
+    Keyword Args:
+        start: start date string
+        offset: number of days to shift start date by, positive is back negative is forward
+        format: format for start date and returned dates
+        step: seconds between dates, number or distribution function string
+        jitter: max seconds to randomly add or subtract from each step
+
+    Returns:
+        Distribution that gives increasing seconds since epoch for the given params, and date_format_string
+    """
+    if 'center_date' in kwargs or 'stddev_days' in kwargs:
+        raise SpecException(f'Cannot use center_date or stddev_days with monotonic dates: {json.dumps(kwargs)}')
+    date_format = kwargs.get('format', registries.get_default('date_format'))
+    offset = int(kwargs.get('offset', 0))
+    start = kwargs.get('start')
+    if start:
+        try:
+            start_date = datetime.datetime.strptime(start, date_format)
+        except (TypeError, ValueError) as err:
+            raise SpecException(f'Format: {date_format}, does not match start: {start}') from err
+    else:
+        start_date = datetime.datetime.now()
+    start_ts = (start_date - datetime.timedelta(days=offset)).timestamp()
+    step = kwargs.get('step', registries.get_default('date_step_seconds'))
+    try:
+        if isinstance(step, str) and '(' in step:
+            step_distribution = distributions.from_string(step)
+        else:
+            step_distribution = distributions.uniform(start=float(step), end=float(step))
+        jitter = float(kwargs.get('jitter', 0))
+    except ValueError as err:
+        raise SpecException(f'Invalid step or jitter for monotonic dates: {json.dumps(kwargs)}') from err
+    return distributions.monotonic(start_ts, step_distribution, jitter), date_format
+
+
 _SECONDS_IN_DAY = 24.0 * 60.0 * 60.0
 
 
@@ -845,6 +1041,12 @@ def ip_supplier(**kwargs) -> ValueSupplierInterface:
     if len(parts) == 4:
         return values('.'.join(parts))
     sample = kwargs.get('sample', 'yes')
+    base_octets = [part.strip() for part in parts if part.strip() != '']
+    leading_octets = [part.strip() for part in parts[:len(base_octets)]]
+    # fast path when the specified octets are all leading ones
+    if utils.is_affirmative('sample', kwargs, 'yes') and base_octets == leading_octets and len(base_octets) < 4:
+        _validate_base_octets(parts)
+        return network.ipv4_random(base_octets)
     octet_supplier_map = {
         'first': _create_octet_supplier(parts, 0, sample),
         'second': _create_octet_supplier(parts, 1, sample),
@@ -889,9 +1091,14 @@ def _validate_and_extract_mask(cidr):
     return mask
 
 
-def _create_octet_supplier(parts, index, sample):
-    """ creates a value supplier for the index'th octet """
-    # this index is for a part that is static, create a single value supplier for that part
+def _validate_base_octets(parts):
+    """ validates the static octets of the base, blank parts are treated as not specified """
+    for index in range(len(parts)):
+        _base_octet(parts, index)
+
+
+def _base_octet(parts, index):
+    """ returns the static octet at index if specified, None otherwise """
     if len(parts) >= index + 1 and parts[index].strip() != '':
         octet = parts[index].strip()
         if not octet.isdigit():
@@ -899,6 +1106,15 @@ def _create_octet_supplier(parts, index, sample):
         if not 0 <= int(octet) <= 255:
             raise ValueError(
                 f'Each octet: {octet} must be in range of 0 to 255, Invalid Input: ' + '.'.join(parts))
+        return octet
+    return None
+
+
+def _create_octet_supplier(parts, index, sample):
+    """ creates a value supplier for the index'th octet """
+    # this index is for a part that is static, create a single value supplier for that part
+    octet = _base_octet(parts, index)
+    if octet is not None:
         return values(octet)
     # need octet range at this point
     octet_range = list(range(0, 255))
@@ -906,7 +1122,7 @@ def _create_octet_supplier(parts, index, sample):
 
 
 def ip_precise(cidr: str, sample: bool = False) -> ValueSupplierInterface:
-    """Creates a value supplier that produces precise ip address from the given cidr
+    """Creates a value supplier that produces precise ip address from the given cidr, IPv4 and IPv6 are supported
 
     Args:
         cidr: notation specifying ip range
@@ -915,6 +1131,9 @@ def ip_precise(cidr: str, sample: bool = False) -> ValueSupplierInterface:
     Returns:
         supplier for precise ip addresses
 
+    Raises:
+        ValueError if the cidr is not valid
+
     Examples:
         >>> import datacraft
         >>> ips = datacraft.suppliers.ip_precise(cidr="192.168.0.0/22", sample=False)
@@ -1017,6 +1236,7 @@ def range_supplier(start: Union[int, float],
 
     Keyword Args:
         precision (int): Number of decimal places to use, in case of floating point range
+        unique (bool): if the values should not wrap around to the start once the range is used up
 
     Returns:
         supplier to supply ranges of values with
@@ -1024,6 +1244,8 @@ def range_supplier(start: Union[int, float],
     if utils.any_is_float([start, end, step]):
         range_values_gen = ranges.float_range(float(start), float(end), float(step), kwargs.get("precision"))
         return resettable(range_values_gen)
+    if kwargs.get('unique'):
+        return DistinctRangeSupplier(range(start, end, step))  # type: ignore
     return ranges.range_wrapped(range(start, end, step))  # type: ignore
 
 
@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 from typing import Union, Optional
 
-from jinja2 import Environment, FileSystemLoader, BaseLoader, select_autoescape  # type: ignore
+from jinja2 import Environment, FileSystemLoader, BaseLoader, select_autoescape, meta  # type: ignore
 
 from .supplier.model import RecordProcessor
 
@@ -30,10 +30,19 @@ def string(template: str) -> RecordProcessor:
     return _Jinja2StringEngine(template)
 
 
+def _references_internal(env: Environment, source: str) -> bool:
+    """ if the template uses the _internal metadata, included templates may use anything so assume they do """
+    parsed = env.parse(source)
+    if any(True for _ in meta.find_referenced_templates(parsed)):
+        return True
+    return '_internal' in meta.find_undeclared_variables(parsed)
+
+
 class _Jinja2Engine(RecordProcessor):
     """
     A simple class that creates a facade around a Jinja2 templating environment
     """
+    record_separator = '\n'
 
     def __init__(self, template_file: Union[str, Path]):
         template_dir = os.path.dirname(template_file)
@@ -43,6 +52,8 @@ class _Jinja2Engine(RecordProcessor):
             autoescape=select_autoescape(['html', 'xml'])
         )
         self.template = env.get_template(self.template_name)
+        source, _, _ = env.loader.get_source(env, self.template_name)
+        self.needs_internal = _references_internal(env, source)
 
     def process(self, record: Union[list, dict]) -> str:
         if isinstance(record, list):
@@ -55,6 +66,7 @@ class _Jinja2StringEngine(RecordProcessor):
     """
     A Jinja2 Templating Engine for String Templates
     """
+    record_separator = '\n'
 
     def __init__(self, template_str):
         env = Environment(
@@ -62,6 +74,7 @@ class _Jinja2StringEngine(RecordProcessor):
             autoescape=select_autoescape(['html', 'xml'])
         )
         self.template = env.from_string(template_str)
+        self.needs_internal = _references_internal(env, template_str)
 
     def process(self, record: Union[list, dict]) -> str:
         """
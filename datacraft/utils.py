@@ -4,6 +4,7 @@ Module for storing package wide common functions
 import importlib
 import logging
 import os
+import re
 from typing import Union
 
 from .supplier.model import DataSpec
@@ -77,10 +78,9 @@ def any_key_exists(config: dict, keys: list):
 
 def get_raw_spec(data_spec: Union[dict, DataSpec]):
     """ The data spec may be raw or object version, this gets the raw underlying spec """
-    if isinstance(data_spec, DataSpec):
-        raw_spec = data_spec.raw_spec
-    else:
-        raw_spec = data_spec
+    raw_spec = data_spec
+    while isinstance(raw_spec, DataSpec):
+        raw_spec = raw_spec.raw_spec
     return raw_spec
 
 
@@ -103,3 +103,68 @@ def load_file_as_string(data_path: str) -> str:
     """ Loads the file at the given path as a string"""
     with open(data_path, 'r', encoding='utf-8') as handle:
         return handle.read()
+
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+_SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$', re.IGNORECASE)
+# seconds in each unit of time for rates
+_RATE_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+_RATE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(?:/\s*(s|sec|second|m|min|minute|h|hr|hour))?\s*$', re.IGNORECASE)
+
+
+def parse_size(size: Union[str, int]) -> int:
+    """
+    Parses a size in bytes with an optional unit, units are powers of 1024
+
+    Args:
+        size: i.e. 1024, "512KB", "256MB", "1.5G"
+
+    Returns:
+        number of bytes
+
+    Raises:
+        ValueError if the size is not valid
+
+    Examples:
+        >>> import datacraft
+        >>> datacraft.utils.parse_size('256MB')
+        268435456
+    """
+    if isinstance(size, int):
+        return size
+    match = _SIZE_PATTERN.match(str(size))
+    if match is None:
+        raise ValueError(f'Invalid size: {size}, expected a number with optional unit i.e. 512KB, 256MB, 1GB')
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.upper()])
+
+
+def parse_rate(rate: Union[str, float]) -> float:
+    """
+    Parses a rate with an optional unit of time into a number per second
+
+    Args:
+        rate: i.e. 5000, "5000/s", "300/m", "100/h", "12/min"
+
+    Returns:
+        number per second
+
+    Raises:
+        ValueError if the rate is not valid or not positive
+
+    Examples:
+        >>> import datacraft
+        >>> datacraft.utils.parse_rate('300/m')
+        5.0
+    """
+    if isinstance(rate, (int, float)):
+        per_second = float(rate)
+    else:
+        match = _RATE_PATTERN.match(str(rate))
+        if match is None:
+            raise ValueError(f'Invalid rate: {rate}, expected a number with optional unit i.e. 5000/s, 300/m, 10/h')
+        number, unit = match.groups()
+        per_second = float(number) / _RATE_UNITS[(unit or 's').lower()[0]]
+    if per_second <= 0:
+        raise ValueError(f'rate must be positive, got {rate}')
+    return per_second
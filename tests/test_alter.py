@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import datacraft
+from datacraft.supplier.common import (AlteredSupplier, BufferedValueSupplier, CastingSupplier, DecoratedSupplier,
+                                       MultipleValueSupplier)
+
+
+def _chained(supplier, **config):
+    """ the alterations applied as separate wrappers """
+    if 'cast' in config:
+        supplier = CastingSupplier(supplier, datacraft.casters.get(config['cast']))
+    if any(key in config for key in ['prefix', 'suffix', 'quote']):
+        supplier = DecoratedSupplier(supplier, **config)
+    if 'buffer_size' in config:
+        supplier = BufferedValueSupplier(supplier, config['buffer_size'])
+    if 'count' in config:
+        supplier = MultipleValueSupplier(supplier, datacraft.suppliers.count_supplier(**config))
+    return supplier
+
+
+alter_tests = [
+    {},
+    {"cast": "str;zfill5"},
+    {"prefix": "pre-", "suffix": 1, "quote": "'"},
+    {"cast": "int", "quote": '"'},
+    {"buffer_size": 3, "suffix": "!"},
+    {"count": [1, 2, 3], "as_list": True, "prefix": "#"},
+    {"count": 2, "as_list": True, "buffer_size": 5, "cast": "string"},
+]
+
+
+@pytest.mark.parametrize("config", alter_tests)
+def test_alter_matches_chained_suppliers(config):
+    data = [1, '2', 3.0, [4, 5]] if 'cast' not in config or config['cast'] != 'int' else [1, '2', 3.0]
+    random.seed(42)
+    expected = [_chained(datacraft.suppliers.values(data), **config).next(i) for i in range(20)]
+    random.seed(42)
+    altered = datacraft.suppliers.alter(datacraft.suppliers.values(data), **config)
+    assert [altered.next(i) for i in range(20)] == expected
+
+
+def test_alter_no_config_returns_supplier():
+    supplier = datacraft.suppliers.values([1, 2, 3])
+    assert datacraft.suppliers.alter(supplier) is supplier
+
+
+def test_alter_buffered():
+    supplier = datacraft.suppliers.alter(datacraft.suppliers.values(['a', 'b', 'c'], sample=True), buffer_size=2)
+    assert isinstance(supplier, AlteredSupplier)
+    first = supplier.next(0)
+    second = supplier.next(1)
+    assert supplier.next(0) == first
+    assert supplier.next(1) == second
+    supplier.next(2)
+    with pytest.raises(ValueError):
+        supplier.next(0)
+
+
+def test_alter_next_batch():
+    supplier = datacraft.suppliers.alter(datacraft.suppliers.values([1, 2, 3]), cast='string', prefix='v', quote='"')
+    assert supplier.next_batch(1, 4) == ['"v2"', '"v3"', '"v1"', '"v2"']
@@ -1,5 +1,5 @@
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import pytest
 
@@ -321,6 +321,96 @@ def test_to_pandas():
     assert df.lon.max() <= 180
 
 
+@pytest.mark.parametrize("chunk_size", [None, 1, 4, 100])
+def test_to_pandas_chunked_matches_json_normalize(chunk_size):
+    pandas = pytest.importorskip('pandas')
+    raw_spec = {
+        'user': {'type': 'nested', 'fields': {
+            'name': ['x', 'y'],
+            'address': {'type': 'nested', 'fields': {'zip': [1]}}
+        }},
+        'id': {'type': 'values', 'data': [1, 2, 3]},
+        'maybe': ['yes', 'no'],
+        'field_groups': [['id', 'user'], ['id'], ['id'], ['id'], ['id', 'maybe', 'user']]
+    }
+    df = datacraft.parse_spec(raw_spec).to_pandas(10, chunk_size=chunk_size)
+    expected = pandas.json_normalize(datacraft.entries(raw_spec, 10))
+    pandas.testing.assert_frame_equal(df, expected)
+    assert list(df.columns) == ['id', 'user.name', 'user.address.zip', 'maybe']
+
+
+def test_to_pandas_invalid_chunk_size():
+    spec = datacraft.parse_spec({'id': [1, 2, 3]})
+    with pytest.raises(ValueError):
+        spec.to_pandas(10, chunk_size=0)
+
+
+def test_to_arrow():
+    pyarrow = pytest.importorskip('pyarrow')
+    raw_spec = {
+        'id': [1, 2, 3],
+        'name': {'type': 'nested', 'fields': {'first': ['a', 'b']}},
+        'extra': [1.5],
+        'field_groups': [['id', 'name'], ['id', 'name', 'extra']]
+    }
+    table = datacraft.parse_spec(raw_spec).to_arrow(4, chunk_size=3)
+    assert table.column_names == ['id', 'name.first', 'extra']
+    assert table.column('id').to_pylist() == [1, 2, 3, 1]
+    assert table.column('extra').type == pyarrow.float64()
+    assert table.column('extra').to_pylist() == [None, 1.5, None, 1.5]
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_stream(prefetch):
+    raw_spec = {'id': {'type': 'values', 'data': list(range(10))}}
+    batches = list(datacraft.stream(raw_spec, 10, batch_size=4, prefetch=prefetch))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert [record['id'] for batch in batches for record in batch] == list(range(10))
+
+
+def test_stream_with_processor_and_output():
+    class _Collect(datacraft.OutputHandlerInterface):
+        def __init__(self):
+            self.batches = []
+            self.finished = False
+
+        def handle(self, key, value):
+            pass
+
+        def handle_batch(self, batch, exclude_internal=False):
+            self.batches.append([iteration for iteration, _, _ in batch])
+
+        def finished_record(self, iteration, group_name, exclude_internal=False):
+            pass
+
+        def finished_iterations(self):
+            self.finished = True
+
+    output = _Collect()
+    processor = datacraft.outputs.processor(template='id:{{ id }}')
+    batches = list(datacraft.stream({'id': [1, 2, 3]}, 3, batch_size=2, output=output, processor=processor))
+    assert batches == [['id:1', 'id:2'], ['id:3']]
+    assert output.batches == [[0, 1], [2]]
+    assert output.finished
+
+
+def test_stream_prefetch_raises_producer_error():
+    raw_spec = {'id': {'type': 'ref', 'data': 'missing'}}
+    with pytest.raises(SpecException):
+        list(datacraft.stream(raw_spec, 10, batch_size=2, prefetch=2))
+
+
+def test_stream_prefetch_closed_early():
+    stream = datacraft.stream({'id': {'type': 'uuid'}}, 1000, batch_size=1, prefetch=2)
+    assert len(next(stream)) == 1
+    stream.close()
+
+
+def test_stream_invalid_batch_size():
+    with pytest.raises(ValueError):
+        next(datacraft.stream({'id': [1]}, 10, batch_size=0))
+
+
 def test_add_fields():
     spec_builder = builder.spec_builder()
     spec_builder.add_fields(
@@ -446,6 +536,60 @@ def test_record_generator_1():
     assert list(generator) == [Entry(foo='one'), Entry(foo='two')]
 
 
+@dataclass
+class Address:
+    street: str
+    zip: str = '00000'
+
+
+@dataclass
+class Person:
+    name: str
+    address: Address
+    tags: list = field(default_factory=list)
+    active: bool = True
+
+
+def test_record_generator_nested_and_defaults():
+    spec = {
+        'address': {'type': 'nested', 'fields': {'street': ['main']}},
+        'name': ['bob', 'alice'],
+        'extra': ['ignored']
+    }
+    records = datacraft.record_entries(Person, spec, 2)
+    assert records == [Person(name='bob', address=Address(street='main')),
+                       Person(name='alice', address=Address(street='main'))]
+    assert records[0].tags is not records[1].tags
+
+
+def test_record_generator_field_groups():
+    spec = {
+        'name': ['bob'],
+        'address': {'type': 'nested', 'fields': {'street': 'main', 'zip': '12345'}},
+        'active': [False],
+        'field_groups': [['name', 'address'], ['active', 'address', 'name']]
+    }
+    records = list(datacraft.record_generator(Person, spec, 2))
+    address = Address(street='main', zip='12345')
+    assert records == [Person(name='bob', address=address), Person(name='bob', address=address, active=False)]
+
+
+def test_record_generator_with_output():
+    output = datacraft.outputs.record_level(datacraft.outputs.processor(format_name='json'),
+                                            datacraft.outputs.suppress_output_writer())
+    records = list(datacraft.record_generator(Entry, {'foo': ['one', 'two']}, 2, output=output))
+    assert records == [Entry(foo='one'), Entry(foo='two')]
+
+
+def test_tuple_generator():
+    spec = {'id': [1, 2], 'first name': ['a', 'b'], 'field_groups': [['id'], ['id', 'first name']]}
+    assert list(datacraft.tuple_generator(spec, 2)) == [(1,), (2, 'b')]
+    named = list(datacraft.tuple_generator(spec, 2, named=True))
+    assert named[0].id == 1
+    assert named[1]._fields == ('id', '_1')
+    assert named[1] == (2, 'b')
+
+
 def test_values_for():
     field_spec = {'type': 'uuid'}
     values = datacraft.values_for(field_spec, 3)
@@ -85,6 +85,42 @@ def test_char_class_special_escape():
                 assert 'ESCAPED:' + char in val
 
 
+def test_char_class_next_batch():
+    spec = _cc_abbrev_spec(abbrev="cc-digits", min=2, max=6)
+
+    supplier = datacraft.loader.field_loader(spec).get('name')
+    values = supplier.next_batch(0, 500)
+    assert len(values) == 500
+    assert {len(value) for value in values} == {2, 3, 4, 5, 6}
+    assert set(''.join(values)) == set(string.digits)
+
+
+def test_char_class_stats_no_repeats():
+    supplier = datacraft.suppliers.character_class("abcdef", mean=4, stddev=3, min=2, join_with='')
+    for value in supplier.next_batch(0, 100) + [supplier.next(0) for _ in range(100)]:
+        assert 2 <= len(value) <= 6
+        assert len(set(value)) == len(value)
+
+
+def test_char_class_escaped_batch():
+    supplier = datacraft.suppliers.character_class('a"', escape='"', count=3, join_with='')
+    for value in supplier.next_batch(0, 20):
+        assert value.replace('\\"', '').replace('a', '') == ''
+
+
+def test_char_class_as_list():
+    supplier = datacraft.suppliers.character_class("xyz", count=4)
+    value = supplier.next(0)
+    assert isinstance(value, list) and len(value) == 4
+
+
+def test_normal_lengths_weights():
+    lengths = datacraft.supplier.char_class.normal_lengths(20, mean=5, stddev=2, min=3, max=8)
+    assert lengths.lengths == [3, 4, 5, 6, 7, 8]
+    assert lengths.cum_weights[-1] == pytest.approx(1.0)
+    assert datacraft.supplier.char_class.normal_lengths(20, mean=5, stddev=0).next(0) == 5
+
+
 def _verify_values(supplier, min_size, max_size, exclude='', iterations=100):
     for i in range(iterations):
         value = supplier.next(i)
@@ -1,9 +1,11 @@
 import datetime
+import time
 
 import pytest
 
 import datacraft
 from datacraft import SpecException
+from datacraft.supplier.date import date_formatter
 from . import builder
 
 
@@ -185,6 +187,84 @@ def test_data_and_format_cannot_both_be_specified():
         datacraft.entries(spec, 1)
 
 
+date_formatter_tests = [
+    None,
+    "%d-%m-%Y",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%I:%M:%S %p %a %A %b %B %j %y %%",
+    "%S:%f:%M",
+    "%Z %H",
+]
+
+
+@pytest.mark.parametrize("date_format", date_formatter_tests)
+@pytest.mark.parametrize("timezone", ["UTC", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe"])
+def test_date_formatter_matches_strftime(date_format, timezone, monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip('time.tzset not available on this platform')
+    monkeypatch.setenv('TZ', timezone)
+    time.tzset()
+    try:
+        formatter = date_formatter(date_format)
+        # includes both daylight savings transitions for 2021 and values that round up to the next second
+        timestamps = [1615705200 + i * 613.25 for i in range(200)] + \
+                     [1636264800 + i * 613.9999997 for i in range(200)] + \
+                     [-86400.5, 0.0, 946684799.9999996]
+        hours = [i % 24 for i in range(len(timestamps))]
+        for timestamp, hour, formatted, with_hour in zip(timestamps,
+                                                         hours,
+                                                         formatter.format_batch(timestamps),
+                                                         formatter.format_batch(timestamps, hours)):
+            expected = datetime.datetime.fromtimestamp(timestamp)
+            expected_with_hour = expected.replace(hour=hour)
+            if date_format:
+                assert formatted == expected.strftime(date_format)
+                assert with_hour == expected_with_hour.strftime(date_format)
+            else:
+                assert formatted == expected.replace(microsecond=0).isoformat()
+                assert with_hour == expected_with_hour.replace(microsecond=0).isoformat()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_date_next_batch_restrict_hours():
+    spec = _date_spec(format="%d-%m-%Y %H", hours={"type": "values", "data": [3, 4]})
+    supplier = datacraft.loader.field_loader(spec).get('foo')
+    for value in supplier.next_batch(0, 50):
+        assert value.endswith(' 03') or value.endswith(' 04')
+
+
+def test_date_monotonic_fixed_step():
+    spec = _date_spec(monotonic=True, format="%Y-%m-%d %H:%M", start="2050-01-01 00:00", step=90)
+    values = datacraft.values_for(spec['foo'], 3)
+    assert values == ['2050-01-01 00:00', '2050-01-01 00:01', '2050-01-01 00:03']
+
+
+def test_date_monotonic_step_distribution():
+    spec = _date_iso_spec(monotonic="yes", start="2050-01-01T00:00:00Z", format="%Y-%m-%dT%H:%M:%SZ",
+                          step="exponential(rate=0.5)", jitter=1)
+    values = datacraft.values_for(spec['foo'], 1000)
+    assert values[0] == '2050-01-01T00:00:00Z'
+    assert values == sorted(values)
+
+
+def test_date_epoch_monotonic():
+    spec = _date_epoch_ms_spec(monotonic=True, step=0.01)
+    values = datacraft.values_for(spec['foo'], 100)
+    assert all(first < second for first, second in zip(values, values[1:]))
+
+
+@pytest.mark.parametrize("config", [
+    {"monotonic": True, "center_date": "01-01-2050"},
+    {"monotonic": True, "step": "not a number"},
+    {"monotonic": True, "hours": {"type": "values", "data": [1, 2]}},
+])
+def test_date_monotonic_invalid_config(config):
+    with pytest.raises(SpecException):
+        datacraft.values_for(_date_spec(**config)['foo'], 1)
+
+
 def _get_unique_values(spec, key, iterations=100):
     loader = datacraft.loader.field_loader(spec)
     supplier = loader.get(key)
@@ -34,6 +34,42 @@ def test_bounded_normal_distribution():
         assert 2 <= value <= 7
 
 
+def test_exponential_distribution():
+    dist_func = datacraft.registry.distribution.get('exponential')
+    distribution = dist_func(rate=0.5, max=8)
+
+    values = [distribution.next_value() for _ in range(1000)]
+    assert all(0 <= value <= 8 for value in values)
+
+
+def test_monotonic_distribution():
+    step = datacraft.distributions.from_string('exponential(rate=2)')
+    distribution = datacraft.distributions.monotonic(100, step, jitter=1)
+
+    values = [distribution.next_value() for _ in range(1000)]
+    assert values[0] == 100
+    assert all(first < second for first, second in zip(values, values[1:]))
+
+
+def test_diurnal_distribution(mocker):
+    mocker.patch('time.monotonic', return_value=1000.0)
+    distribution = datacraft.distributions.from_string('diurnal(low=0.5, high=2, period=100)')
+    assert distribution.next_value() == pytest.approx(0.5)
+    mocker.patch('time.monotonic', return_value=1050.0)
+    assert distribution.next_value() == pytest.approx(2)
+    mocker.patch('time.monotonic', return_value=1125.0)
+    assert distribution.next_value() == pytest.approx(1.25)
+
+
+def test_spikes_distribution(mocker):
+    mocker.patch('time.monotonic', return_value=1000.0)
+    distribution = datacraft.distributions.from_string('spikes(height=5, every=60, length=10)')
+    assert distribution.next_value() == 1
+    mocker.patch('time.monotonic', return_value=1055.0)
+    assert distribution.next_value() == 5
+    mocker.patch('time.monotonic', return_value=1061.0)
+    assert distribution.next_value() == 1
+
 valid_funcs = [
     ('uniform(start=5, end=10)', 5),
     ('normal(mean=5, stddev=2)', 5),
@@ -41,6 +77,7 @@ valid_funcs = [
     ('gaussian(mean=5, stddev=2)', 5),
     ('gaussian(mean=5, stddev=2, min=3, max=9)', 5),
     ('gaussian(mean=33, stddev=5, max=50)', 10),
+    ('exponential(rate=0.1)', 10),
 ]
 
 
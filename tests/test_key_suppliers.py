@@ -86,3 +86,15 @@ def one_two_builder():
     spec_builder.values('one', ["uno", "ichi"])
     spec_builder.values('two', ["dos", "ni"])
     return spec_builder
+
+
+@pytest.mark.parametrize("field_groups,expected", [
+    (None, {'ALL': ['a', 'b']}),
+    ([['a'], ['a', 'b']], {'a': ['a'], 'a_b': ['a', 'b']}),
+    ({'0.6': ['a'], '0.4': ['a', 'b']}, {'0.6': ['a'], '0.4': ['a', 'b']}),
+])
+def test_field_groups(field_groups, expected):
+    raw_spec = {'a': [1], 'b': [2], 'refs': {'c': [3]}}
+    if field_groups is not None:
+        raw_spec['field_groups'] = field_groups
+    assert key_suppliers.field_groups(raw_spec) == expected
@@ -110,6 +110,45 @@ def test_registered_invalid_preprocessor():
     datacraft.loader.preprocess_spec(raw_spec)
 
 
+def test_templated_over_constants_is_folded():
+    raw_spec = {
+        'greeting': {'type': 'templated', 'data': '{{ hi }} {{ name }}!', 'refs': ['hi', 'name']},
+        'refs': {'hi': 'hello', 'name': {'type': 'values', 'data': 'world', 'config': {'prefix': 'big '}}}
+    }
+    loader = datacraft.loader.field_loader(raw_spec)
+    supplier = loader.get('greeting')
+    assert isinstance(supplier, datacraft.supplier.common.SingleValue)
+    assert supplier.next(0) == 'hello big world!'
+    assert loader.dependencies['greeting'] == ['hi', 'name']
+
+
+@pytest.mark.parametrize("field_spec", [
+    {'type': 'templated', 'data': '{{ hi }}', 'refs': ['hi'], 'config': {'count': 2}},
+    {'type': 'templated', 'data': '{{ hi | upper }}', 'refs': ['hi']},
+    {'type': 'templated', 'data': '{{ hi }}', 'refs': ['hi', 'many']},
+    {'type': 'values', 'data': 'hi', 'config': {'buffer_size': 2}},
+])
+def test_varying_specs_are_not_folded(field_spec):
+    raw_spec = {'field': field_spec, 'refs': {'hi': 'hello', 'many': ['a', 'b']}}
+    supplier = datacraft.loader.field_loader(raw_spec).get('field')
+    assert not isinstance(supplier, datacraft.supplier.common.SingleValue)
+
+
+def test_generation_plan():
+    raw_spec = {
+        'greeting': {'type': 'templated', 'data': '{{ hi }}!', 'refs': ['hi']},
+        'num': [1, 2, 3],
+        'skipped': 'never used',
+        'field_groups': [['greeting', 'num']],
+        'refs': {'hi': 'hello', 'orphan': [1, 2]}
+    }
+    plan = datacraft.loader.generation_plan(raw_spec)
+    assert plan['field_groups'] == {'greeting_num': ['greeting', 'num']}
+    assert plan['suppliers']['greeting'] == {'supplier': 'SingleValue', 'constant': 'hello!', 'uses': ['hi']}
+    assert 'constant' not in plan['suppliers']['num']
+    assert plan['unused'] == ['skipped', 'orphan']
+
+
 def _verify_expected_values(supplier, iterations, expected_values):
     data = [supplier.next(i) for i in range(iterations)]
     assert data == expected_values
@@ -1,4 +1,6 @@
+import json
 import os
+import sqlite3
 
 import catalogue
 import pytest
@@ -66,6 +68,14 @@ def test_parse_debug_spec_yaml(tmpdir):
     assert os.path.exists(os.path.join(tmpdir, 'generated-0'))
 
 
+def test_parse_debug_plan(tmpdir):
+    args = ['--debug-plan', '-o', str(tmpdir), '--inline', '{foo: [1,2,3], bar: "constant"}']
+    entrypoint.main(args)
+    with open(os.path.join(tmpdir, 'generated-0'), 'r', encoding='utf-8') as handle:
+        plan = json.load(handle)
+    assert plan['suppliers']['bar']['constant'] == 'constant'
+
+
 def test_parse_debug_defaults(tmpdir):
     args = ['--debug-defaults', '-o', str(tmpdir)]
     entrypoint.main(args)
@@ -111,6 +121,91 @@ def test_parse_format_output(tmpdir):
     assert os.path.exists(os.path.join(tmpdir, 'generated-0'))
 
 
+@pytest.mark.parametrize("batch_args", [[], ['--batch-size', '3'], ['--batch-size', '2', '--prefetch', '2']])
+def test_parse_format_output_batches(tmpdir, batch_args):
+    args = ['-o', str(tmpdir), '-i', '7', '-r', '3', '-x',
+            '--format', 'json',
+            '--inline', '{"A": [1, 2, 3, 4, 5, 6, 7]}'] + batch_args
+    entrypoint.main(args)
+    for count, expected in enumerate(['1, 2, 3', '4, 5, 6', '7']):
+        with open(os.path.join(tmpdir, f'generated-{count}'), 'r', encoding='utf-8') as handle:
+            assert [record['A'] for record in json.loads(handle.read())] == json.loads(f'[{expected}]')
+
+
+def test_partitioned_output(tmpdir):
+    args = ['-i', '4', '-o', str(tmpdir), '--format', 'json', '-x', '--partition-by', 'A',
+            '--inline', '{"A": ["x", "y"], "B": [1, 2, 3, 4]}']
+    entrypoint.main(args)
+    with open(os.path.join(tmpdir, 'A=x', 'generated-0'), 'r', encoding='utf-8') as handle:
+        assert handle.read() == '{"A": "x", "B": 1}\n{"A": "x", "B": 3}\n'
+
+
+def test_partitioned_output_requires_format(tmpdir):
+    with pytest.raises(datacraft.SpecException):
+        entrypoint.main(['-i', '4', '-o', str(tmpdir), '--partition-by', 'A', '--inline', '{"A": ["x", "y"]}'])
+
+
+def test_max_file_size(tmpdir):
+    args = ['-i', '6', '-o', str(tmpdir), '--format', 'json', '-x', '--max-file-size', '20B',
+            '--inline', '{"A": [1, 2, 3, 4, 5, 6]}']
+    entrypoint.main(args)
+    assert sorted(os.listdir(tmpdir)) == ['generated-0', 'generated-1', 'generated-2']
+    with open(os.path.join(tmpdir, 'generated-0'), 'r', encoding='utf-8') as handle:
+        assert handle.read() == '{"A": 1}\n{"A": 2}\n'
+
+
+@pytest.mark.parametrize("extra_args", [['--max-file-size', '0'], ['--max-file-size', 'big']])
+def test_max_file_size_invalid(tmpdir, extra_args):
+    with pytest.raises(SystemExit):
+        entrypoint.main(['-o', str(tmpdir), '--format', 'json', '--inline', '{"A": [1]}'] + extra_args)
+
+
+def test_max_file_size_and_records_per_file(tmpdir):
+    with pytest.raises(datacraft.SpecException):
+        entrypoint.main(['-o', str(tmpdir), '--format', 'json', '--max-file-size', '1KB', '-r', '2',
+                         '--inline', '{"A": [1]}'])
+
+
+def test_rate(tmpdir, mocker):
+    sleep = mocker.patch('time.sleep')
+    args = ['-i', '20', '-o', str(tmpdir), '--format', 'json', '-x', '--rate', '200/s', '--max-file-size', '1KB',
+            '--rate-profile', 'spikes(height=2, every=60, length=5)', '--inline', '{"A": [1, 2, 3]}']
+    entrypoint.main(args)
+    assert sleep.call_count > 0
+    with open(os.path.join(tmpdir, 'generated-0'), 'r', encoding='utf-8') as handle:
+        assert len(handle.readlines()) == 20
+
+
+@pytest.mark.parametrize("extra_args", [['--rate', '0/s'], ['--rate', 'fast']])
+def test_rate_invalid(tmpdir, extra_args):
+    with pytest.raises(SystemExit):
+        entrypoint.main(['-o', str(tmpdir), '--format', 'json', '--inline', '{"A": [1]}'] + extra_args)
+
+
+def test_rate_profile_invalid(tmpdir):
+    with pytest.raises(datacraft.SpecException):
+        entrypoint.main(['-o', str(tmpdir), '--format', 'json', '--inline', '{"A": [1]}', '--rate', '10/s',
+                         '--rate-profile', 'not_registered(x=1)'])
+
+
+def test_progress(tmpdir, capsys):
+    entrypoint.main(['-i', '30', '-o', str(tmpdir), '--format', 'json', '-x', '--max-file-size', '1KB',
+                     '--batch-size', '10', '--progress', '60', '--inline', '{"A": [1, 2, 3]}'])
+    lines = capsys.readouterr().err.strip().splitlines()
+    progress = json.loads(lines[-1])
+    assert progress['finished'] is True
+    assert progress['records'] >= 30
+    assert progress['bytes_written']['size_rolling'] >= os.path.getsize(os.path.join(tmpdir, 'generated-0'))
+
+def test_sqlite_output(tmpdir):
+    db_path = os.path.join(tmpdir, 'main.db')
+    args = ['-i', '5', '--sqlite', db_path, '--table', 'numbers', '--batch-size', '2',
+            '--inline', '{"A": [1, 2, 3, 4, 5]}']
+    entrypoint.main(args)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT A FROM numbers').fetchall() == [(1,), (2,), (3,), (4,), (5,)]
+
+
 def test_parse_spec_and_inline_invalid():
     args = ['--spec', os.path.join(test_dir, 'spec.json'),
             '--inline', '{"A": 1, "B":2, "C": 3}']
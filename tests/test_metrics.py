@@ -0,0 +1,122 @@
+import io
+import json
+import os
+import queue
+
+import pytest
+
+import datacraft
+from datacraft import metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_records_generated():
+    datacraft.entries({"A": [1, 2, 3]}, 40)
+    list(datacraft.stream({"A": [1, 2, 3]}, 25, batch_size=10, prefetch=1))
+    assert metrics.records_generated.value() == 65
+
+
+def test_records_generated_counted_when_closed_early():
+    generator = datacraft.generator({"A": [1, 2, 3]}, 100)
+    for _ in range(5):
+        next(generator)
+    generator.close()
+    assert metrics.records_generated.value() == 5
+
+
+def test_records_counted_when_read(mocker):
+    mocker.patch('time.monotonic', return_value=1000.0)
+    generator = datacraft.generator({"A": [1, 2, 3]}, 100)
+    for _ in range(11):
+        next(generator)
+    mocker.patch('time.monotonic', return_value=1002.0)
+    # window starts when generation starts, not when the first chunk of records is counted
+    assert metrics.snapshot()['records'] == 11
+    assert metrics.records_generated.rate() == pytest.approx(5.5)
+    generator.close()
+    assert metrics.records_generated.value() == 11
+
+
+def test_records_per_second(mocker):
+    mocker.patch('time.monotonic', return_value=1000.5)
+    metrics.records_generated.inc(100)
+    mocker.patch('time.monotonic', return_value=1004.5)
+    metrics.records_generated.inc(300)
+    assert metrics.records_generated.rate() == pytest.approx(100)
+    mocker.patch('time.monotonic', return_value=1012.5)
+    # only the second count is still in the window, which covers the seconds from 1003 on
+    assert metrics.records_generated.rate() == pytest.approx(300 / 9.5)
+
+
+def test_bytes_written_to_files(tmpdir):
+    spec = {"A": ["abc", "déf"]}
+    datacraft.entries(spec, 20, output=datacraft.outputs.size_rolling(
+        datacraft.outputs.processor(format_name='json'), str(tmpdir.join('rolled')), 100))
+    datacraft.entries(spec, 20, output=datacraft.outputs.partitioned(
+        datacraft.outputs.processor(format_name='json'), str(tmpdir.join('parts')), ['A']))
+    assert metrics.bytes_written.value(writer='size_rolling') == _dir_size(tmpdir.join('rolled'))
+    assert metrics.bytes_written.value(writer='partitioned') == _dir_size(tmpdir.join('parts'))
+
+
+def test_bytes_written_to_stdout(capsys):
+    writer = datacraft.outputs.stdout_writer()
+    writer.write('déf')
+    assert metrics.bytes_written.value(writer='stdout') == 0
+    writer.write_part('abc')
+    writer.end_parts()
+    writer.write('ghi')
+    writer.finished()
+    assert metrics.bytes_written.value(writer='stdout') == len(capsys.readouterr().out.encode('utf-8'))
+
+
+def test_queue_depth():
+    items = queue.Queue()
+    untrack = metrics.queue_depth.track(items.qsize, queue='test')
+    items.put(1)
+    items.put(2)
+    assert metrics.queue_depth.value(queue='test') == 2
+    untrack()
+    assert metrics.queue_depth.value(queue='test') == 0
+
+
+def test_histogram_render():
+    metrics.request_seconds.observe(0.003, endpoint='/data')
+    metrics.request_seconds.observe(0.2, endpoint='/data')
+    text = metrics.render()
+    assert 'datacraft_request_duration_seconds_bucket{endpoint="/data",le="0.001"} 0' in text
+    assert 'datacraft_request_duration_seconds_bucket{endpoint="/data",le="0.005"} 1' in text
+    assert 'datacraft_request_duration_seconds_bucket{endpoint="/data",le="+Inf"} 2' in text
+    assert 'datacraft_request_duration_seconds_sum{endpoint="/data"} 0.203' in text
+    assert 'datacraft_request_duration_seconds_count{endpoint="/data"} 2' in text
+
+
+def test_render():
+    datacraft.entries({"A": [1, 2, 3]}, 3)
+    metrics.bytes_written.inc(10, writer='say "hi"')
+    text = metrics.render()
+    assert '# TYPE datacraft_records_generated_total counter\ndatacraft_records_generated_total 3\n' in text
+    assert 'datacraft_bytes_written_total{writer="say \\"hi\\""} 10' in text
+    assert '# TYPE datacraft_records_per_second gauge' in text
+
+
+def test_progress():
+    stream = io.StringIO()
+    progress = metrics.Progress(60, stream)
+    progress.update()
+    assert stream.getvalue() == ''
+    datacraft.entries({"A": [1, 2, 3]}, 7)
+    progress.report(final=True)
+    line = json.loads(stream.getvalue())
+    assert line['records'] == 7
+    assert line['finished'] is True
+    assert set(line.keys()) == {'elapsed', 'records', 'records_per_second', 'bytes_written', 'queue_depth', 'finished'}
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(str(path)) for name in names)
@@ -125,3 +125,36 @@ def test_nested_field_groups_invalid_name():
         gen = spec.generator(iterations=2)
         next(gen)  # no error
         next(gen)  # should trigger
+
+
+def test_nested_field_groups_invalid_name_on_load():
+    raw_spec = {
+        "outer": {
+            "type": "nested",
+            "fields": {"one": "Val 1"},
+            "field_groups": [["one"], ["one", "tre"]]
+        }
+    }
+    with pytest.raises(datacraft.SupplierException):
+        datacraft.loader.field_loader(raw_spec).get('outer')
+
+
+@pytest.mark.parametrize("count", [2, 20])
+def test_nested_count_same_as_single_objects(count):
+    fields = {"inner": ["a", "b", "c"], "num": [1, 2, 3, 4]}
+    loader = datacraft.loader.field_loader({
+        "many": {"type": "nested", "config": {"count": count}, "fields": fields},
+        "single": {"type": "nested", "fields": fields}
+    })
+    many = loader.get('many')
+    single = loader.get('single')
+
+    assert many.next(5) == [single.next(5 + i) for i in range(count)]
+
+
+@pytest.mark.parametrize("as_list", [True, False])
+def test_nested_next_batch(as_list):
+    raw_spec = {"outer": {"type": "nested", "config": {"as_list": as_list}, "fields": {"inner": ["a", "b", "c"]}}}
+    supplier = datacraft.loader.field_loader(raw_spec).get('outer')
+
+    assert supplier.next_batch(3, 40) == [supplier.next(3 + i) for i in range(40)]
@@ -1,3 +1,5 @@
+import ipaddress
+
 import pytest
 
 import datacraft
@@ -36,6 +38,58 @@ def test_ip_precise_spec():
     assert value == '10.0.0.0'
 
 
+def test_ip_precise_large_network():
+    supplier = datacraft.suppliers.ip_precise(cidr="10.0.0.0/8")
+
+    assert supplier.next(0) == '10.0.0.0'
+    assert supplier.next(2 ** 24 - 1) == '10.255.255.255'
+    assert supplier.next(2 ** 24) == '10.0.0.0'
+
+
+def test_ip_precise_ipv6():
+    spec = _ip_precise_spec(cidr="2001:db8::/32")
+    supplier = datacraft.loader.field_loader(spec, enforce_schema=True).get('network')
+
+    assert supplier.next(0) == '2001:db8::'
+    assert supplier.next(65537) == '2001:db8::1:1'
+
+
+@pytest.mark.parametrize("cidr", ["192.168.0.0/20", "2001:db8:0:1::/96"])
+def test_ip_precise_next_batch(cidr):
+    network = ipaddress.ip_network(cidr)
+    supplier = datacraft.suppliers.ip_precise(cidr=cidr)
+
+    assert supplier.next_batch(10, 5) == [str(network[i]) for i in range(10, 15)]
+    for value in datacraft.suppliers.ip_precise(cidr=cidr, sample=True).next_batch(0, 100):
+        assert ipaddress.ip_address(value) in network
+
+
+def test_ip_spec_precise_invalid_cidr():
+    spec = {"network:ip.precise": {"config": {"cidr": "10.0.0.1/8"}}}
+    _test_invalid_precise_spec(spec)
+
+
+def test_ip_sampled_next_batch():
+    supplier = datacraft.suppliers.ip_supplier(base="192.168")
+
+    values = supplier.next_batch(0, 1000)
+    assert len(values) == 1000
+    for value in values:
+        octets = value.split('.')
+        assert octets[0:2] == ['192', '168']
+        assert all(0 <= int(octet) <= 254 for octet in octets[2:])
+
+
+def test_mac_address_next_batch():
+    supplier = datacraft.suppliers.mac_address('-')
+
+    values = supplier.next_batch(0, 1000)
+    assert len(set(values)) > 990
+    for value in values:
+        assert len(value) == 17
+        assert all(int(octet, 16) <= 255 for octet in value.split('-'))
+
+
 def test_ip_spec_precise_missing_config():
     spec = {"network:ip.precise": {}}
     _test_invalid_precise_spec(spec)
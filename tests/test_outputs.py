@@ -1,4 +1,5 @@
 import os
+import sqlite3
 
 import pytest
 
@@ -71,6 +72,264 @@ def test_outputs_record_level_more_than_one_per():
     _verify_output('test_record-1.txt', 'A:7, B:8, C:9\n')
 
 
+class _CollectingWriter(outputs.WriterInterface):
+    def __init__(self):
+        self.values = []
+
+    def write(self, value):
+        self.values.append(value)
+
+
+def test_outputs_record_level_handle_record():
+    writer = _CollectingWriter()
+    output = outputs.record_level(outputs.processor(format_name='json'), writer, 2)
+    record = {'A': 1}
+    output.handle_record(iteration=0, group_name='TEST', record=record)
+    output.handle_record(iteration=1, group_name='TEST', record={'A': 2}, exclude_internal=True)
+    output.finished_iterations()
+
+    assert record == {'A': 1}
+    assert writer.values == [
+        '[{"A": 1, "_internal": {"_iteration": 0, "_field_group": "TEST"}}, {"A": 2}]'
+    ]
+
+
+@pytest.mark.parametrize("template,needs_internal", [
+    ('A:{{ A }}', False),
+    ('{{ _internal._iteration }} A:{{ A }}', True),
+    ('{% include "other.jinja" %}', True),
+])
+def test_template_needs_internal(template, needs_internal):
+    assert engines.string(template).needs_internal == needs_internal
+
+
+def test_outputs_record_level_template_with_internal():
+    writer = _CollectingWriter()
+    engine = outputs.processor(template='{{ A }}:{{ _internal._iteration }}')
+    output = outputs.record_level(engine, writer, 1)
+    output.handle_record(iteration=3, group_name='TEST', record={'A': 1})
+    assert writer.values == ['1:3']
+
+
+_STREAM_RECORDS = [{'A': i, 'B': 'é"\n', 'C': {'D': [i, {'E': None}], 'F': {}}} for i in range(7)]
+
+
+@pytest.mark.parametrize("format_name", ['json', 'json-pretty', 'yaml', 'csv', 'csvh'])
+@pytest.mark.parametrize("records_per_file", [2, 3, 10])
+def test_outputs_record_level_streamed_same_as_list(format_name, records_per_file):
+    record_processor = outputs.processor(format_name=format_name)
+    writer = _CollectingWriter()
+    output = outputs.record_level(record_processor, writer, records_per_file)
+    assert output.stream is not None
+    batch = [(i, 'TEST', record) for i, record in enumerate(_STREAM_RECORDS)]
+    output.handle_batch(batch[:4], exclude_internal=True)
+    for i, group_name, record in batch[4:]:
+        output.handle_record(i, group_name, record, exclude_internal=True)
+    output.finished_iterations()
+
+    assert output.buffer == []
+    assert writer.values == [record_processor.process(_STREAM_RECORDS[start:start + records_per_file])
+                             for start in range(0, len(_STREAM_RECORDS), records_per_file)]
+
+
+def test_outputs_record_level_custom_format_buffered():
+    @datacraft.registry.formats('test_upper')
+    def _format_upper(record):
+        return str(record).upper()
+
+    output = outputs.record_level(outputs.processor(format_name='test_upper'), _CollectingWriter(), 2)
+    assert output.stream is None
+
+
+def test_outputs_record_level_buffers_copy_of_record():
+    @datacraft.registry.formats('test_sorted')
+    def _format_sorted(records):
+        return str([sorted(record.items()) for record in records])
+
+    writer = _CollectingWriter()
+    output = outputs.record_level(outputs.processor(format_name='test_sorted'), writer, 2)
+    record = {'A': 1}
+    output.handle_record(iteration=0, group_name='TEST', record=record, exclude_internal=True)
+    record['A'] = 2
+    output.handle_batch([(1, 'TEST', record)], exclude_internal=True)
+    record['A'] = 3
+
+    assert writer.values == ["[[('A', 1)], [('A', 2)]]"]
+
+
+def test_single_file_writer_parts(tmpdir):
+    writer = outputs.single_file_writer(outdir=tmpdir, outname='parts', overwrite=False)
+    writer.write_part('[1')
+    writer.write_part(', 2]')
+    writer.end_parts()
+    writer.write('[3]')
+    with open(os.path.join(tmpdir, 'parts')) as handle:
+        assert handle.read() == '[1, 2]\n[3]\n'
+
+
+@pytest.mark.parametrize("pool_size", [1, 3])
+def test_database_output(tmpdir, pool_size):
+    db_path = os.path.join(tmpdir, 'test.db')
+    output = outputs.database(lambda: sqlite3.connect(db_path), 'records', batch_size=4, pool_size=pool_size)
+    raw_spec = {
+        'id': {'type': 'values', 'data': list(range(10))},
+        'ratio': [0.5],
+        'tags': {'type': 'values', 'data': ['a', 'b'], 'config': {'count': 2}},
+        'name': ['x'],
+        'field_groups': [['id', 'ratio', 'tags', 'name'], ['id', 'ratio', 'tags']]
+    }
+    for _ in datacraft.stream(raw_spec, 10, batch_size=3, output=output):
+        pass
+
+    with sqlite3.connect(db_path) as conn:
+        columns = [(row[1], row[2]) for row in conn.execute('PRAGMA table_info(records)')]
+        rows = conn.execute('SELECT id, ratio, tags, name FROM records ORDER BY id').fetchall()
+    assert columns == [('id', 'INTEGER'), ('ratio', 'REAL'), ('tags', 'TEXT'), ('name', 'TEXT')]
+    assert [row[0] for row in rows] == list(range(10))
+    assert rows[0] == (0, 0.5, '["a", "b"]', 'x')
+    assert rows[1][3] is None
+
+
+@pytest.mark.parametrize("paramstyle", ['numeric', 'named'])
+def test_database_output_paramstyle(tmpdir, paramstyle):
+    db_path = os.path.join(tmpdir, 'test.db')
+    output = outputs.database(lambda: sqlite3.connect(db_path), 'records', columns=['b'], paramstyle=paramstyle)
+    output.handle_record(0, 'ALL', {'a': 1, 'b': 'two'})
+    output.finished_iterations()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT * FROM records').fetchall() == [('two',)]
+
+
+def test_database_output_invalid_paramstyle():
+    with pytest.raises(datacraft.SpecException):
+        outputs.database(lambda: None, 'records', paramstyle='sparkle')
+
+
+def test_database_output_pool_error(tmpdir):
+    db_path = os.path.join(tmpdir, 'test.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE records (id INTEGER NOT NULL)')
+    output = outputs.database(lambda: sqlite3.connect(db_path), 'records', batch_size=1, pool_size=2)
+    with pytest.raises(sqlite3.IntegrityError):
+        output.handle_record(0, 'ALL', {'id': None})
+        output.finished_iterations()
+
+
+def test_partitioned_output(tmpdir):
+    processor = outputs.processor(format_name='csv-with-header')
+    output = outputs.partitioned(processor, str(tmpdir), ['region', 'day:10'], max_open_files=1)
+    raw_spec = {
+        'region': ['east', 'west', 'a/b'],
+        'day': ['2050-01-01T10:00', '2050-01-01T10:00', '2050-01-01T10:00', '2050-01-02T09:00'],
+        'id': {'type': 'values', 'data': list(range(12))}
+    }
+    for _ in datacraft.stream(raw_spec, 12, output=output, exclude_internal=True):
+        pass
+
+    _verify_partition(tmpdir, 'region=east/day=2050-01-01', 'generated-0',
+                      'region,day,id\neast,2050-01-01T10:00,0\neast,2050-01-01T10:00,6\neast,2050-01-01T10:00,9\n')
+    _verify_partition(tmpdir, 'region=a%2Fb/day=2050-01-02', 'generated-0',
+                      'region,day,id\na/b,2050-01-02T09:00,11\n')
+    assert len(os.listdir(os.path.join(tmpdir, 'region=west'))) == 2
+
+
+def test_partitioned_output_field_group(tmpdir):
+    processor = outputs.processor(template='{{ id }}')
+    output = outputs.partitioned(processor, str(tmpdir), ['_field_group', 'missing'], outfile_prefix='part',
+                                 extension='.txt')
+    raw_spec = {'id': [1, 2, 3, 4], 'field_groups': {'one': ['id'], 'two': ['id']}}
+    for _ in datacraft.stream(raw_spec, 4, output=output):
+        pass
+    one = os.path.join(tmpdir, '_field_group=one', 'missing=__DEFAULT_PARTITION__', 'part-0.txt')
+    two = os.path.join(tmpdir, '_field_group=two', 'missing=__DEFAULT_PARTITION__', 'part-0.txt')
+    with open(one, 'r', encoding='utf-8') as handle_one, open(two, 'r', encoding='utf-8') as handle_two:
+        assert sorted(handle_one.read().split() + handle_two.read().split()) == ['1', '2', '3', '4']
+
+
+@pytest.mark.parametrize("partition_by", [[], [':10'], ['day:'], ['day:x']])
+def test_partitioned_output_invalid(tmpdir, partition_by):
+    with pytest.raises(datacraft.SpecException):
+        outputs.partitioned(outputs.processor(format_name='json'), str(tmpdir), partition_by)
+
+
+@pytest.mark.parametrize("size,expected", [
+    (100, 100), ('100', 100), ('20B', 20), ('512KB', 512 * 1024), ('256mb', 256 * 1024 ** 2),
+    ('1.5G', 1536 * 1024 ** 2), ('2 GiB', 2 * 1024 ** 3)
+])
+def test_parse_size(size, expected):
+    assert datacraft.utils.parse_size(size) == expected
+
+
+@pytest.mark.parametrize("size", ['', 'MB', '12XB', '-1KB'])
+def test_parse_size_invalid(size):
+    with pytest.raises(ValueError):
+        datacraft.utils.parse_size(size)
+
+
+def test_size_rolling_output(tmpdir):
+    processor = outputs.processor(format_name='csvh')
+    output = outputs.size_rolling(processor, str(tmpdir), max_file_size=20, outfile_prefix='roll')
+    # second output sharing the directory, i.e. another process, claims its own files
+    other = outputs.size_rolling(processor, str(tmpdir), max_file_size=20, outfile_prefix='roll')
+    for i in range(5):
+        output.handle_record(i, 'ALL', {'id': 1000 + i}, exclude_internal=True)
+        if i == 0:
+            other.handle_record(i, 'ALL', {'id': 1}, exclude_internal=True)
+    output.finished_iterations()
+    other.finished_iterations()
+
+    contents = {}
+    for name in sorted(os.listdir(tmpdir)):
+        with open(os.path.join(tmpdir, name), 'r', encoding='utf-8') as handle:
+            contents[name] = handle.read()
+    assert contents == {
+        'roll-0': 'id\n1000\n1001\n1002\n',
+        'roll-1': 'id\n1\n',
+        'roll-2': 'id\n1003\n1004\n',
+    }
+    assert all(len(content) <= 20 for content in contents.values())
+
+
+def test_size_rolling_record_bigger_than_max(tmpdir):
+    output = outputs.size_rolling(outputs.processor(template='{{ A }}'), str(tmpdir), max_file_size=2)
+    output.handle_record(0, 'ALL', {'A': 'longer than max'})
+    output.handle_record(1, 'ALL', {'A': 'also longer'})
+    output.finished_iterations()
+    assert sorted(os.listdir(tmpdir)) == ['generated-0', 'generated-1']
+
+
+def test_size_rolling_invalid_size(tmpdir):
+    with pytest.raises(datacraft.SpecException):
+        outputs.size_rolling(outputs.processor(format_name='json'), str(tmpdir), max_file_size=0)
+
+
+def test_outputs_handle_and_finished_record(tmpdir):
+    processor = outputs.processor(format_name='csvh')
+    db_path = os.path.join(tmpdir, 'test.db')
+    handlers = [
+        outputs.partitioned(processor, os.path.join(tmpdir, 'parts'), ['region']),
+        outputs.size_rolling(processor, os.path.join(tmpdir, 'rolled'), max_file_size=1000),
+        outputs.database(lambda: sqlite3.connect(db_path), 'records', batch_size=2),
+    ]
+    for output in handlers:
+        for i in range(3):
+            output.handle('region', 'east')
+            output.handle('id', i)
+            output.finished_record(i, 'ALL', exclude_internal=True)
+        output.finished_iterations()
+
+    _verify_partition(tmpdir, 'parts/region=east', 'generated-0', 'region,id\neast,0\neast,1\neast,2\n')
+    _verify_partition(tmpdir, 'rolled', 'generated-0', 'region,id\neast,0\neast,1\neast,2\n')
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT region, id FROM records ORDER BY id').fetchall() == [
+            ('east', 0), ('east', 1), ('east', 2)]
+
+
+def _verify_partition(tmpdir, partition, name, expected):
+    with open(os.path.join(tmpdir, *partition.split('/'), name), 'r', encoding='utf-8') as handle:
+        assert handle.read() == expected
+
+
 format_tests = [
     ('json', {'field': 'value'}, "{\"field\": \"value\"}"),
     ('json', [{'field': 'value'}], "[{\"field\": \"value\"}]"),
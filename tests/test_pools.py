@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+import datacraft
+from datacraft import pools
+
+_SPEC = {"id": {"type": "uuid"}, "num": {"type": "range", "data": [1, 100]}}
+
+
+@pytest.fixture(autouse=True)
+def clear_pools():
+    pools.clear()
+    yield
+    pools.clear()
+
+
+def test_pool_entries_continue_and_wrap():
+    record_pool = datacraft.pool(_SPEC, 5)
+    first = record_pool.entries(3)
+    second = record_pool.entries(4)
+    assert [record['num'] for record in first + second] == [1, 2, 3, 4, 5, 1, 2]
+
+
+def test_pool_records_are_copies():
+    record_pool = datacraft.pool(_SPEC, 5)
+    record_pool[0]['num'] = 'changed'
+    assert record_pool[0]['num'] == 1
+    assert record_pool[-1]['num'] == 5
+    with pytest.raises(IndexError):
+        _ = record_pool[5]
+
+
+def test_pool_sample():
+    record_pool = datacraft.pool(_SPEC, 10)
+    sampled = record_pool.sample(10)
+    assert sorted(record['num'] for record in sampled) == list(range(1, 11))
+
+
+def test_pool_reused_in_memory():
+    assert datacraft.pool(_SPEC, 10) is datacraft.pool(_SPEC, 10)
+    assert datacraft.pool(_SPEC, 10) is not datacraft.pool(_SPEC, 11)
+
+
+def test_pool_persisted(tmpdir):
+    persist = os.path.join(tmpdir, 'pools')
+    record_pool = datacraft.pool(_SPEC, 20, persist=persist)
+    assert os.listdir(persist) == [record_pool.key + '.pool']
+    pools.clear()
+
+    loaded = datacraft.pool(_SPEC, 20, persist=persist)
+    assert loaded is not record_pool
+    assert loaded.entries(20) == record_pool.entries(20)
+    loaded.close()
+
+
+def test_pool_invalid_file_regenerated(tmpdir):
+    key = pools.pool_key(_SPEC, 20)
+    with open(os.path.join(tmpdir, key + '.pool'), 'wb') as handle:
+        handle.write(b'not a pool')
+    record_pool = datacraft.pool(_SPEC, 20, persist=str(tmpdir))
+    assert len(record_pool) == 20
+
+
+def test_pool_key_changes():
+    key = pools.pool_key(_SPEC, 20)
+    assert key == pools.pool_key(dict(_SPEC), 20)
+    assert key != pools.pool_key(_SPEC, 20, seed=42)
+    assert key != pools.pool_key(_SPEC, 21)
+    assert key != pools.pool_key({"id": {"type": "uuid"}}, 20)
+
+
+def test_pool_seeded():
+    spec = {"num": {"type": "rand_int_range", "data": [1, 1000000]}}
+    first = datacraft.pool(spec, 10, seed=7).entries(10)
+    pools.clear()
+    assert datacraft.pool(spec, 10, seed=7).entries(10) == first
+
+
+def test_pool_lru_eviction(tmpdir):
+    datacraft.registries.set_default('pool_cache_size', 2)
+    try:
+        for size in range(1, 5):
+            datacraft.pool(_SPEC, size, persist=str(tmpdir))
+    finally:
+        datacraft.registries.set_default('pool_cache_size', 8)
+    assert len(pools._pools) == 2
+    assert len(os.listdir(tmpdir)) == 2
+
+
+def test_pool_not_serializable():
+    @datacraft.registry.types('test_pool_object')
+    def _configure_object_supplier(field_spec, loader):
+        return datacraft.suppliers.values(object())
+
+    with pytest.raises(datacraft.SpecException):
+        datacraft.pool({"obj": {"type": "test_pool_object"}}, 2)
@@ -1,8 +1,10 @@
 import pytest
+import yaml
 
 import datacraft
 from datacraft.preprocessor import _parse_key, _is_spec_data, _update_no_params
 from datacraft.preprocessor import _preprocess_spec, _preprocess_nested
+from datacraft import preprocessor
 from . import builder
 
 parse_key_tests = [
@@ -381,3 +383,75 @@ def test_cnt_substitute_for_count():
     config = updated['id']['config']
     assert config.get('count') == '6'
     assert 'cnt' not in config
+
+
+def test_csv_select_multiple_without_refs():
+    spec = {
+        "first": {"type": "csv_select", "data": {"one": 1}, "config": {"datafile": "one.csv"}},
+        "second": {"type": "csv_select", "data": {"two": 2}, "config": {"datafile": "two.csv"}}
+    }
+    updated = datacraft.loader.preprocess_spec(spec)
+    assert set(updated['refs'].keys()) == {'first_config_ref', 'second_config_ref'}
+
+
+def test_nested_refs_merged_with_root_refs():
+    spec = {
+        "outer:nested": {
+            "fields": {
+                "placeholder": {"type": "csv_select", "data": {"one": 1}, "config": {"datafile": "not_real.csv"}}
+            }
+        },
+        "refs": {"ONE": [1, 2, 3]}
+    }
+    updated = datacraft.loader.preprocess_spec(spec)
+    assert set(updated['refs'].keys()) == {'ONE', 'placeholder_config_ref'}
+
+
+def test_parsed_spec_not_preprocessed_again(mocker):
+    spec = datacraft.parse_spec({"id:uuid": {}, "name?prefix=A": ["a", "b"]})
+    walk = mocker.patch('datacraft.preprocessor._walk')
+    records = list(spec.generator(2))
+    datacraft.entries(spec, 1)
+    walk.assert_not_called()
+    assert [record['name'] for record in records] == ['Aa', 'Ab']
+
+
+def test_preprocessed_spec_changed_is_preprocessed_again():
+    updated = datacraft.loader.preprocess_spec({"id:uuid": {}})
+    updated["name?prefix=A"] = ["a", "b"]
+    again = datacraft.loader.preprocess_spec(updated)
+    assert again['name'] == {'type': 'values', 'data': ['a', 'b'], 'config': {'prefix': 'A'}}
+
+
+def test_parsed_spec_nested_change_is_preprocessed_again():
+    spec = datacraft.parse_spec({"outer:nested": {"fields": {"id:uuid": {}}}})
+    spec['outer']['fields']['name?prefix=A'] = ['a']
+    assert datacraft.entries(spec, 1)[0]['outer']['name'] == 'Aa'
+
+
+def test_preprocessed_spec_is_plain_dict():
+    updated = datacraft.loader.preprocess_spec({"id:uuid": {}, "name?prefix=A": ["a", "b"]})
+    assert type(updated) is dict
+    assert yaml.safe_load(yaml.safe_dump(updated)) == updated
+
+
+def test_default_steps_registered_but_skipped(mocker):
+    for name in preprocessor.DEFAULT_STEPS:
+        assert datacraft.registries.Registry.preprocessors.get(name) is not None
+    walk = mocker.patch('datacraft.preprocessor._walk', wraps=preprocessor._walk)
+    datacraft.loader.preprocess_spec({"id:uuid": {}})
+    # only walked by the default preprocessor
+    assert walk.call_count == 1
+
+
+def test_nested_step_on_its_own():
+    nested = datacraft.registries.Registry.preprocessors.get('nested')
+    updated = nested({"outer:nested": {"fields": {"id:uuid": {}}}})
+    assert updated['outer']['fields'] == {'id': {'type': 'uuid'}}
+
+
+def test_parse_key_config_not_shared():
+    _, _, config = _parse_key('field?tag=a&tag=b')
+    config['tag'].append('c')
+    config['other'] = 'value'
+    assert _parse_key('field?tag=a&tag=b') == ('field', None, {'tag': ['a', 'b']})
@@ -0,0 +1,129 @@
+import pytest
+
+import datacraft
+from datacraft import rates, utils
+
+
+class FakeClock:
+    """ clock that only moves forward when slept on, or when advanced """
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FixedDistribution(datacraft.Distribution):
+    def __init__(self, values):
+        self.values = list(values)
+
+    def next_value(self):
+        return self.values.pop(0)
+
+
+def _limiter(rate, **kwargs):
+    clock = FakeClock()
+    return rates.RateLimiter(rate, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+@pytest.mark.parametrize("rate,expected", [
+    ('5000/s', 5000.0), ('5000', 5000.0), ('300/m', 5.0), ('300/min', 5.0), ('7200/h', 2.0), ('1.5/sec', 1.5),
+    (20, 20.0)
+])
+def test_parse_rate(rate, expected):
+    assert utils.parse_rate(rate) == expected
+
+
+@pytest.mark.parametrize("rate", ['fast', '10/d', '0/s', '-5', 0])
+def test_parse_rate_invalid(rate):
+    with pytest.raises(ValueError):
+        utils.parse_rate(rate)
+
+
+def test_acquire_paces_to_rate():
+    limiter, clock = _limiter('10/s')
+    for _ in range(20):
+        limiter.acquire()
+    assert clock.now == pytest.approx(102.0)
+    assert limiter.throughput == pytest.approx(10.0)
+
+
+def test_acquire_batch_counts_each_token():
+    limiter, clock = _limiter('100/s')
+    limiter.acquire(50)
+    limiter.acquire(50)
+    assert clock.now == pytest.approx(101.0)
+
+
+def test_acquire_makes_up_for_slow_caller():
+    limiter, clock = _limiter('10/s', burst=5)
+    limiter.acquire()
+    # caller took longer than the 0.1 seconds for the token
+    clock.now += 0.3
+    for _ in range(3):
+        limiter.acquire()
+    # three tokens of lost time are made up, so no waiting for these
+    assert clock.sleeps == [pytest.approx(0.1)]
+    limiter.acquire()
+    assert clock.now == pytest.approx(100.5)
+
+
+def test_acquire_catch_up_limited_to_burst():
+    limiter, clock = _limiter('10/s', burst=2)
+    clock.now += 10
+    for _ in range(2):
+        limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.1)]
+
+
+def test_profile_scales_rate():
+    limiter, clock = _limiter('8/s', burst=1, profile=FixedDistribution([2, 0.5]))
+    for _ in range(16):
+        limiter.acquire()
+    assert limiter.multiplier == 2
+    assert clock.now == pytest.approx(101.0)
+    for _ in range(4):
+        limiter.acquire()
+    assert limiter.current_rate == 4
+    assert clock.now == pytest.approx(102.0)
+
+
+def test_profile_zero_pauses():
+    limiter, clock = _limiter('10/s', burst=1, profile=FixedDistribution([0, 1]))
+    limiter.acquire()
+    assert clock.now == pytest.approx(101.1)
+
+
+def test_profile_from_registry():
+    limiter, _ = _limiter('10/s', profile='spikes(height=4, every=60, length=5)')
+    assert isinstance(limiter.profile, datacraft.Distribution)
+
+
+def test_rate_limited_generator():
+    clock = FakeClock()
+    limiter = rates.RateLimiter('50/s', clock=clock, sleep=clock.sleep)
+    spec = datacraft.parse_spec({"id": {"type": "values", "data": [1, 2, 3]}})
+    records = list(datacraft.rate_limited(spec.generator(100), limiter))
+    assert len(records) == 100
+    assert clock.now == pytest.approx(102.0, abs=0.05)
+
+
+def test_rate_limited_batches():
+    clock = FakeClock()
+    limiter = rates.RateLimiter('1000/s', clock=clock, sleep=clock.sleep)
+    batches = list(rates.rate_limited(datacraft.stream({"A": [1, 2]}, 1000, batch_size=100), limiter, per_item=100))
+    assert len(batches) == 10
+    assert clock.now >= 101.0
+
+
+@pytest.mark.parametrize("rate,batch_size,expected", [('5000/s', 1000, 500), ('5/s', 1000, 1), (100_000, 1000, 1000)])
+def test_batch_size_for(rate, batch_size, expected):
+    assert rates.batch_size_for(rate, batch_size) == expected
@@ -36,3 +36,99 @@ def test_config_ref_in_refs():
     spec = spec_builder.build()
     assert 'refs' in spec
     assert spec['refs'].get('test') == {'type': 'config_ref', 'config': {'key1': 'value1', 'key2': 'value2'}}
+
+
+def _shared_ref_spec(ref_config=None):
+    ref = {"type": "uuid"}
+    if ref_config:
+        ref["config"] = ref_config
+    return {
+        "id": {"type": "ref", "data": "ID"},
+        "url": {"type": "templated", "data": "/users/{{ ID }}", "refs": ["ID"]},
+        "refs": {"ID": ref}
+    }
+
+
+def test_ref_cache_per_record():
+    records = datacraft.entries(_shared_ref_spec({"cache_per_record": True}), 3)
+    for record in records:
+        assert record['url'] == f"/users/{record['id']}"
+    assert len({record['id'] for record in records}) == 3
+
+
+def test_ref_not_cached_by_default():
+    record = datacraft.entries(_shared_ref_spec(), 1)[0]
+    assert record['url'] != f"/users/{record['id']}"
+
+
+def test_cache_shared_refs_default():
+    datacraft.registries.set_default('cache_shared_refs', 'true')
+    try:
+        records = datacraft.entries(_shared_ref_spec(), 2)
+    finally:
+        datacraft.registries.set_default('cache_shared_refs', False)
+    for record in records:
+        assert record['url'] == f"/users/{record['id']}"
+
+
+def test_cache_shared_refs_single_user_not_cached():
+    datacraft.registries.set_default('cache_shared_refs', 'true')
+    try:
+        loader = datacraft.loader.field_loader({
+            "pair": {"type": "ref_list", "data": ["ID", "ID"]},
+            "refs": {"ID": {"type": "uuid"}}
+        })
+        pair = loader.get('pair').next(0)
+    finally:
+        datacraft.registries.set_default('cache_shared_refs', False)
+    assert pair[0] != pair[1]
+
+
+def test_cached_per_record_batch():
+    supplier = datacraft.suppliers.cached_per_record(datacraft.suppliers.random_range(0, 100))
+    batch = supplier.next_batch(5, 4)
+    assert supplier.next_batch(5, 4) == batch
+    assert supplier.next(6) == batch[1]
+
+
+def test_cached_per_record_mixed_next_and_batch():
+    supplier = datacraft.suppliers.cached_per_record(datacraft.suppliers.random_range(0, 100))
+    singles = [supplier.next(i) for i in range(3, 8)]
+    assert supplier.next_batch(3, 5) == singles
+    # only the iterations on either side of the cached ones are new
+    batch = supplier.next_batch(1, 10)
+    assert batch[2:7] == singles
+    assert [supplier.next(i) for i in range(1, 11)] == batch
+
+
+def _nested_shared_ref_spec(ref_config=None):
+    ref = {"type": "rand_range", "data": [0, 1000]}
+    if ref_config:
+        ref["config"] = ref_config
+    return {
+        "outer": {
+            "type": "nested",
+            "config": {"count": 20},
+            "fields": {
+                "a": {"type": "templated", "data": "{{ R }}", "refs": ["R"]},
+                "b": {"type": "ref", "data": "R"}
+            }
+        },
+        "refs": {"R": ref}
+    }
+
+
+def test_ref_cache_per_record_in_nested_count():
+    records = datacraft.entries(_nested_shared_ref_spec({"cache_per_record": True}), 2)
+    for record in records:
+        assert all(obj['a'] == str(obj['b']) for obj in record['outer'])
+
+
+def test_cache_shared_refs_in_nested():
+    datacraft.registries.set_default('cache_shared_refs', 'true')
+    try:
+        records = datacraft.entries(_nested_shared_ref_spec(), 2)
+    finally:
+        datacraft.registries.set_default('cache_shared_refs', False)
+    for record in records:
+        assert all(obj['a'] == str(obj['b']) for obj in record['outer'])
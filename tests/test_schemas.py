@@ -3,7 +3,7 @@ import pytest
 import datacraft.registries as types
 import datacraft
 from datacraft._registered_types.schemas import load
-from datacraft.schemas import validate_schema_for_spec
+from datacraft.schemas import validate_schema_for_spec, validate_spec_for_type, validator_for_type
 
 
 def test_load_unknown_key():
@@ -49,3 +49,38 @@ def test_invalid_count_param_values_spec():
     with pytest.raises(datacraft.SpecException):
         spec = {'type': 'values', 'data': [1, 2, 3], 'config': {'count': {}}}
         validate_schema_for_spec('values', spec, values_schema)
+
+
+def test_validator_for_type_cached():
+    validator = validator_for_type('range')
+    assert validator is not None
+    assert validator_for_type('range') is validator
+    assert validator_for_type('not_a_registered_type') is None
+
+
+def test_validator_for_type_reregistered():
+    @datacraft.registry.schemas('test_reregistered')
+    def _first_schema():
+        return {'type': 'object', 'required': ['data']}
+
+    first = validator_for_type('test_reregistered')
+    validate_spec_for_type('test_reregistered', {'data': 1})
+
+    @datacraft.registry.schemas('test_reregistered')
+    def _second_schema():
+        return {'type': 'object', 'required': ['config']}
+
+    assert validator_for_type('test_reregistered') is not first
+    with pytest.raises(datacraft.SpecException):
+        validate_spec_for_type('test_reregistered', {'data': 1})
+
+
+def test_validate_spec_for_type_invalid():
+    with pytest.raises(datacraft.SpecException):
+        validate_spec_for_type('range', {'type': 'range', 'data': 'not a range'})
+
+
+def test_load_returns_new_schema():
+    schema = load('range')
+    schema['properties']['type']['pattern'] = 'changed'
+    assert load('range')['properties']['type']['pattern'] != 'changed'
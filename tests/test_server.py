@@ -48,3 +48,24 @@ def test_server_callback(mocker, one):
 
 def server_for_generator(gen, one, is_json):
     return datacraft.server._Server({'/test': gen}, port=None, host=None, data_is_json=is_json, count_supplier=one)
+
+
+def test_server_metrics(one):
+    gen = datacraft.parse_spec({"test:values": 42}).generator(2)
+    client = server_for_generator(gen, one, True).app().test_client()
+
+    assert client.get('/test').get_json() == [{'test': 42}]
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'datacraft_request_duration_seconds_count{endpoint="/test"} 1' in text
+    assert 'datacraft_request_duration_seconds_bucket{endpoint="/test",le="+Inf"} 1' in text
+
+
+def test_server_metrics_endpoint_used_for_data(one):
+    gen = datacraft.parse_spec({"test:values": 42}).generator(1)
+    server = datacraft.server._Server({'metrics': gen}, port=None, host=None, data_is_json=True, count_supplier=one)
+
+    assert server.app().test_client().get('/metrics').get_json() == [{'test': 42}]
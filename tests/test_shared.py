@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+
+import pytest
+
+import datacraft
+from datacraft.supplier import shared
+
+test_dir = os.sep.join([os.path.dirname(os.path.realpath(__file__)), 'data'])
+
+
+@pytest.fixture(autouse=True)
+def release_shared():
+    yield
+    shared.release()
+    datacraft.supplier.csv._csv_data_cache.clear()
+    datacraft.supplier.csv._weighted_csv_cache.clear()
+
+
+def test_share_list_values_round_trip():
+    data = ['a', 1, 2.5, None, True, {'nested': [1, 2]}]
+    shared_list = shared.share_list(('round trip',), lambda: data)
+
+    assert len(shared_list) == len(data)
+    assert list(shared_list) == data
+    assert shared_list[-1] == {'nested': [1, 2]}
+    assert shared_list[1:3] == [1, 2.5]
+
+
+def test_share_list_attaches_to_existing_block():
+    first = shared.share_list(('letters',), lambda: ['x', 'y', 'z'])
+    # attaching by key does not load the values again
+    second = shared.share_list(('letters',), lambda: pytest.fail('values loaded again'))
+
+    assert first.table.name == second.table.name
+    assert list(second) == ['x', 'y', 'z']
+
+
+def test_share_floats_round_trip():
+    first = shared.share_floats(('weights',), lambda: [0.5, 1.5, 3.0])
+    second = shared.share_floats(('weights',), lambda: pytest.fail('numbers loaded again'))
+
+    assert list(first) == [0.5, 1.5, 3.0]
+    assert list(second) == [0.5, 1.5, 3.0]
+    assert first[-1] == 3.0
+    assert first.readonly
+
+
+def test_values_key_same_for_equal_values():
+    assert shared.values_key([1, 'a', {'b': 2}]) == shared.values_key([1, 'a', {'b': 2}])
+    assert shared.values_key([1, 2]) != shared.values_key([12])
+    with pytest.raises(TypeError):
+        shared.values_key([object()])
+
+
+def test_share_csv_includes_header_row():
+    table = shared.share_csv(os.path.join(test_dir, 'test.csv'), ',', '"')
+
+    assert table.row(0) == ['status', 'status_description', 'status_type']
+    assert table.cell(1, 0) == '100'
+
+
+def test_shared_csv_spec():
+    spec = {"status_desc:csv?datafile=test.csv&headers=true&column=status_description&shared=true": {}}
+    loader = datacraft.loader.field_loader(spec, data_dir=test_dir, enforce_schema=True)
+    supplier = loader.get('status_desc')
+
+    assert supplier.next(0) == 'Continue'
+    # last entry then wrap around
+    assert supplier.next(39) == 'HTTP Version Not Supported'
+    assert supplier.next(40) == 'Continue'
+
+
+def test_shared_csv_spec_sample_with_count():
+    spec = {"status:csv?datafile=test.csv&headers=true&sample=true&count=3&shared=true": {}}
+    loader = datacraft.loader.field_loader(spec, data_dir=test_dir)
+    supplier = loader.get('status')
+
+    values = supplier.next(0)
+    assert len(values) == 3
+
+
+def test_shared_values_spec():
+    datacraft.registries.set_default('shared_values_min_size', 2)
+    try:
+        values = datacraft.values_for({"type": "values", "data": [1, 2, 3], "config": {"shared": True}}, 4)
+    finally:
+        datacraft.registries.set_default('shared_values_min_size', 10000)
+    assert values == [1, 2, 3, 1]
+
+
+def test_shared_csv_cached_separately():
+    csv_path = os.path.join(test_dir, 'test.csv')
+    unshared = datacraft.supplier.csv.load_csv_data(csv_path, ',', True, '"', False, False)
+    shared_data = datacraft.supplier.csv.load_csv_data(csv_path, ',', True, '"', False, False, shared_memory=True)
+
+    assert unshared is not shared_data
+    assert isinstance(shared_data.table, shared.SharedTable)
+
+
+def test_shared_weighted_csv_spec():
+    spec = {"status": {"type": "weighted_csv", "config": {"datafile": "weighted.csv", "shared": True}}}
+    supplier = datacraft.loader.field_loader(spec, data_dir=test_dir, enforce_schema=True).get('status')
+
+    assert isinstance(supplier.choices, shared.SharedList)
+    assert isinstance(supplier.cum_weights, memoryview)
+    assert supplier.next(0) in supplier.choices
+
+
+def test_shared_weighted_csv_attaches_without_reading_file(mocker):
+    csv_path = os.path.join(test_dir, 'weighted.csv')
+    published = datacraft.supplier.csv.load_weighted_csv_data(csv_path, 1, 2, shared_memory=True)
+    # simulate a sibling process that has not loaded the data itself
+    datacraft.supplier.csv._weighted_csv_cache.clear()
+    read = mocker.patch('datacraft.supplier.csv._read_weighted_columns')
+
+    attached = datacraft.supplier.csv.load_weighted_csv_data(csv_path, 1, 2, shared_memory=True)
+
+    assert read.call_count == 0
+    assert list(attached.choices) == list(published.choices)
+    assert list(attached.cum_weights) == list(published.cum_weights)
+
+
+def _read_from_child(queue):
+    # simulate a sibling process that has not loaded the data itself
+    shared._segments.clear()
+    shared_list = shared.share_list(('numbers',), lambda: ['one', 'two', 'three'])
+    queue.put((shared_list.table.name, shared_list[1]))
+
+
+def test_shared_list_visible_to_other_process():
+    shared_list = shared.share_list(('numbers',), lambda: ['one', 'two', 'three'])
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_read_from_child, args=(queue,))
+    proc.start()
+    proc.join(timeout=10)
+
+    assert queue.get(timeout=1) == (shared_list.table.name, 'two')
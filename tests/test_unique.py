@@ -0,0 +1,97 @@
+import pytest
+
+import datacraft
+from datacraft.supplier.exceptions import SupplierException
+from datacraft.supplier.unique import FingerprintSet, ShuffledRangeSupplier, UniqueSupplier, fingerprint
+
+
+def test_fingerprint_set_grows():
+    fingerprints = FingerprintSet()
+    assert all(fingerprints.add(value) for value in range(5000))
+    assert not any(fingerprints.add(value) for value in range(5000))
+    assert len(fingerprints) == 5000
+    assert len(fingerprints.slots) == 8192
+
+
+@pytest.mark.parametrize("first,second", [(-1, -2), (-1.0, -2.0), ('a', 'b'), ({'a': 1}, {'a': 2}), (0, 1)])
+def test_fingerprints_differ(first, second):
+    assert fingerprint(first) != fingerprint(second)
+
+
+def test_fingerprint_unhashable_same_for_equal():
+    assert fingerprint({'a': [1, 2], 'b': 3}) == fingerprint({'b': 3, 'a': [1, 2]})
+
+
+def test_unique_values():
+    spec = {"code": {"type": "values", "data": list(range(50)), "config": {"unique": True}}}
+    values = [record['code'] for record in datacraft.entries(spec, 50)]
+    assert sorted(values) == list(range(50))
+
+
+def test_unique_batches():
+    spec = {"code": {"type": "values", "data": list(range(200)), "config": {"unique": True}}}
+    supplier = datacraft.loader.field_loader(spec).get('code')
+    values = supplier.next_batch(0, 150) + supplier.next_batch(150, 50)
+    assert sorted(values) == list(range(200))
+
+
+def test_unique_exhausted():
+    spec = {"code": {"type": "values", "data": ["a", "b"], "config": {"unique": True, "unique_retries": 20}}}
+    with pytest.raises(SupplierException, match='after 20 retries, 2 unique values'):
+        datacraft.entries(spec, 3)
+
+
+def test_unique_constant_not_folded():
+    spec = {"code": {"type": "values", "data": "only", "config": {"unique": True, "unique_retries": 5}}}
+    assert datacraft.entries(spec, 1) == [{"code": "only"}]
+    with pytest.raises(SupplierException):
+        datacraft.entries(spec, 2)
+
+
+def test_unique_nested():
+    spec = {"user": {"type": "nested", "fields": {"id": {"type": "values", "data": [1, 2, 3]}},
+                     "config": {"unique": True}}}
+    users = [record['user']['id'] for record in datacraft.entries(spec, 3)]
+    assert sorted(users) == [1, 2, 3]
+
+
+def test_unique_rand_int_range_is_permutation():
+    spec = {"id": {"type": "rand_int_range", "data": [10, 1010], "config": {"unique": True}}}
+    supplier = datacraft.loader.field_loader(spec).get('id')
+    assert isinstance(supplier.wrapped, ShuffledRangeSupplier)
+    values = [record['id'] for record in datacraft.entries(spec, 1000)]
+    assert sorted(values) == list(range(10, 1010))
+    assert values != sorted(values)
+    with pytest.raises(SupplierException, match='All 1000 values'):
+        datacraft.entries(spec, 1001)
+
+
+def test_unique_float_range_checks_values():
+    spec = {"value": {"type": "rand_range", "data": [0, 1], "config": {"unique": True}}}
+    supplier = datacraft.loader.field_loader(spec).get('value')
+    assert isinstance(supplier, UniqueSupplier)
+
+
+def test_unique_range_does_not_wrap():
+    spec = {"id": {"type": "range", "data": [1, 10, 3], "config": {"unique": True}}}
+    assert [record['id'] for record in datacraft.entries(spec, 4)] == [1, 4, 7, 10]
+    with pytest.raises(SupplierException, match='have been used'):
+        datacraft.entries(spec, 5)
+
+
+def test_unique_iteration_not_checked():
+    spec = {"id": {"type": "iteration", "config": {"unique": True}}}
+    supplier = datacraft.loader.field_loader(spec).get('id')
+    assert not isinstance(supplier, UniqueSupplier)
+
+
+@pytest.mark.parametrize("start,end", [(0, 1), (0, 2), (-5, 5), (3, 1030)])
+def test_shuffled_range(start, end):
+    supplier = datacraft.suppliers.shuffled_range(start, end)
+    assert sorted(supplier.next(i) for i in range(end - start)) == list(range(start, end))
+
+
+def test_invalid_unique_retries():
+    spec = {"code": {"type": "values", "data": [1, 2], "config": {"unique": True, "unique_retries": "lots"}}}
+    with pytest.raises(datacraft.SpecException):
+        datacraft.entries(spec, 1)
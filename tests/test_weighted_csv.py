@@ -1,8 +1,12 @@
 import os
+import random
 
 import pytest
 
 import datacraft
+from datacraft.supplier import csv as csv_module
+from datacraft.supplier.common import weighted_values_explicit
+from datacraft.supplier.csv import load_weighted_csv_data
 
 from . import builder
 
@@ -69,6 +73,57 @@ def test_weighted_csv_valid_invalid_indexed_column():
         next(gen)
 
 
+def test_weighted_csv_named_column_requires_headers():
+    spec = _build_csv_spec('status', column='status', weight_column='weight')
+
+    with pytest.raises(datacraft.SpecException):
+        datacraft.loader.field_loader(spec, data_dir=test_dir).get('status')
+
+
+def test_weighted_csv_same_as_weighted_values():
+    spec = _build_csv_spec('status', column='status', weight_column='weight', headers=True)
+    supplier = datacraft.loader.field_loader(spec, data_dir=test_dir).get('status')
+    data = load_weighted_csv_data(os.path.join(test_dir, 'weighted.csv'), 'status', 'weight')
+    weights = [data.cum_weights[0]] + [data.cum_weights[i] - data.cum_weights[i - 1]
+                                       for i in range(1, len(data.cum_weights))]
+    expected_supplier = weighted_values_explicit(list(data.choices), weights)
+
+    random.seed(7)
+    expected = [expected_supplier.next(i) for i in range(50)]
+    random.seed(7)
+    assert [supplier.next(i) for i in range(50)] == expected
+    random.seed(7)
+    assert supplier.next_batch(0, 50) == expected
+
+
+def test_weighted_csv_data_shared_by_fields():
+    first = load_weighted_csv_data(os.path.join(test_dir, 'weighted.csv'), 1, 2)
+    second = load_weighted_csv_data(os.path.join(test_dir, 'weighted.csv'), 1, 2)
+    assert first is second
+
+
+def test_weighted_csv_disk_cache(tmpdir):
+    csv_path = os.path.join(tmpdir, 'cities.csv')
+    with open(csv_path, 'w', encoding='utf-8') as handle:
+        handle.write('city,weight\n"Paris, FR",0.5\nRome,1.5\n')
+    cache_dir = os.path.join(tmpdir, 'cache')
+
+    loaded = load_weighted_csv_data(csv_path, 'city', 'weight', cache_dir=cache_dir)
+    cache_files = os.listdir(cache_dir)
+    assert len(cache_files) == 1
+    csv_module._weighted_csv_cache.clear()
+    cached = load_weighted_csv_data(csv_path, 'city', 'weight', cache_dir=cache_dir)
+    assert cached is not loaded
+    assert cached.choices == ['Paris, FR', 'Rome']
+    assert list(cached.cum_weights) == [0.5, 2.0]
+
+    # updated file gets a new cache entry
+    with open(csv_path, 'a', encoding='utf-8') as handle:
+        handle.write('Oslo,1\n')
+    assert load_weighted_csv_data(csv_path, 'city', 'weight', cache_dir=cache_dir).choices[-1] == 'Oslo'
+    assert len(os.listdir(cache_dir)) == 2
+
+
 def _build_csv_spec(field_name, **config):
     base = {
         "datafile": "weighted.csv"